@@ -0,0 +1,59 @@
+"""
+Benchmark - Fine Art Nude Workaround
+Single-pass compiled matcher vs the original 3 × N str.replace loop
+
+Run: python benchmarks/bench_fine_art_nude.py
+"""
+
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from logic.fine_art_nude_v1 import REPLACEMENTS, apply_workaround
+
+SIZES_KB = [1, 4, 16, 64, 256]
+
+SAMPLE = (
+    "Full body nude study of the subject, bare skin catching the rim light. "
+    "The pose is revealing yet classical, breasts and buttocks sculpted by shadow, "
+    "nipples barely lit. Wardrobe: a jacket with a single button, left undressed. "
+    "Mood: provocative, NAKED honesty, Erotic tension kept subtle. Camera: 85mm prime, "
+    "f/2.0, soft key from camera left, deep falloff on the background. "
+)
+
+
+def legacy_apply_workaround(text):
+    """Original implementation: one full-string pass per term and casing"""
+    transformed_text = text
+    for old_term, new_term in REPLACEMENTS.items():
+        transformed_text = transformed_text.replace(old_term, new_term)
+        transformed_text = transformed_text.replace(old_term.capitalize(), new_term.capitalize())
+        transformed_text = transformed_text.replace(old_term.upper(), new_term.upper())
+    return transformed_text
+
+
+def make_prompt(size_kb):
+    repeats = (size_kb * 1024) // len(SAMPLE) + 1
+    return (SAMPLE * repeats)[:size_kb * 1024]
+
+
+def bench(fn, text):
+    runs = max(3, 2000 // max(1, len(text) // 1024))
+    best = min(timeit.repeat(lambda: fn(text), number=runs, repeat=5)) / runs
+    return best, len(text) / best / 1e6
+
+
+def main():
+    print(f"{'size':>8} | {'legacy ms':>10} {'MB/s':>8} | {'compiled ms':>11} {'MB/s':>8} | speedup")
+    for size_kb in SIZES_KB:
+        text = make_prompt(size_kb)
+        legacy_t, legacy_mbs = bench(legacy_apply_workaround, text)
+        new_t, new_mbs = bench(lambda t: apply_workaround(t, "Fine Art Nude"), text)
+        print(f"{size_kb:>6}KB | {legacy_t * 1e3:>10.3f} {legacy_mbs:>8.1f} | "
+              f"{new_t * 1e3:>11.3f} {new_mbs:>8.1f} | {legacy_t / new_t:>6.2f}x")
+
+
+if __name__ == "__main__":
+    main()
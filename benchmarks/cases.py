@@ -0,0 +1,136 @@
+"""
+Benchmark - Cases
+Synthetic, deterministic inputs for the pure-Python hot paths (no network)
+"""
+
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import prompts.camera_override_v1 as camera_override_v1
+import prompts.cinelab_v1 as cinelab_v1
+import prompts.product_studio_v1 as product_studio_v1
+import logic.factory_bridge_v1 as factory_bridge_v1
+import logic.fine_art_nude_v1 as fine_art_nude_v1
+from services.library_store import get_library
+
+# Input sizes: label -> bytes of free text injected into the input
+SIZES = {
+    "1KB": 1024,
+    "64KB": 64 * 1024,
+    "1MB": 1024 * 1024,
+    "4MB": 4 * 1024 * 1024
+}
+QUICK_SIZES = ("1KB", "64KB")
+
+# Realistic director's-notes prose, with the terms the workaround and bridge rewrite
+FILLER = (
+    "Full body nude study, bare skin catching the rim light from a softbox at camera left. "
+    "The pose is revealing yet classical, breasts and buttocks sculpted by shadow; a bounce board "
+    "lifts the fill, the light stand stays out of frame. Wardrobe: a jacket with a single button, "
+    "left undressed. Mood: provocative, NAKED honesty, Erotic tension kept subtle. Camera: 85mm prime, "
+    "f/2.0, deep falloff on the background, leaning against the studio wall. "
+)
+
+IMG_DATA = {"mime_type": "image/jpeg", "data": b"\xff\xd8\xff\xe0" + b"\x00" * 1024}
+
+
+def text(size):
+    """Deterministic filler text of exactly `size` characters"""
+    repeats = size // len(FILLER) + 1
+    return (FILLER * repeats)[:size]
+
+
+def cinelab_params(size):
+    return {
+        "cam": "Apple iPhone 15 Pro", "cam_info": "48MP main | clean digital",
+        "lens": "24mm Prime", "lens_info": "Wide | natural",
+        "f_stop": "f/1.2", "iso": "50", "ratio": "4:5", "genre": "Fine Art Nude",
+        "artist": "David LaChapelle", "category": "Studio",
+        "scenario": "Rembrandt", "light_details": text(size // 2), "notes": text(size - size // 2)
+    }
+
+
+def cinelab_recipe(size):
+    """CineLab output JSON whose free-text fields add up to ~size"""
+    quarter = size // 4
+    return json.dumps({
+        "cinematography_recipe": {
+            "phase_1_subject_retention": {
+                "environment_override": {"location": "Studio cyclorama"},
+                "four_by_four_analysis": {"pose": ["Leaning", "Hands tucked in pockets", text(quarter)]}
+            },
+            "phase_4_lighting_physics": {
+                "key_light": text(quarter), "fill_light": "Bounce board at 45 degrees",
+                "back_light": text(quarter), "setup": "Softbox on a light stand",
+                "director_notes": text(size - 3 * quarter)
+            }
+        }
+    })
+
+
+def camera_override_protocol(size):
+    half = size // 2
+    return json.dumps({
+        "camera_override_protocol": {"camera_angle": "eye_level", "lens": "50mm_natural"},
+        "final_technical_prompt": text(half),
+        "consistency_anchors": text(size - half)
+    })
+
+
+def build_cases(sizes=tuple(SIZES)):
+    """
+    Every benchmark case
+
+    Returns:
+        list of (name, zero-argument callable); inputs are built up front
+        so only the function under test is measured
+    """
+    cinelab_lib = get_library("cinelab")
+    camera_lib = get_library("camera_override")
+    cases = []
+
+    for label in sizes:
+        size = SIZES[label]
+
+        params = cinelab_params(size)
+        cases.append((f"cinelab_v1.generate_prompt[{label}]",
+                      lambda p=params: cinelab_v1.generate_prompt(p, IMG_DATA)))
+
+        params = {"camera_angle": "eye_level", "shot_scale": "full_shot",
+                  "lens": "50mm_natural", "aspect_ratio": text(size)}
+        cases.append((f"camera_override_v1.generate_prompt[{label}]",
+                      lambda p=params: camera_override_v1.generate_prompt(p, IMG_DATA, camera_lib)))
+
+        params = {"user_text": text(size), "photographer": "David LaChapelle"}
+        cases.append((f"product_studio_v1.generate_prompt[{label}]",
+                      lambda p=params: product_studio_v1.generate_prompt(p, IMG_DATA, cinelab_lib)))
+
+        prompt = text(size)
+        cases.append((f"fine_art_nude_v1.apply_workaround[{label}]",
+                      lambda t=prompt: fine_art_nude_v1.apply_workaround(t, "Fine Art Nude")))
+
+        recipe = cinelab_recipe(size)
+        protocol = camera_override_protocol(size)
+        plain = text(size)
+        cases.append((f"factory_bridge_v1.prepare_for_generation[cinelab,{label}]",
+                      lambda r=recipe: factory_bridge_v1.prepare_for_generation(r)))
+        cases.append((f"factory_bridge_v1.prepare_for_generation[camera_override,{label}]",
+                      lambda r=protocol: factory_bridge_v1.prepare_for_generation(r)))
+        cases.append((f"factory_bridge_v1.prepare_for_generation[plain,{label}]",
+                      lambda r=plain: factory_bridge_v1.prepare_for_generation(r)))
+
+        # Handlers on pre-parsed input (handle_cinelab_format rewrites in
+        # place; it is idempotent, so repeated runs see the same work)
+        recipe_data = json.loads(recipe)
+        protocol_data = json.loads(protocol)
+        cases.append((f"factory_bridge_v1.handle_cinelab_format[{label}]",
+                      lambda d=recipe_data: factory_bridge_v1.handle_cinelab_format(d)))
+        cases.append((f"factory_bridge_v1.handle_camera_override_format[{label}]",
+                      lambda d=protocol_data: factory_bridge_v1.handle_camera_override_format(d)))
+        cases.append((f"factory_bridge_v1.handle_plain_text_format[{label}]",
+                      lambda t=plain: factory_bridge_v1.handle_plain_text_format(t)))
+
+    return cases
@@ -0,0 +1,154 @@
+"""
+Benchmark - Import Time Report
+What each page pays for its top-level imports before it can render anything
+
+Every page's module-level imports are replayed in a fresh interpreter under
+`python -X importtime`; the output is summarised per top-level package
+(self time) and per import statement (cumulative time). Modules the bare
+interpreter already loads at startup are left out.
+
+Run:
+    python benchmarks/import_time.py                  # app.py + every page
+    python benchmarks/import_time.py --top 5 --warmup # also time services.warmup steps
+    python benchmarks/import_time.py --module cinelab.engines --json imports.json
+
+Packages listed in HEAVY are flagged when they appear on a page's import
+path: they belong behind the first engine call or in the warm-up.
+"""
+
+import argparse
+import ast
+import json
+import os
+import re
+import subprocess
+import sys
+from collections import defaultdict
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+TARGETS = {
+    "app": "app.py",
+    "prompt_generator": "pages/1_🎨_Prompt_Generator.py",
+    "factory": "pages/2_🏭_Factory.py",
+    "camera_override": "pages/3_📐_Camera_Override.py",
+    "product_studio": "pages/4_💎_Product_Studio.py",
+    "history": "pages/5_📚_History.py"
+}
+
+# Should not be on any page's import path (first engine call / warm-up only)
+HEAVY = ("google.generativeai", "google.ai", "google.api_core", "grpc", "PIL", "googleapiclient")
+
+_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def page_imports(path):
+    """Source of the module-level import statements of a script"""
+    with open(path, 'r', encoding='utf-8') as f:
+        source = f.read()
+    tree = ast.parse(source)
+    return [ast.get_source_segment(source, node) for node in tree.body
+            if isinstance(node, (ast.Import, ast.ImportFrom)) and not getattr(node, 'level', 0)]
+
+
+def run_importtime(statements):
+    """
+    Execute import statements in a fresh interpreter with -X importtime
+
+    Returns:
+        list of (module, self_us, cumulative_us, depth) in import order
+    """
+    code = "\n".join([f"import sys; sys.path.insert(0, {ROOT!r})"] + statements)
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT, capture_output=True, text=True, env=dict(os.environ)
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+    rows = []
+    for line in proc.stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            rows.append((match.group(4), int(match.group(1)), int(match.group(2)), len(match.group(3)) // 2))
+    return rows
+
+
+def _package(module):
+    # google.* is a namespace shared by protobuf (streamlit) and the Gemini SDK
+    parts = module.split('.')
+    return '.'.join(parts[:2]) if parts[0] == "google" else parts[0]
+
+
+def summarize(rows, startup, top):
+    """Totals per package and the heaviest direct imports"""
+    rows = [row for row in rows if row[0] not in startup]
+    by_package = defaultdict(int)
+    for module, self_us, _, _ in rows:
+        by_package[_package(module)] += self_us
+    direct = sorted(((module, cum) for module, _, cum, depth in rows if depth == 0),
+                    key=lambda item: item[1], reverse=True)
+    total = sum(by_package.values())
+    return {
+        "total_ms": round(total / 1e3, 1),
+        "modules": len(rows),
+        "packages_ms": {pkg: round(us / 1e3, 1) for pkg, us in
+                        sorted(by_package.items(), key=lambda item: item[1], reverse=True)[:top]},
+        "imports_ms": {module: round(us / 1e3, 1) for module, us in direct[:top]},
+        "heavy": sorted({prefix for prefix in HEAVY for module, _, _, _ in rows
+                         if module == prefix or module.startswith(prefix + ".")})
+    }
+
+
+def print_report(name, summary):
+    print(f"\n{name}: {summary['total_ms']:.1f} ms over {summary['modules']} modules"
+          + (f"  ⚠ heavy: {', '.join(summary['heavy'])}" if summary["heavy"] else ""))
+    print(f"  {'package (self)':<28} {'ms':>8}    {'import (cumulative)':<32} {'ms':>8}")
+    packages = list(summary["packages_ms"].items())
+    imports = list(summary["imports_ms"].items())
+    for i in range(max(len(packages), len(imports))):
+        left = f"{packages[i][0]:<28} {packages[i][1]:>8.1f}" if i < len(packages) else " " * 37
+        right = f"{imports[i][0]:<32} {imports[i][1]:>8.1f}" if i < len(imports) else ""
+        print(f"  {left}    {right}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Summarise python -X importtime for the CineLab pages")
+    parser.add_argument("--pages", default=",".join(TARGETS), help=f"Comma-separated subset of: {', '.join(TARGETS)}")
+    parser.add_argument("--module", action="append", default=[], help="Also report this module (repeatable)")
+    parser.add_argument("--top", type=int, default=10, help="Rows per table")
+    parser.add_argument("--warmup", action="store_true", help="Also run services.warmup and time each step")
+    parser.add_argument("--json", help="Also write the report to this file")
+    args = parser.parse_args(argv)
+
+    names = [p.strip() for p in args.pages.split(",") if p.strip()]
+    unknown = [p for p in names if p not in TARGETS]
+    if unknown:
+        parser.error(f"unknown page(s): {', '.join(unknown)}")
+
+    startup = {row[0] for row in run_importtime([])}
+    jobs = [(name, page_imports(os.path.join(ROOT, TARGETS[name]))) for name in names]
+    jobs += [(module, [f"import {module}"]) for module in args.module]
+
+    report = {"python": sys.version.split()[0], "targets": {}}
+    for name, statements in jobs:
+        summary = summarize(run_importtime(statements), startup, args.top)
+        report["targets"][name] = summary
+        print_report(name, summary)
+
+    if args.warmup:
+        sys.path.insert(0, ROOT)
+        from services.warmup import run_warmup
+        report["warmup_s"] = run_warmup()
+        print("\nwarm-up: " + " · ".join(
+            f"{step} {value if isinstance(value, str) else f'{value:.3f}s'}"
+            for step, value in report["warmup_s"].items()
+        ))
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,197 @@
+"""
+Benchmark - Library Scale
+Cold load time and memory of the library backends as the catalogue grows
+
+A synthetic cinelab_library.json is generated at each scale by repeating
+the bundled cameras, lenses, photographers (per genre) and lighting presets
+under suffixed names, so 100x holds 100 times every section. For each
+backend a fresh interpreter then does what the first Prompt Generator render
+does: load the library, build the index, render the first camera / lens /
+artist info boxes and run one type-ahead search. It then builds the search
+index (services/library_search.py) and times SEARCH_QUERIES against it.
+Reported per scale and backend: load time, first-render time and the RSS
+it added, index build time and median query time. For the sqlite
+backend the snapshot is built beforehand (as `python -m cinelab library`
+would) and its build time and size are reported separately.
+
+Run:
+    python benchmarks/library_scale.py                      # 1x, 10x, 100x, 1000x
+    python benchmarks/library_scale.py --scales 1,100 --backends sqlite
+    python benchmarks/library_scale.py --json library_scale.json
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+LIBRARY_FILE = "cinelab_library.json"
+BACKENDS = ("json", "sqlite")
+# Name prefix, short prefix, two text words, one-letter worst case
+SEARCH_QUERIES = ("leica", "85", "high contrast", "s")
+SEARCH_REPEAT = 20
+
+
+def scaled_library(lib, scale):
+    """Bundled library with every grouped or flat section repeated `scale` times"""
+    def repeat(entries):
+        return {
+            (name if copy == 0 else f"{name} #{copy}"): entry
+            for copy in range(scale) for name, entry in entries.items()
+        }
+    out = dict(lib)
+    out["cameras"] = repeat(lib["cameras"])
+    out["lenses"] = repeat(lib["lenses"])
+    out["photographers"] = {genre: repeat(artists) for genre, artists in lib["photographers"].items()}
+    out["lighting_presets"] = {cat: repeat(presets) for cat, presets in lib["lighting_presets"].items()}
+    return out
+
+
+def rss_bytes():
+    """Resident set size of this process"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        import resource
+        usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return usage if sys.platform == "darwin" else usage * 1024
+
+
+def first_render(data_dir, backend, snapshot_dir):
+    """
+    Load + first render of one library in this (fresh) process
+
+    Returns:
+        dict of load_s, render_s, rss_bytes (added by the library), index_s, query_s (query -> median)
+    """
+    from services.library_index import CineLabIndex, search_options
+    from services.library_search import LibrarySearch
+    from services.library_store import LibraryStore
+
+    store = LibraryStore(data_dir=data_dir, backend=backend, snapshot_dir=snapshot_dir)
+    before = rss_bytes()
+    started = time.perf_counter()
+    store.get(LIBRARY_FILE)
+    loaded = time.perf_counter()
+
+    idx = store.derive(LIBRARY_FILE, CineLabIndex)
+    idx.camera_box[idx.cameras[0]]
+    idx.lens_box[idx.lenses[0]]
+    genre = idx.genres[0]
+    idx.artist_detail_box[(genre, idx.artists[genre][0])]
+    search_options(idx.cameras, "leica", 200)
+    rendered = time.perf_counter()
+    rss = rss_bytes() - before
+
+    index = store.derive(LIBRARY_FILE, LibrarySearch)
+    indexed = time.perf_counter()
+    query_s = {}
+    for query in SEARCH_QUERIES:
+        runs = []
+        for _ in range(SEARCH_REPEAT):
+            t0 = time.perf_counter()
+            index.search(query)
+            runs.append(time.perf_counter() - t0)
+        query_s[query] = sorted(runs)[len(runs) // 2]
+    return {"load_s": loaded - started, "render_s": rendered - loaded, "rss_bytes": rss,
+            "index_s": indexed - rendered, "query_s": query_s}
+
+
+def run_child(data_dir, backend, snapshot_dir):
+    """first_render() in a fresh interpreter"""
+    out = subprocess.run(
+        [sys.executable, __file__, "--child", json.dumps([data_dir, backend, snapshot_dir])],
+        capture_output=True, text=True, check=True, cwd=ROOT
+    )
+    return json.loads(out.stdout)
+
+
+def bench_scale(lib, scale, backends, work_dir):
+    """Generate one scale and measure each backend"""
+    from services.library_db import build_snapshot
+
+    data_dir = os.path.join(work_dir, f"x{scale}")
+    os.makedirs(data_dir, exist_ok=True)
+    raw = json.dumps(scaled_library(lib, scale), ensure_ascii=False).encode('utf-8')
+    with open(os.path.join(data_dir, LIBRARY_FILE), 'wb') as f:
+        f.write(raw)
+    data = json.loads(raw)
+    result = {
+        "entries": len(data["cameras"]) + len(data["lenses"]) +
+                   sum(len(v) for v in data["photographers"].values()) +
+                   sum(len(v) for v in data["lighting_presets"].values()),
+        "json_bytes": len(raw),
+        "backends": {}
+    }
+
+    snapshot_dir = os.path.join(data_dir, "snapshots")
+    if "sqlite" in backends:
+        path = os.path.join(snapshot_dir, os.path.splitext(LIBRARY_FILE)[0] + ".sqlite3")
+        started = time.perf_counter()
+        build_snapshot(data, hashlib.sha256(raw).hexdigest(), path)
+        result["snapshot_build_s"] = time.perf_counter() - started
+        result["snapshot_bytes"] = os.path.getsize(path)
+
+    for backend in backends:
+        result["backends"][backend] = run_child(data_dir, backend, snapshot_dir)
+    return result
+
+
+def print_report(report):
+    print(f"{'scale':>6} {'entries':>9} {'json MB':>8} {'backend':>8} {'load ms':>9} {'render ms':>10} {'RSS MB':>8} "
+          f"{'index ms':>9}  query ms ({', '.join(SEARCH_QUERIES)})")
+    for scale, result in report["scales"].items():
+        for backend, m in result["backends"].items():
+            print(f"{scale:>6} {result['entries']:>9,} {result['json_bytes'] / 1e6:>8.1f} {backend:>8} "
+                  f"{m['load_s'] * 1e3:>9.1f} {m['render_s'] * 1e3:>10.1f} {m['rss_bytes'] / 1e6:>8.1f} "
+                  f"{m['index_s'] * 1e3:>9.1f}  {' / '.join(f'{s * 1e3:.3f}' for s in m['query_s'].values())}")
+        if "snapshot_build_s" in result:
+            print(f"{'':>6} snapshot: {result['snapshot_bytes'] / 1e6:.1f} MB, built in {result['snapshot_build_s']:.2f}s")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load time and memory of the library backends at growing scale")
+    parser.add_argument("--scales", default="1,10,100,1000", help="Comma-separated catalogue multipliers")
+    parser.add_argument("--backends", default=",".join(BACKENDS), help=f"Comma-separated subset of: {', '.join(BACKENDS)}")
+    parser.add_argument("--json", help="Also write the report to this file")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        print(json.dumps(first_render(*json.loads(args.child))))
+        return 0
+
+    backends = [b.strip() for b in args.backends.split(",") if b.strip()]
+    unknown = [b for b in backends if b not in BACKENDS]
+    if unknown:
+        parser.error(f"unknown backend(s): {', '.join(unknown)}")
+
+    with open(os.path.join(ROOT, "data", LIBRARY_FILE), 'r', encoding='utf-8') as f:
+        lib = json.load(f)
+
+    work_dir = tempfile.mkdtemp(prefix="cinelab-libscale-")
+    report = {"python": sys.version.split()[0], "scales": {}}
+    try:
+        for scale in (int(s) for s in args.scales.split(",") if s.strip()):
+            report["scales"][f"{scale}x"] = bench_scale(lib, scale, backends, work_dir)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    print_report(report)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,373 @@
+"""
+Benchmark - Multi-Session Load Test
+N simulated users walking the Streamlit pages against the fake model backend
+
+Each user runs in its own thread with its own AppTest session, all in one
+process like sessions on a real server, and repeats a journey per page:
+open the page, upload a reference image (or paste a prompt), press the
+generate button. Reported per page: journeys/s,
+p50/p95/p99 end-to-end latency of the generate rerun, script time of every
+rerun, and process RSS.
+
+Run:
+    python benchmarks/load_test.py --users 8 --duration 60
+    python benchmarks/load_test.py --users 4 --pages factory --fake '{"errors": {"rate_limit": 0.05}}'
+    python benchmarks/load_test.py --users 16 --json report.json
+
+The fake backend's latency applies (see FAKE_GENAI in config/models.py);
+pass --fake '{"latency": {...}}' to model a faster or slower API. The
+per-key rate limits are lifted unless --keep-rate-limits is given, since
+otherwise the limiter is what gets measured.
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+# Backend and state dir must be chosen before any CineLab module is imported
+os.environ.setdefault("CINELAB_GENAI_BACKEND", "fake")
+os.environ.setdefault("CINELAB_STATE_DIR", tempfile.mkdtemp(prefix="cinelab-load-"))
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+import streamlit as st
+import streamlit.testing.v1.app_test as app_test_module
+from PIL import Image
+from streamlit import config as st_config
+from streamlit.runtime import Runtime
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+from streamlit.runtime.scriptrunner import script_cache
+from streamlit.testing.v1 import AppTest
+
+import config.models as model_config
+
+PAGES = {
+    "prompt_generator": "pages/1_🎨_Prompt_Generator.py",
+    "factory": "pages/2_🏭_Factory.py",
+    "camera_override": "pages/3_📐_Camera_Override.py",
+    "product_studio": "pages/4_💎_Product_Studio.py"
+}
+
+# Button that starts generation on each page
+GENERATE_LABELS = {
+    "prompt_generator": "GENERATE JSON RECIPE",
+    "factory": "RUN",
+    "camera_override": "GENERATE JSON PROTOCOL",
+    "product_studio": "GENERATE PRODUCT PROMPT"
+}
+
+FACTORY_PROMPT = json.dumps({"cinematography_recipe": {
+    "phase_1_subject_retention": {"environment_override": {"location": "Studio"}},
+    "phase_4_lighting_physics": {"key_light": "Softbox", "director_notes": "Load test"}
+}})
+PRODUCT_TEXT = "Place the product on a wet black rock at dusk, rim light from behind."
+
+# Newer AppTest can drive st.file_uploader; older releases get a patched uploader
+NATIVE_UPLOAD = hasattr(AppTest, "file_uploader")
+
+
+# --- CONCURRENT APPTEST ---
+def share_runtime():
+    """
+    Let many AppTest sessions run at once in this process
+
+    AppTest installs a mock Runtime singleton at the start of every run and
+    clears it at the end, so overlapping runs pull it from under each other.
+    Keep the first one for everyone (a real server also has one runtime),
+    pin the app-test config flag that each run would otherwise toggle, and
+    compile each page once under a lock (every AppTest run builds a fresh
+    ScriptCache, and concurrent ast.parse is not thread-safe on 3.11).
+    """
+    class _SharedRuntimeMeta(type(Runtime)):
+        def __setattr__(cls, name, value):
+            if name == "_instance":
+                if value is not None and Runtime._instance is None:
+                    Runtime._instance = value
+                return
+            super().__setattr__(name, value)
+
+    class _SharedRuntime(Runtime, metaclass=_SharedRuntimeMeta):
+        pass
+
+    app_test_module.Runtime = _SharedRuntime
+    st_config.set_option("global.appTest", True)
+
+    compile_page = script_cache.ScriptCache.get_bytecode
+    compiled = {}
+    compile_lock = threading.Lock()
+
+    def get_bytecode(self, script_path):
+        with compile_lock:
+            if script_path not in compiled:
+                compiled[script_path] = compile_page(self, script_path)
+            return compiled[script_path]
+
+    script_cache.ScriptCache.get_bytecode = get_bytecode
+
+
+# --- UPLOADS ---
+class FakeUpload(io.BytesIO):
+    """Same shape as streamlit's UploadedFile (a BytesIO with metadata)"""
+
+    def __init__(self, name, data, mime_type):
+        super().__init__(data)
+        self.name = name
+        self.type = mime_type
+        self.size = len(data)
+        self.file_id = hashlib.sha1(data).hexdigest()
+
+
+def make_images(count, edge):
+    """Distinct JPEGs so each user misses the response cache with its own image"""
+    images = []
+    for i in range(count):
+        img = Image.new('RGB', (edge, int(edge * 1.25)), ((i * 37) % 256, (i * 91) % 256, 120))
+        out = io.BytesIO()
+        img.save(out, format='JPEG', quality=90)
+        images.append((f"ref_{i}.jpg", out.getvalue(), "image/jpeg"))
+    return images
+
+
+def install_uploader(images):
+    """
+    Replace st.file_uploader for every session in this process
+
+    For AppTest releases that cannot drive the real uploader: each session
+    "uploads" the image picked by its session id.
+    """
+    def file_uploader(label, type=None, accept_multiple_files=False, **kwargs):
+        ctx = get_script_run_ctx()
+        session_id = ctx.session_id if ctx is not None else ""
+        index = int(hashlib.sha1(session_id.encode('utf-8')).hexdigest(), 16) % len(images)
+        upload = FakeUpload(*images[index])
+        return [upload] if accept_multiple_files else upload
+
+    st.file_uploader = file_uploader
+
+
+# --- ONE USER ---
+def percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def run_journey(page, image, timeout, bypass_cache):
+    """
+    Open a page, fill it in and generate once
+
+    Args:
+        page: key of PAGES
+        image: (file name, bytes, mime type) to upload where the page asks for one
+
+    Returns:
+        (end-to-end seconds of the generate rerun, [script seconds per rerun], error or None)
+    """
+    at = AppTest.from_file(os.path.join(ROOT, PAGES[page]), default_timeout=timeout)
+    reruns = []
+
+    def rerun():
+        started = time.perf_counter()
+        at.run()
+        reruns.append(time.perf_counter() - started)
+
+    rerun()
+    if at.exception:
+        return None, reruns, at.exception[0].value
+
+    if NATIVE_UPLOAD and page != "factory":
+        name, data, mime_type = image
+        at.file_uploader[0].upload(name, data, mime_type)
+        rerun()
+        if at.exception:
+            return None, reruns, at.exception[0].value
+
+    if page == "factory":
+        at.text_area[0].input(FACTORY_PROMPT)
+    if page == "product_studio":
+        at.text_area[0].input(PRODUCT_TEXT)
+    if bypass_cache:
+        for box in at.checkbox:
+            if box.label == "Bypass cache":
+                box.check()
+
+    buttons = [b for b in at.button if GENERATE_LABELS[page] in b.label]
+    if not buttons:
+        return None, reruns, f"button '{GENERATE_LABELS[page]}' not found"
+    buttons[0].click()
+    rerun()
+    if at.exception:
+        return None, reruns, at.exception[0].value
+    errors = [e.value for e in at.error]
+    return reruns[-1], reruns, errors[0] if errors else None
+
+
+class User(threading.Thread):
+    def __init__(self, index, pages, image, deadline, iterations, timeout, bypass_cache, results, lock):
+        super().__init__(name=f"load-user-{index}", daemon=True)
+        self.index = index
+        self.image = image
+        self.pages = pages
+        self.deadline = deadline
+        self.iterations = iterations
+        self.timeout = timeout
+        self.bypass_cache = bypass_cache
+        self.results = results
+        self.lock = lock
+
+    def run(self):
+        done = 0
+        while time.monotonic() < self.deadline and (not self.iterations or done < self.iterations):
+            # Stagger users across pages
+            page = self.pages[(self.index + done) % len(self.pages)]
+            try:
+                latency, reruns, error = run_journey(page, self.image, self.timeout, self.bypass_cache)
+            except Exception as e:
+                latency, reruns, error = None, [], f"{type(e).__name__}: {e}"
+            with self.lock:
+                r = self.results[page]
+                r["journeys"] += 1
+                r["reruns"].extend(reruns)
+                if error is None:
+                    r["latencies"].append(latency)
+                else:
+                    r["errors"].append(str(error)[:200])
+            done += 1
+
+
+# --- RSS ---
+def rss_bytes():
+    """Resident set size of this process"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        import resource
+        usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return usage if sys.platform == "darwin" else usage * 1024
+
+
+class RssSampler(threading.Thread):
+    def __init__(self, interval=0.5):
+        super().__init__(name="load-rss", daemon=True)
+        self.interval = interval
+        self.samples = [rss_bytes()]
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            self.samples.append(rss_bytes())
+
+
+# --- REPORT ---
+def summarize(results, elapsed, rss):
+    mb = 1024 * 1024
+    pages = {}
+    for page, r in results.items():
+        if not r["journeys"]:
+            continue
+        pages[page] = {
+            "journeys": r["journeys"],
+            "errors": len(r["errors"]),
+            "throughput_per_s": round(len(r["latencies"]) / elapsed, 3),
+            "latency_p50_s": percentile(r["latencies"], 50),
+            "latency_p95_s": percentile(r["latencies"], 95),
+            "latency_p99_s": percentile(r["latencies"], 99),
+            "rerun_p50_s": percentile(r["reruns"], 50),
+            "rerun_p95_s": percentile(r["reruns"], 95),
+            "sample_errors": sorted(set(r["errors"]))[:3]
+        }
+    ok = sum(len(r["latencies"]) for r in results.values())
+    return {
+        "elapsed_s": round(elapsed, 2),
+        "throughput_per_s": round(ok / elapsed, 3),
+        "rss_start_mb": round(rss[0] / mb, 1),
+        "rss_peak_mb": round(max(rss) / mb, 1),
+        "rss_end_mb": round(rss[-1] / mb, 1),
+        "pages": pages
+    }
+
+
+def print_report(report, users):
+    def fmt(value):
+        return "-" if value is None else f"{value:.3f}"
+
+    print(f"\n{users} users · {report['elapsed_s']}s · {report['throughput_per_s']} journeys/s · "
+          f"RSS {report['rss_start_mb']} → peak {report['rss_peak_mb']} MB (end {report['rss_end_mb']} MB)")
+    print(f"{'page':<18} {'ok/s':>7} {'runs':>6} {'err':>5} {'p50':>8} {'p95':>8} {'p99':>8} "
+          f"{'rerun50':>8} {'rerun95':>8}")
+    for page, p in report["pages"].items():
+        print(f"{page:<18} {p['throughput_per_s']:>7.3f} {p['journeys']:>6} {p['errors']:>5} "
+              f"{fmt(p['latency_p50_s']):>8} {fmt(p['latency_p95_s']):>8} {fmt(p['latency_p99_s']):>8} "
+              f"{fmt(p['rerun_p50_s']):>8} {fmt(p['rerun_p95_s']):>8}")
+        for error in p["sample_errors"]:
+            print(f"{'':<18} ! {error}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulate concurrent users on the CineLab pages")
+    parser.add_argument("--users", type=int, default=4, help="Concurrent simulated users")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds to keep starting journeys")
+    parser.add_argument("--iterations", type=int, default=0, help="Journeys per user (0 = until --duration)")
+    parser.add_argument("--pages", default=",".join(PAGES), help=f"Comma-separated subset of: {', '.join(PAGES)}")
+    parser.add_argument("--images", type=int, default=8, help="Distinct reference images to cycle through")
+    parser.add_argument("--edge", type=int, default=2048, help="Long edge of synthetic reference images")
+    parser.add_argument("--fake", default="{}", help="JSON passed to fake_genai.set_behavior()")
+    parser.add_argument("--use-cache", action="store_true", help="Leave the response cache on (default: bypass)")
+    parser.add_argument("--keep-rate-limits", action="store_true", help="Keep RATE_LIMITS from config/models.py")
+    parser.add_argument("--timeout", type=float, default=120.0, help="Seconds allowed per script run")
+    parser.add_argument("--json", help="Also write the report to this file")
+    args = parser.parse_args(argv)
+
+    pages = [p.strip() for p in args.pages.split(",") if p.strip()]
+    unknown = [p for p in pages if p not in PAGES]
+    if unknown:
+        parser.error(f"unknown page(s): {', '.join(unknown)}")
+
+    if not args.keep_rate_limits:
+        for budget in model_config.RATE_LIMITS.values():
+            budget["rpm"], budget["tpm"] = 1_000_000, None
+    from services import fake_genai
+    fake_genai.set_behavior(**json.loads(args.fake))
+    images = make_images(args.images, args.edge)
+    share_runtime()
+    if not NATIVE_UPLOAD:
+        install_uploader(images)
+
+    results = {p: {"journeys": 0, "latencies": [], "reruns": [], "errors": []} for p in pages}
+    lock = threading.Lock()
+    sampler = RssSampler()
+    sampler.start()
+
+    started = time.monotonic()
+    deadline = started + (args.duration if not args.iterations else float("inf"))
+    users = [User(i, pages, images[i % len(images)], deadline, args.iterations, args.timeout,
+                  not args.use_cache, results, lock)
+             for i in range(args.users)]
+    for user in users:
+        user.start()
+    for user in users:
+        user.join()
+    elapsed = time.monotonic() - started
+    sampler.stopped.set()
+    sampler.samples.append(rss_bytes())
+
+    report = summarize(results, elapsed, sampler.samples)
+    report["fake_backend"] = fake_genai.get_stats()
+    print_report(report, args.users)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
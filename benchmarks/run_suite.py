@@ -0,0 +1,151 @@
+"""
+Benchmark - Hot Path Suite
+ops/sec and peak allocation per case, checked against committed baselines
+
+Run:
+    python benchmarks/run_suite.py                    # compare with baselines.json
+    python benchmarks/run_suite.py --quick            # 1KB / 64KB inputs only
+    python benchmarks/run_suite.py --update-baseline  # record new baselines
+
+Exit status is 1 when a case is slower (ops/sec) or allocates more (peak
+bytes) than its baseline by more than --tolerance. Throughput is scaled by a
+calibration loop, so baselines recorded on one machine remain usable on
+another.
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import timeit
+import tracemalloc
+
+from cases import QUICK_SIZES, SIZES, build_cases
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines.json")
+DEFAULT_TOLERANCE = 0.30
+MIN_TIME = 0.2          # Seconds per timing repeat
+REPEATS = 3
+
+
+def calibrate():
+    """ops/sec of a fixed pure-Python workload (string building + dict lookups)"""
+    table = {f"k{i}": i for i in range(64)}
+
+    def work():
+        parts = []
+        for i in range(64):
+            parts.append(f"{i}:{table[f'k{i}']}")
+        return ",".join(parts).lower().replace("1", "one")
+
+    return measure_ops(work)
+
+
+def measure_ops(fn):
+    """Best-of-REPEATS throughput, each repeat running for at least MIN_TIME"""
+    number, elapsed = 1, 0.0
+    while True:
+        elapsed = timeit.timeit(fn, number=number)
+        if elapsed >= MIN_TIME:
+            break
+        number = max(number * 2, int(number * MIN_TIME / max(elapsed, 1e-9)) + 1)
+    best = min([elapsed] + timeit.repeat(fn, number=number, repeat=REPEATS - 1))
+    return number / best
+
+
+def measure_peak(fn):
+    """Peak bytes allocated during a single call"""
+    fn()                                # Warm caches / compiled patterns first
+    tracemalloc.start()
+    try:
+        base, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return max(peak - base, 0)
+
+
+def run(cases, only=None):
+    results = {}
+    for name, fn in cases:
+        if only and only not in name:
+            continue
+        results[name] = {"ops_per_sec": round(measure_ops(fn), 2), "peak_bytes": measure_peak(fn)}
+        r = results[name]
+        print(f"{name:<72} {r['ops_per_sec']:>14,.1f} ops/s {r['peak_bytes'] / 1024:>12,.1f} KB", flush=True)
+    return results
+
+
+def compare(results, baseline, calibration, tolerance):
+    """
+    Returns:
+        list of regression messages (empty when everything is within tolerance)
+    """
+    scale = calibration / baseline["calibration_ops_per_sec"]
+    failures = []
+    for name, r in results.items():
+        base = baseline["cases"].get(name)
+        if base is None:
+            continue
+        expected_ops = base["ops_per_sec"] * scale
+        if r["ops_per_sec"] < expected_ops * (1 - tolerance):
+            failures.append(f"{name}: {r['ops_per_sec']:,.1f} ops/s vs expected {expected_ops:,.1f} "
+                            f"({r['ops_per_sec'] / expected_ops - 1:+.0%})")
+        # Ignore tiny absolute changes (interned strings, small dicts)
+        if r["peak_bytes"] > base["peak_bytes"] * (1 + tolerance) + 4096:
+            failures.append(f"{name}: peak {r['peak_bytes']:,} B vs baseline {base['peak_bytes']:,} B")
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="CineLab hot-path microbenchmarks")
+    parser.add_argument("--quick", action="store_true", help="only the 1KB and 64KB inputs")
+    parser.add_argument("--filter", help="only cases whose name contains this text")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help=f"allowed regression as a fraction (default {DEFAULT_TOLERANCE})")
+    parser.add_argument("--update-baseline", action="store_true", help=f"write {os.path.basename(BASELINE_FILE)}")
+    args = parser.parse_args(argv)
+
+    calibration = calibrate()
+    print(f"calibration: {calibration:,.1f} ops/s  ({platform.python_implementation()} {platform.python_version()})")
+    started = time.perf_counter()
+    results = run(build_cases(QUICK_SIZES if args.quick else tuple(SIZES)), args.filter)
+    print(f"{len(results)} cases in {time.perf_counter() - started:.1f}s")
+
+    if args.update_baseline:
+        baseline = {"cases": {}}
+        if os.path.exists(BASELINE_FILE) and (args.quick or args.filter):
+            with open(BASELINE_FILE, 'r', encoding='utf-8') as f:
+                baseline = json.load(f)
+            # Keep other cases comparable with the new calibration
+            scale = calibration / baseline["calibration_ops_per_sec"]
+            for r in baseline["cases"].values():
+                r["ops_per_sec"] = round(r["ops_per_sec"] * scale, 2)
+        baseline["calibration_ops_per_sec"] = round(calibration, 2)
+        baseline["python"] = platform.python_version()
+        baseline["cases"].update(results)
+        baseline["cases"] = dict(sorted(baseline["cases"].items()))
+        with open(BASELINE_FILE, 'w', encoding='utf-8') as f:
+            json.dump(baseline, f, indent=2)
+            f.write("\n")
+        print(f"Baselines written to {BASELINE_FILE}")
+        return 0
+
+    if not os.path.exists(BASELINE_FILE):
+        print("No baselines yet - run with --update-baseline", file=sys.stderr)
+        return 1
+    with open(BASELINE_FILE, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    failures = compare(results, baseline, calibration, args.tolerance)
+    for failure in failures:
+        print(f"REGRESSION {failure}", file=sys.stderr)
+    print("OK" if not failures else f"{len(failures)} regression(s)")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,6 @@
+"""
+CineLab Suite - Headless Engine Package
+Tool engines and the batch pipeline, usable without Streamlit
+
+    python -m cinelab run --manifest jobs.jsonl --out runs/today
+"""
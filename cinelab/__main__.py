@@ -0,0 +1,174 @@
+"""
+CineLab CLI
+Headless runs of the prompt tools and Factory image generation
+
+Examples:
+    python -m cinelab run --manifest jobs.jsonl --out runs/0412
+    python -m cinelab run --input-dir refs/ --tool cinelab --params profile.json --out runs/0412
+    python -m cinelab assets --fetch-fonts
+    python -m cinelab library
+    python -m cinelab library --search "high contrast"
+"""
+
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from config.models import get_genai_backend
+from cinelab.clients import keys_from_env, make_model_factory
+from cinelab.pipeline import PROMPT_TOOLS, complete_params, load_manifest, run_pipeline, tasks_from_directory
+from services.metrics import get_metrics
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m cinelab", description=__doc__.strip().splitlines()[0])
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run = sub.add_parser("run", help="Run prompt → bridge → image for many inputs")
+    source = run.add_mutually_exclusive_group(required=True)
+    source.add_argument("--manifest", help="JSON / JSON-lines task list")
+    source.add_argument("--input-dir", help="Folder of reference images (one settings profile)")
+    run.add_argument("--tool", choices=PROMPT_TOOLS, default="cinelab", help="Tool for --input-dir")
+    run.add_argument("--params", help="JSON file with the settings profile for --input-dir")
+    run.add_argument("--out", required=True, help="Output folder (also holds progress.jsonl)")
+    run.add_argument("--workers", type=int, default=4, help="Parallel tasks")
+    run.add_argument("--images", type=int, default=1, help="Images per task (first is the master)")
+    run.add_argument("--no-images", action="store_true", help="Stop after prompt generation")
+    run.add_argument("--no-resume", action="store_true", help="Re-run tasks already marked done")
+    run.add_argument("--backend", default=None,
+                     help="'google', 'fake' or a google.generativeai-compatible module "
+                          "(default: CINELAB_GENAI_BACKEND or 'google')")
+
+    assets = sub.add_parser("assets", help="Compile the hashed CSS bundles into static/")
+    assets.add_argument("--fetch-fonts", action="store_true",
+                        help="First download the self-hosted fonts (config/assets.py FONTS) into static/fonts/")
+
+    library = sub.add_parser("library", help="Build the SQLite library snapshots (CINELAB_LIBRARY_BACKEND=sqlite)")
+    library.add_argument("files", nargs="*", help="Library files in data/ (default: every data/*.json)")
+    library.add_argument("--search", metavar="QUERY", help="Instead list the best matches across every library")
+    return parser
+
+
+def build_assets(args):
+    """Write static/css/<bundle>.<hash>.css and drop stale hashes"""
+    from services.assets import build_bundles, fetch_fonts
+
+    if args.fetch_fonts:
+        try:
+            for name in fetch_fonts():
+                print(f"font  {name}")
+        except OSError as e:
+            print(f"Font download failed ({e}); bundles fall back to local/serif fonts.", file=sys.stderr)
+    for name, (file_name, css) in build_bundles().items():
+        print(f"css   {file_name} ({len(css) / 1e3:.1f} KB)")
+    return 0
+
+
+def build_libraries(args):
+    """Write a snapshot per library file, skipping those already up to date"""
+    import hashlib
+    from services.library_db import build_snapshot, snapshot_version
+    from services.library_store import DATA_DIR, get_store
+
+    store = get_store()
+    files = args.files or sorted(name for name in os.listdir(DATA_DIR) if name.endswith(".json"))
+    for file_name in files:
+        with open(os.path.join(DATA_DIR, file_name), 'rb') as f:
+            raw = f.read()
+        version = hashlib.sha256(raw).hexdigest()
+        path = store.snapshot_path(file_name)
+        if snapshot_version(path) == version:
+            status = "up to date"
+        else:
+            build_snapshot(json.loads(raw.decode('utf-8')), version, path)
+            status = "built"
+        print(f"{status:<10} {path} ({os.path.getsize(path) / 1e6:.1f} MB)")
+    return 0
+
+
+def search_libraries(args):
+    """Print ranked library matches (what the search boxes in the app show)"""
+    from services.library_search import get_library_search, search_libraries as search
+
+    for hit in search(args.search, limit=20):
+        where = " / ".join(part for part in (hit["tool"], hit["section"], hit["group"]) if part)
+        print(f"{hit['label']:<32} {where}")
+        print(f"{'':<32} {get_library_search(hit['tool']).snippet(hit)}")
+    return 0
+
+
+def check_params(tasks):
+    """(task id, error) of prompt tasks whose settings cannot be completed"""
+    invalid = []
+    for task in tasks:
+        if task.get("tool") in PROMPT_TOOLS:
+            try:
+                complete_params(task["tool"], task.get("params", {}))
+            except ValueError as e:
+                invalid.append((task["id"], str(e)))
+    return invalid
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.command == "assets":
+        return build_assets(args)
+    if args.command == "library":
+        return search_libraries(args) if args.search else build_libraries(args)
+
+    if args.manifest:
+        tasks = load_manifest(args.manifest)
+    else:
+        params = {}
+        if args.params:
+            with open(args.params, 'r', encoding='utf-8') as f:
+                params = json.load(f)
+        tasks = tasks_from_directory(args.input_dir, args.tool, params)
+    if not tasks:
+        print("No tasks found.", file=sys.stderr)
+        return 1
+    invalid = check_params(tasks)
+    if invalid:
+        for task_id, error in invalid:
+            print(f"{task_id}: {error}", file=sys.stderr)
+        return 2
+
+    api_keys = keys_from_env()
+    if get_genai_backend(args.backend) == "google.generativeai" and not api_keys:
+        print("Set CINELAB_API_KEY / FACTORY_API_KEY in the environment.", file=sys.stderr)
+        return 2
+    model_factory, registry = make_model_factory(args.backend, api_keys)
+
+    total = len(tasks)
+    finished = [0]
+
+    def report(task, result, error):
+        finished[0] += 1
+        if error is None:
+            print(f"[{finished[0]}/{total}] ✓ {task['id']} ({result['seconds']}s)", flush=True)
+        else:
+            print(f"[{finished[0]}/{total}] ✗ {task['id']}: {error}", flush=True)
+
+    summary = run_pipeline(
+        tasks, args.out,
+        workers=args.workers,
+        model_factory=model_factory,
+        image_count=args.images,
+        generate_images=not args.no_images,
+        resume=not args.no_resume,
+        on_result=report
+    )
+    print(f"done={summary['done']} failed={summary['failed']} skipped={summary['skipped']}")
+    stats = registry.get_stats()
+    print(f"models built={stats['models_built']} reused={stats['model_reuses']}")
+    metrics = get_metrics()
+    metrics.flush()
+    print(f"stage timings → {metrics.out_dir}")
+    return 1 if summary["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,31 @@
+"""
+CineLab Clients
+Model factories for headless runs, one API key per tool
+"""
+
+import os
+
+from config.models import API_KEYS
+from services.gemini_pool import ModelRegistry
+
+
+def keys_from_env():
+    """API keys by secret name (CINELAB_API_KEY, ...) from the environment"""
+    return {name: os.environ[name] for name in API_KEYS.values() if os.environ.get(name)}
+
+
+def make_model_factory(backend, api_keys):
+    """
+    Build a model_factory for cinelab.engines that honours per-tool API keys
+
+    Args:
+        backend: google.generativeai-compatible module or its import path
+        api_keys: key values by secret name
+
+    Returns:
+        (model_factory, registry) - the registry carries construction stats
+    """
+    registry = ModelRegistry(backend)
+    for key_name, api_key in api_keys.items():
+        registry.configure(key_name, api_key)
+    return registry.model_factory, registry
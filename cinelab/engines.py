@@ -0,0 +1,102 @@
+"""
+CineLab Engines
+Prompt generation and image generation for every tool, shared by pages and the CLI
+"""
+
+import importlib
+
+from config.models import get_model
+from config.prompt_versions import get_prompt_version, get_logic_version
+from services.gemini_pool import get_registry
+from services.metrics import timer
+from services.responses import safe_extract_response
+
+# Same filters as the Factory page, in the plain form generate_content accepts
+FACTORY_SAFETY = [
+    {"category": "HARM_CATEGORY_HARASSMENT", "threshold": "BLOCK_NONE"},
+    {"category": "HARM_CATEGORY_HATE_SPEECH", "threshold": "BLOCK_NONE"},
+    {"category": "HARM_CATEGORY_SEXUALLY_EXPLICIT", "threshold": "BLOCK_NONE"},
+    {"category": "HARM_CATEGORY_DANGEROUS_CONTENT", "threshold": "BLOCK_NONE"}
+]
+
+
+def load_prompt_module(tool_name):
+    """Import the active prompt version for a tool"""
+    return importlib.import_module(f"prompts.{get_prompt_version(tool_name)}")
+
+
+def load_logic_module(logic_name):
+    """Import the active logic version"""
+    return importlib.import_module(f"logic.{get_logic_version(logic_name)}")
+
+
+def default_model_factory(tool_name, model_name, system_instruction=None):
+    """Shared GenerativeModel handle from the process-wide registry"""
+    return get_registry().model(tool_name, model_name, system_instruction)
+
+
+def _generate_text(tool_name, prompt_data, img_data, model_factory):
+    model = (model_factory or default_model_factory)(
+        tool_name, get_model(tool_name), prompt_data['system_instruction']
+    )
+    res = model.generate_content(
+        [prompt_data['user_prompt'], img_data],
+        generation_config=prompt_data['generation_config'],
+        safety_settings=prompt_data['safety_settings']
+    )
+    return res.text
+
+
+def run_cine_engine(params, img_data, model_factory=None):
+    """CineLab recipe (JSON text) for one reference image"""
+    with timer("generate_prompt", tool="cinelab", prompt_version=get_prompt_version("cinelab")):
+        prompt_data = load_prompt_module("cinelab").generate_prompt(params, img_data)
+
+    # Apply Fine Art Nude logic if needed
+    logic_module = load_logic_module("fine_art_nude")
+    genre = params.get('genre', '')
+    if logic_module.should_apply(genre):
+        with timer("apply_workaround", tool="cinelab", logic_version=get_logic_version("fine_art_nude")):
+            prompt_data['user_prompt'] = logic_module.apply_workaround(prompt_data['user_prompt'], genre)
+
+    return _generate_text("cinelab", prompt_data, img_data, model_factory)
+
+
+def run_camera_override(params, img_data, library, model_factory=None):
+    """Camera Override protocol (JSON text) for one reference image"""
+    with timer("generate_prompt", tool="camera_override", prompt_version=get_prompt_version("camera_override")):
+        prompt_data = load_prompt_module("camera_override").generate_prompt(params, img_data, library)
+    return _generate_text("camera_override", prompt_data, img_data, model_factory)
+
+
+def run_product_studio(params, img_data, library, model_factory=None):
+    """Product Studio prompt (plain text) for one reference image"""
+    with timer("generate_prompt", tool="product_studio", prompt_version=get_prompt_version("product_studio")):
+        prompt_data = load_prompt_module("product_studio").generate_prompt(params, img_data, library)
+    return _generate_text("product_studio", prompt_data, img_data, model_factory)
+
+
+def run_factory(raw_prompt, count=1, model_name=None, model_factory=None):
+    """
+    Bridge any tool output into a final prompt and generate images
+
+    Args:
+        raw_prompt: CineLab / Camera Override JSON or Product Studio text
+        count: images to generate (first is the low-temperature master)
+
+    Returns:
+        (final_prompt, list of (img_res, text_res, mime) per image)
+    """
+    with timer("prepare_for_generation", tool="factory", logic_version=get_logic_version("factory_bridge")):
+        final_prompt = load_logic_module("factory_bridge").prepare_for_generation(raw_prompt)
+    model = (model_factory or default_model_factory)("factory", model_name or get_model("factory"))
+
+    results = []
+    for i in range(count):
+        response = model.generate_content(
+            final_prompt,
+            safety_settings=FACTORY_SAFETY,
+            generation_config={"temperature": 0.2 if i == 0 else 0.9}
+        )
+        results.append(safe_extract_response(response))
+    return final_prompt, results
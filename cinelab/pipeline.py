@@ -0,0 +1,247 @@
+"""
+CineLab Pipeline
+Reference image → tool prompt → factory bridge → images, for many inputs at once
+"""
+
+import json
+import mimetypes
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from cinelab import engines
+from services.image_prep import prepare_image
+from services.library_index import get_cinelab_index
+from services.library_store import get_library
+
+PROMPT_TOOLS = ("cinelab", "camera_override", "product_studio")
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.webp')
+
+# Fixed defaults of the pages' widgets. Camera, lens, genre, artist and
+# scenario default to the first option of the library index instead, as the
+# selectors do (see complete_params).
+DEFAULT_PARAMS = {
+    "cinelab": {
+        "f_stop": "f/1.2", "iso": "50", "ratio": "4:5",
+        "category": "Studio", "light_details": "", "notes": ""
+    },
+    "camera_override": {
+        "camera_angle": "eye_level", "shot_scale": "full_shot",
+        "lens": "50mm_natural", "aspect_ratio": "16:9"
+    },
+    "product_studio": {"photographer": None}
+}
+
+# Keys each prompt module reads; complete_params fails with their names instead of a KeyError
+REQUIRED_PARAMS = {
+    "cinelab": ("cam", "cam_info", "lens", "lens_info", "f_stop", "iso", "ratio", "artist", "genre",
+                "category", "scenario", "light_details", "notes"),
+    "camera_override": ("camera_angle", "shot_scale", "lens", "aspect_ratio"),
+    "product_studio": ("user_text",)
+}
+
+
+def load_manifest(path):
+    """
+    Read tasks from a JSON list or JSON-lines file
+
+    Each task: {"id", "tool", "image", "params"} for prompt tools, or
+    {"id", "tool": "factory", "prompt"} to only generate images.
+    Relative image paths are resolved against the manifest's folder.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        text = f.read()
+    stripped = text.lstrip()
+    if stripped.startswith('['):
+        tasks = json.loads(stripped)
+    else:
+        tasks = [json.loads(line) for line in text.splitlines() if line.strip()]
+
+    base = os.path.dirname(os.path.abspath(path))
+    for n, task in enumerate(tasks):
+        task.setdefault("id", f"task_{n + 1:04d}")
+        if task.get("image") and not os.path.isabs(task["image"]):
+            task["image"] = os.path.join(base, task["image"])
+    return tasks
+
+
+def tasks_from_directory(input_dir, tool_name, params):
+    """One task per image in a folder, all sharing one settings profile"""
+    tasks = []
+    for name in sorted(os.listdir(input_dir)):
+        if name.lower().endswith(IMAGE_EXTENSIONS):
+            tasks.append({
+                "id": os.path.splitext(name)[0],
+                "tool": tool_name,
+                "image": os.path.join(input_dir, name),
+                "params": dict(params)
+            })
+    return tasks
+
+
+def _first(options):
+    return options[0] if options else None
+
+
+def missing_params(tool_name, params):
+    """Required keys absent from (already completed) params"""
+    return [key for key in REQUIRED_PARAMS.get(tool_name, ()) if key not in params]
+
+
+def complete_params(tool_name, params):
+    """
+    Fill defaults and library-derived fields the pages normally compute
+
+    Raises:
+        ValueError: naming the keys that are still missing
+    """
+    full = dict(DEFAULT_PARAMS.get(tool_name, {}), **params)
+    if tool_name == "cinelab":
+        idx = get_cinelab_index("cinelab")
+        # Unset selectors start on their first option, as in the Prompt Generator
+        full.setdefault("cam", _first(idx.cameras))
+        full.setdefault("lens", _first(idx.lenses))
+        full.setdefault("genre", _first(idx.genres))
+        full.setdefault("artist", _first(idx.artists.get(full["genre"], ())))
+        full.setdefault("scenario", _first(idx.presets.get(full["category"], ())) or "")
+        full.setdefault("cam_info", idx.camera_info.get(full["cam"], ""))
+        full.setdefault("lens_info", idx.lens_info.get(full["lens"], ""))
+        if not full["light_details"] and full["scenario"]:
+            full["light_details"] = f"Preset: {full['scenario']}."
+    missing = missing_params(tool_name, full)
+    if missing:
+        raise ValueError(f"missing params: {', '.join(missing)}")
+    return full
+
+
+class ProgressLog:
+    """Append-only JSON-lines record of finished tasks, used to resume runs"""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def completed(self):
+        """Ids of tasks that already finished successfully"""
+        done = set()
+        if os.path.exists(self.path):
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue        # Torn last line from an interrupted run
+                    if record.get("status") == "done":
+                        done.add(record["id"])
+        return done
+
+    def record(self, **fields):
+        line = json.dumps(dict(fields, at=time.time()), ensure_ascii=False) + "\n"
+        with self._lock:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+
+
+def _write(path, data):
+    tmp = path + ".part"
+    mode, encoding = ('wb', None) if isinstance(data, bytes) else ('w', 'utf-8')
+    with open(tmp, mode, encoding=encoding) as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def run_task(task, out_dir, model_factory=None, image_count=1, generate_images=True):
+    """
+    Run one task end to end, writing outputs into out_dir/<id>/
+
+    Returns:
+        dict summary (files written, seconds)
+    """
+    tool_name = task["tool"]
+    task_dir = os.path.join(out_dir, task["id"])
+    os.makedirs(task_dir, exist_ok=True)
+    started = time.perf_counter()
+    files = []
+
+    if tool_name in PROMPT_TOOLS:
+        with open(task["image"], 'rb') as f:
+            raw = f.read()
+        mime = mimetypes.guess_type(task["image"])[0] or "image/jpeg"
+        img_data = prepare_image(raw, mime, tool_name)["img_data"]
+        params = complete_params(tool_name, task.get("params", {}))
+
+        if tool_name == "cinelab":
+            prompt = engines.run_cine_engine(params, img_data, model_factory)
+        elif tool_name == "camera_override":
+            prompt = engines.run_camera_override(params, img_data, get_library(tool_name), model_factory)
+        else:
+            prompt = engines.run_product_studio(params, img_data, get_library(tool_name), model_factory)
+
+        prompt_file = "prompt.txt" if tool_name == "product_studio" else "prompt.json"
+        _write(os.path.join(task_dir, prompt_file), prompt)
+        files.append(prompt_file)
+    elif tool_name == "factory":
+        prompt = task["prompt"]
+    else:
+        raise ValueError(f"Unknown tool: {tool_name}")
+
+    if generate_images:
+        final_prompt, results = engines.run_factory(
+            prompt, count=task.get("images", image_count), model_factory=model_factory
+        )
+        _write(os.path.join(task_dir, "final_prompt.txt"), final_prompt)
+        files.append("final_prompt.txt")
+        for i, (img_res, text_res, mime) in enumerate(results, start=1):
+            if img_res:
+                ext = mimetypes.guess_extension(mime) or ".png"
+                name = f"image_{i}{ext}"
+                _write(os.path.join(task_dir, name), img_res[1])
+            else:
+                name = f"image_{i}.error.txt"
+                _write(os.path.join(task_dir, name), text_res or "Blocked")
+            files.append(name)
+
+    return {"files": files, "seconds": round(time.perf_counter() - started, 3)}
+
+
+def run_pipeline(tasks, out_dir, workers=4, model_factory=None, image_count=1,
+                 generate_images=True, resume=True, on_result=None):
+    """
+    Run tasks in parallel, writing each result as soon as it completes
+
+    Args:
+        resume: skip tasks already marked done in out_dir/progress.jsonl
+        on_result: optional callback(task, summary_or_None, error_or_None)
+
+    Returns:
+        dict with done / failed / skipped counts
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    progress = ProgressLog(os.path.join(out_dir, "progress.jsonl"))
+    done_ids = progress.completed() if resume else set()
+    pending = [t for t in tasks if t["id"] not in done_ids]
+    summary = {"done": 0, "failed": 0, "skipped": len(tasks) - len(pending)}
+
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="cinelab-run") as pool:
+        futures = {
+            pool.submit(run_task, task, out_dir, model_factory, image_count, generate_images): task
+            for task in pending
+        }
+        for future in as_completed(futures):
+            task = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                summary["failed"] += 1
+                progress.record(id=task["id"], status="failed", error=str(e))
+                if on_result:
+                    on_result(task, None, e)
+            else:
+                summary["done"] += 1
+                progress.record(id=task["id"], status="done", **result)
+                if on_result:
+                    on_result(task, result, None)
+    return summary
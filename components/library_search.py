@@ -0,0 +1,98 @@
+"""
+Library Search Component
+One search box over whole libraries; picking a match fills in the tool's selectors
+"""
+
+import streamlit as st
+
+from config.libraries import SEARCH_LIMIT
+from components.selectors import fragment
+from services.library_search import get_library_search, search_libraries
+from services.metrics import timer
+
+# Page a match is opened in from the landing page
+TOOL_PAGES = {
+    "cinelab": "pages/1_#L01f3a8_Prompt_Generator.py",
+    "camera_override": "pages/3_#L01f4d0_Camera_Override.py",
+    "product_studio": "pages/4_#L01f48e_Product_Studio.py"
+}
+
+TOOL_NAMES = {"cinelab": "Prompt Generator", "camera_override": "Camera Override", "product_studio": "Product Studio"}
+
+# tool -> section -> (session key of the group selector, session key of the entry selector)
+SELECTOR_KEYS = {
+    "cinelab": {
+        "cameras": (None, "cinelab_camera"),
+        "lenses": (None, "cinelab_lens"),
+        "photographers": ("cinelab_genre", "cinelab_artist_{group}"),
+        "lighting_presets": ("cinelab_light_type", "cinelab_preset_{group}")
+    },
+    "camera_override": {
+        "camera_angles": (None, "selected_angle"),
+        "shot_scales": (None, "selected_scale"),
+        "lenses": (None, "selected_lens"),
+        "aspect_ratios": (None, "selected_ratio")
+    },
+    "product_studio": {
+        "photographers": ("product_genre", "product_photographer_{group}")
+    }
+}
+
+
+def pick(hit):
+    """Point the selectors of the hit's tool at it (session state only)"""
+    group_key, entry_key = SELECTOR_KEYS[hit["tool"]][hit["section"]]
+    if group_key:
+        st.session_state[group_key] = hit["group"]
+    # Aspect ratio buttons hold the ratio itself ("16:9"), not the entry name
+    value = hit["label"].split()[0] if hit["section"] == "aspect_ratios" else hit["name"]
+    st.session_state[entry_key.format(group=hit["group"])] = value
+
+
+def _where(hit, with_tool):
+    where = hit["section"].replace("_", " ").title()
+    if hit["group"]:
+        where = f"{where} · {hit['group']}"
+    return f"{where} · {TOOL_NAMES[hit['tool']]}" if with_tool else where
+
+
+@fragment
+def render_library_search(key, tool_names=None, open_page=False):
+    """
+    Search box listing ranked matches across the libraries, each with a pick button
+
+    Typing reruns only this fragment; a pick sets the selectors and reruns
+    the page (or opens the tool's page).
+
+    Args:
+        key: widget key prefix
+        tool_names: tools whose libraries and selectors are searched (default: both library files)
+        open_page: switch to the tool's page after a pick (landing page)
+    """
+    tool_names = tool_names or ("cinelab", "camera_override")
+    query = st.text_input(
+        "Search library", key=f"{key}_query",
+        placeholder="🔎 Search cameras, lenses, photographers, lighting, angles...", label_visibility="collapsed"
+    )
+    if not query.strip():
+        return
+    with timer("library_search"):
+        hits = sorted(
+            (hit for tool_name in tool_names
+             for hit in search_libraries(query, [tool_name], tuple(SELECTOR_KEYS[tool_name]))),
+            key=lambda hit: hit["score"]
+        )[:SEARCH_LIMIT]
+    if not hits:
+        st.caption("No match")
+        return
+    for i, hit in enumerate(hits):
+        c1, c2 = st.columns([5, 1])
+        with c1:
+            st.markdown(f"**{hit['label']}** · {_where(hit, len(tool_names) > 1)}")
+            st.caption(get_library_search(hit["tool"]).snippet(hit))
+        with c2:
+            if st.button("Open" if open_page else "Use", key=f"{key}_pick_{i}", use_container_width=True):
+                pick(hit)
+                if open_page:
+                    st.switch_page(TOOL_PAGES[hit["tool"]])
+                st.rerun()
@@ -0,0 +1,63 @@
+"""
+Output Panel Component
+Result panels that rerun on their own, with download payloads built on click
+"""
+
+import inspect
+import time
+
+import streamlit as st
+
+from services.result_history import get_result_history
+
+# Deferred downloads (callable data) and on_click="ignore" are newer Streamlit
+# features; without them the payload is built eagerly / the click reruns the
+# fragment (components.selectors.fragment) it sits in
+try:
+    from streamlit.runtime.media_file_manager import MediaFileManager
+    _DEFERRED = hasattr(MediaFileManager, "add_deferred")
+except ImportError:
+    _DEFERRED = False
+_IGNORE = "ignore" in str(inspect.signature(st.download_button).parameters["on_click"].annotation)
+
+
+def render_download(label, build, file_name, mime, key=None):
+    """
+    Full-width download button whose payload is produced only when clicked
+
+    Args:
+        label: button text
+        build: zero-argument callable returning the file contents (str or bytes).
+            It runs outside the script run, so bind values instead of reading
+            st.session_state inside it.
+        file_name: suggested file name
+        mime: MIME type
+        key: optional widget key
+    """
+    kwargs = {"file_name": file_name, "mime": mime, "key": key, "use_container_width": True}
+    if _IGNORE:
+        kwargs["on_click"] = "ignore"
+    return st.download_button(label, build if _DEFERRED else build(), **kwargs)
+
+
+def pick_result(tool_name, latest):
+    """
+    Picker over this session's stored results for a tool, newest first
+
+    Shown only once there is more than one; a new result resets it to the newest.
+
+    Args:
+        tool_name: tool the results were stored under
+        latest: handle of the most recent result (st.session_state)
+
+    Returns:
+        handle of the result to show
+    """
+    entries = get_result_history().entries(tool_name)
+    if len(entries) < 2:
+        return latest
+    labels = {
+        e["handle"]: f"{time.strftime('%H:%M:%S', time.localtime(e['created_at']))} · {e['size'] / 1e3:.1f} KB"
+        for e in entries
+    }
+    return st.selectbox("🕘 This session", list(labels), format_func=labels.get)
@@ -0,0 +1,88 @@
+"""
+Single-Widget Selector Component
+Keyed choice pickers that rerun only their own fragment, and type-ahead
+selectboxes for catalogues too large to send as one option list
+"""
+
+import inspect
+
+import streamlit as st
+
+from config.libraries import SELECT_LIMIT
+from services.library_index import search_options
+
+# st.fragment (1.37+) / st.experimental_fragment (1.33-1.36); before that the
+# decorated block simply runs as part of the full script
+fragment = getattr(st, "fragment", None) or getattr(st, "experimental_fragment", None) or (lambda fn: fn)
+
+_SEGMENTED = getattr(st, "segmented_control", None)
+_REQUIRED = _SEGMENTED is not None and "required" in inspect.signature(_SEGMENTED).parameters
+
+
+def _keep_selection(key, widget_key):
+    # Without required=True, clicking the active segment clears the selection
+    if st.session_state.get(widget_key) is not None:
+        st.session_state[key] = st.session_state[widget_key]
+
+
+def render_choice(label, options, key, format_func=str):
+    """
+    Render one always-selected choice bound to st.session_state[key]
+
+    Segmented control where available (horizontal radio before 1.40). The
+    widget has its own key and is seeded from st.session_state[key] on every
+    run, with changes copied back, so the selection survives pages where the
+    widget is not rendered (Streamlit drops widget state there). Seed
+    st.session_state[key] before the first render instead of passing a default.
+
+    Args:
+        label: accessible label (hidden; pages show their own section title)
+        options: option values
+        key: session state key holding the selection
+        format_func: option value -> button text
+    """
+    widget_key = f"_{key}_choice"
+    st.session_state[widget_key] = st.session_state.get(key)
+    kwargs = {"key": widget_key, "format_func": format_func, "label_visibility": "collapsed",
+              "on_change": _keep_selection, "args": (key, widget_key)}
+    if _SEGMENTED is None:
+        return st.radio(label, options, horizontal=True, **kwargs)
+    if _REQUIRED:
+        return _SEGMENTED(label, options, required=True, **kwargs)
+    return _SEGMENTED(label, options, **kwargs)
+
+
+def render_search_select(label, options, key, limit=SELECT_LIMIT, search=None, label_visibility="collapsed"):
+    """
+    Selectbox that stays small however many options there are
+
+    Up to `limit` options it is a plain selectbox. Beyond that a search box
+    appears above it and the selectbox lists only the best `limit` matches
+    (plus the current choice), so a rerun never ships the whole catalogue.
+
+    Args:
+        label: selectbox label
+        options: sorted option tuple
+        key: session state key holding the selection
+        limit: most options sent to the browser
+        search: (options, query, limit) -> matching options, e.g.
+            LibrarySearch.searcher(section); default: search_options
+        label_visibility: as for st.selectbox
+
+    Returns:
+        selected option (None when nothing matches)
+    """
+    if len(options) <= limit:
+        return st.selectbox(label, options, key=key, label_visibility=label_visibility)
+    query = st.text_input(
+        f"Search {label}", key=f"{key}_query",
+        placeholder=f"🔎 Search {len(options):,} {label.lower()}...", label_visibility="collapsed"
+    )
+    matches = (search or search_options)(options, query, limit)
+    current = st.session_state.get(key)
+    if current is not None and current not in matches and current in options:
+        matches = [current] + matches[:limit - 1]
+    if not matches:
+        st.caption("No match")
+        return None
+    return st.selectbox(label, matches, key=key, label_visibility=label_visibility)
@@ -0,0 +1,238 @@
+"""
+CineLab Suite - Stylesheets
+Theme, component and page CSS, compiled into hashed bundles by services/assets.py
+"""
+
+from config.colors import theme_css
+
+NAVBAR_CSS = """
+/* Tool pages show the CineLab navbar in place of Streamlit's header */
+header {visibility: hidden;}
+
+.cinelab-navbar {
+    display: flex;
+    justify-content: space-between;
+    align-items: center;
+    padding: 1.2rem 2rem;
+    background-color: rgba(34, 33, 33, 0.95);
+    backdrop-filter: blur(10px);
+    border-bottom: 1px solid rgba(48, 54, 61, 0.5);
+    position: sticky;
+    top: 0;
+    z-index: 1000;
+}
+
+.cinelab-logo {
+    font-size: 1.4rem;
+    font-weight: 700;
+    letter-spacing: 2px;
+    color: #F9FEFF;
+    text-transform: uppercase;
+    cursor: pointer;
+    text-decoration: none;
+}
+
+.cinelab-logo:hover {
+    color: #F7BE14;
+    transition: color 0.3s ease;
+}
+
+.cinelab-nav-links {
+    display: flex;
+    gap: 2rem;
+    align-items: center;
+}
+
+.cinelab-nav-link {
+    color: #CCD4D7;
+    text-decoration: none;
+    font-size: 0.9rem;
+    font-weight: 500;
+    text-transform: uppercase;
+    letter-spacing: 1px;
+    padding: 0.5rem 1rem;
+    border-radius: 4px;
+    transition: all 0.3s ease;
+}
+
+.cinelab-nav-link:hover {
+    color: #F7BE14;
+    background-color: rgba(247, 190, 20, 0.1);
+}
+
+.cinelab-nav-link.active {
+    color: #F7BE14;
+    font-weight: 700;
+}
+
+/* Light theme */
+@media (prefers-color-scheme: light) {
+    .cinelab-navbar {
+        background-color: rgba(249, 254, 255, 0.95);
+        border-bottom-color: rgba(224, 224, 224, 0.5);
+    }
+
+    .cinelab-logo {
+        color: #222121;
+    }
+
+    .cinelab-logo:hover {
+        color: #F7BE14;
+    }
+
+    .cinelab-nav-link {
+        color: #666666;
+    }
+
+    .cinelab-nav-link:hover {
+        color: #F7BE14;
+    }
+
+    .cinelab-nav-link.active {
+        color: #F7BE14;
+    }
+}
+"""
+
+BACK_BUTTON_CSS = """
+/* Back button styling */
+.back-btn-container {
+    padding: 1rem 0 0.5rem 0;
+    margin-bottom: 1rem;
+}
+
+.back-btn-container .stButton > button {
+    background-color: #222121 !important;
+    color: #F9FEFF !important;
+    border: none !important;
+    padding: 0.6rem 1.5rem !important;
+    border-radius: 6px !important;
+    font-size: 0.85rem !important;
+    font-weight: 600 !important;
+    text-transform: uppercase !important;
+    letter-spacing: 1px !important;
+    height: auto !important;
+}
+
+/* Light theme */
+@media (prefers-color-scheme: light) {
+    .back-btn-container .stButton > button {
+        background-color: #222121 !important;
+        color: #F9FEFF !important;
+    }
+}
+"""
+
+# Landing page (app.py); Playfair Display is self-hosted, see FONTS in config/assets.py
+HOME_CSS = """
+/* Hero title with Playfair Display */
+.hero-title {
+    font-family: 'Playfair Display', serif !important;
+    font-size: 5rem;
+    font-weight: 700;
+    text-align: center;
+    margin-bottom: 1.5rem;
+    color: #F9FEFF;
+    letter-spacing: 2px;
+}
+
+.hero-subtitle {
+    text-align: center;
+    font-size: 1.2rem;
+    color: #CCD4D7;
+    font-weight: 300;
+    letter-spacing: 1px;
+    margin-bottom: 4rem;
+}
+
+/* Tool buttons - 2x2 grid styling */
+.stButton > button {
+    background-color: #222121 !important;
+    color: #F9FEFF !important;
+    border: 1px solid transparent !important;
+    padding: 3rem 2rem !important;
+    border-radius: 8px !important;
+    font-size: 1.1rem !important;
+    font-weight: 600 !important;
+    text-transform: uppercase !important;
+    letter-spacing: 2px !important;
+    width: 100% !important;
+    height: auto !important;
+}
+
+/* Light theme */
+@media (prefers-color-scheme: light) {
+    .hero-title {
+        color: #222121 !important;
+    }
+
+    .hero-subtitle {
+        color: #666666 !important;
+    }
+
+    .stButton > button {
+        background-color: #F9FEFF !important;
+        color: #222121 !important;
+        border: 1px solid transparent !important;
+    }
+}
+"""
+
+# Camera Override section titles and readouts (pages/3_📐_Camera_Override.py)
+CAMERA_OVERRIDE_CSS = """
+/* Section Headers */
+.section-title {
+    color: #CCD4D7;
+    font-size: 0.9rem;
+    font-weight: 700;
+    text-transform: uppercase;
+    letter-spacing: 2px;
+    margin: 2.5rem 0 0.5rem 0;
+    padding-bottom: 0.5rem;
+    border-bottom: 1px solid #30363d;
+}
+
+@media (prefers-color-scheme: light) {
+    .section-title {
+        color: #666666;
+        border-bottom-color: #e0e0e0;
+    }
+}
+
+/* Description text */
+.description-text {
+    color: #a3a3a3;
+    font-size: 0.8rem;
+    margin: 0.5rem 0 1rem 0;
+    font-style: italic;
+}
+
+/* Aspect Ratio Display */
+.ratio-display {
+    background-color: #161b22;
+    border: 1px solid #30363d;
+    border-radius: 6px;
+    padding: 0.8rem;
+    text-align: center;
+    font-size: 1rem;
+    color: #F9FEFF;
+    margin: 1rem 0;
+}
+
+@media (prefers-color-scheme: light) {
+    .ratio-display {
+        background-color: white;
+        border-color: #e0e0e0;
+        color: #222121;
+    }
+}
+"""
+
+# Bundle name -> stylesheets, in cascade order. "cinelab" is linked on every page,
+# "navbar" on the tool pages (not the landing page).
+BUNDLES = {
+    "cinelab": (theme_css(),),
+    "navbar": (NAVBAR_CSS, BACK_BUTTON_CSS),
+    "home": (HOME_CSS,),
+    "camera_override": (CAMERA_OVERRIDE_CSS,)
+}
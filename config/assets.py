@@ -0,0 +1,28 @@
+"""
+CineLab Suite - Static Asset Configuration
+Where compiled stylesheets and self-hosted fonts live and how pages link them
+"""
+
+import os
+
+# Streamlit serves <app dir>/static/ at app/static/ when server.enableStaticServing
+# is on (see .streamlit/config.toml)
+STATIC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'static'))
+STATIC_URL = "app/static"
+
+ASSETS = {
+    # auto: <link> the static bundle when static serving can deliver text/css,
+    # otherwise inline it; static / inline force one or the other
+    "mode": os.environ.get("CINELAB_CSS", "auto"),
+    "css_dir": "css",
+    "fonts_dir": "fonts"
+}
+
+# Self-hosted web fonts: family -> weights, fetched once (latin subset) with
+#   python -m cinelab assets --fetch-fonts
+# Their @font-face rules go in the "home" bundle (the landing page hero); a missing
+# file just falls back to the next font in the CSS stack, no remote request.
+FONTS = {
+    "Playfair Display": (400, 700)
+}
+FONTS_CSS_URL = "https://fonts.googleapis.com/css2?family={family}:wght@{weights}&display=swap"
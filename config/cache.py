@@ -0,0 +1,39 @@
+"""
+CineLab Suite - Cache Configuration
+Where cached model responses live and how long they are kept
+"""
+
+import os
+
+# Root for all local on-disk state (cache, spill files, history)
+STATE_DIR = os.environ.get(
+    "CINELAB_STATE_DIR",
+    os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '.cache'))
+)
+
+# Prompt-generation response cache
+RESPONSE_CACHE = {
+    "path": os.path.join(STATE_DIR, "responses.sqlite3"),
+    "max_bytes": 256 * 1024 * 1024,      # LRU eviction above this size
+    "ttl_seconds": 7 * 24 * 3600         # Entries older than this are misses
+}
+
+# Per-session result history (recipes, prompts, Factory images)
+RESULT_HISTORY = {
+    "dir": os.path.join(STATE_DIR, "spill"),
+    "inline_bytes": 32 * 1024,              # Larger payloads go straight to disk
+    "memory_bytes": 256 * 1024,             # Per session in memory; least recently used spill above this
+    "session_bytes": 64 * 1024 * 1024,      # Per session, memory + disk; least recently used evicted
+    "global_bytes": 1024 * 1024 * 1024,     # All sessions together
+    "max_items": 50,                        # Per session
+    "session_ttl": 6 * 3600                 # Sessions idle this long are dropped (and stale spill dirs removed)
+}
+
+# Persistent generation history (all tools, all sessions) for the History page
+GENERATION_HISTORY = {
+    "path": os.path.join(STATE_DIR, "history.sqlite3"),
+    "max_bytes": 512 * 1024 * 1024,         # Oldest runs are deleted above this size
+    "compress_level": 6,                    # zlib level for params and text outputs
+    "store_images": os.environ.get("CINELAB_HISTORY_IMAGES", "1") != "0",   # Factory images
+    "page_size": 25                         # Runs per History page
+}
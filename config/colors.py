@@ -25,14 +25,12 @@ LIGHT_THEME = {
     "slider": "#F7BE14"
 }
 
-def get_theme_css():
-    """Returns complete CSS for both themes with animated gradient"""
+def theme_css():
+    """Stylesheet for both themes with animated gradient (bundled into static/css/)"""
     return f"""
-    <style>
     /* Global Styles */
     #MainMenu {{visibility: hidden;}}
     footer {{visibility: hidden;}}
-    header {{visibility: hidden;}}
     
     .block-container {{
         padding-top: 1.5rem !important;
@@ -155,5 +153,9 @@ def get_theme_css():
             color: {LIGHT_THEME['text_secondary']};
         }}
     }}
-    </style>
     """
+
+
+def get_theme_css():
+    """Returns complete CSS for both themes with animated gradient"""
+    return f"<style>{theme_css()}</style>"
@@ -0,0 +1,19 @@
+"""
+CineLab Suite - Reference Image Settings
+How uploads are downscaled and re-encoded before they are sent to a model
+"""
+
+# Longest edge (px) sent to the model, per tool
+IMAGE_MAX_EDGE = {
+    "cinelab": 1536,           # Subject/pose analysis
+    "camera_override": 2048,   # Architectural detail matters
+    "product_studio": 2048     # Logos and fine product detail
+}
+
+# Re-encode settings
+JPEG_QUALITY = 90
+WEBP_QUALITY = 90              # Used for images with transparency
+
+def get_max_edge(tool_name):
+    """Get max image edge for specific tool"""
+    return IMAGE_MAX_EDGE.get(tool_name, 1536)
@@ -0,0 +1,41 @@
+"""
+CineLab Suite - Library Configuration
+Which data file each tool reads, how it is served and how often it is checked for edits
+"""
+
+import os
+
+from config.cache import STATE_DIR
+
+# Tool to Library Mapping (files live in data/)
+TOOL_LIBRARY_MAP = {
+    "cinelab": "cinelab_library.json",
+    "camera_override": "camera_override_library.json",
+    "product_studio": "cinelab_library.json"     # Photographer styles only
+}
+
+# Seconds between mtime checks of a loaded library.
+# Reruns inside this window are served from memory without touching disk.
+LIBRARY_CHECK_INTERVAL = 2.0
+
+# How a library is served:
+#   json   - parsed into memory as one frozen tree (fine for the bundled files)
+#   sqlite - indexed snapshot of the same JSON, entries read on demand; for
+#            catalogues with tens of thousands of entries
+# Snapshots are (re)built from data/*.json when missing or out of date, or
+# ahead of time with: python -m cinelab library
+LIBRARY_BACKEND = os.environ.get("CINELAB_LIBRARY_BACKEND", "json")
+LIBRARY_SNAPSHOT_DIR = os.path.join(STATE_DIR, "libraries")
+
+# Selectors with more options than this get a type-ahead search box and
+# show only the best matches
+SELECT_LIMIT = 200
+
+# Library search (services/library_search.py): entry text indexed besides
+# the entry name, and how many ranked matches a search returns
+SEARCH_FIELDS = ("ui_label", "ui_description", "style", "lighting", "vibe", "info", "character", "result")
+SEARCH_LIMIT = 8
+
+def get_library_file(tool_name):
+    """Get library file name for specific tool"""
+    return TOOL_LIBRARY_MAP.get(tool_name, "cinelab_library.json")
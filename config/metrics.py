@@ -0,0 +1,34 @@
+"""
+CineLab Suite - Metrics Configuration
+Stage timing histograms and where they are exported
+"""
+
+import os
+
+from config.cache import STATE_DIR
+
+METRICS = {
+    "enabled": os.environ.get("CINELAB_METRICS", "1") != "0",
+    "dir": os.path.join(STATE_DIR, "metrics"),
+    "flush_interval": 30.0,        # Seconds between exports (checked on each observation)
+    "max_buffered_events": 5000    # Events beyond this are dropped until the next flush
+}
+
+# Histogram bucket upper bounds in seconds (+Inf is implicit)
+LATENCY_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+    1.0, 2.5, 5.0, 10.0, 30.0, 60.0
+)
+
+# Opt-in rerun profiler: CINELAB_PROFILE=1 for timings, element counts, payload
+# bytes and cProfile dumps on every rerun; "mem" adds tracemalloc snapshots.
+# CINELAB_PROFILE=query lets a tab opt in with ?profile=1 (cProfile only - the
+# URL can never start process-wide tracemalloc); otherwise the param is ignored.
+PROFILER = {
+    "mode": os.environ.get("CINELAB_PROFILE", ""),
+    "query_param": "profile",
+    "query_mode": "query",
+    "dir": os.path.join(STATE_DIR, "profiles"),
+    "keep_slowest": 5,             # Dumps kept per page (slowest reruns only)
+    "history": 200                 # Reruns kept in memory per page for the summary
+}
@@ -3,6 +3,9 @@ CineLab Suite - Model & API Configuration
 Manage model versions and API keys
 """
 
+import json
+import os
+
 # Model Assignments
 MODELS = {
     "cinelab": "gemini-2.0-flash-exp",           # API 1 - Prompt generation
@@ -25,6 +28,49 @@ TOOL_API_MAP = {
     "factory": "api_2"
 }
 
+# Max in-flight requests per API key, shared by every session in the process
+CONCURRENCY_LIMITS = {
+    "api_1": 4,
+    "api_2": 4
+}
+
+# Request (RPM) and token (TPM) budgets per API key, shared by every session
+RATE_LIMITS = {
+    "api_1": {"rpm": 15, "tpm": 1_000_000},
+    "api_2": {"rpm": 10, "tpm": 1_000_000}
+}
+
+# google.generativeai-compatible backend used by the model registry
+# (CINELAB_GENAI_BACKEND may be an alias below or a module path)
+GENAI_BACKENDS = {
+    "google": "google.generativeai",
+    "fake": "services.fake_genai"     # Local stand-in: no keys, no network
+}
+GENAI_BACKEND = os.environ.get("CINELAB_GENAI_BACKEND", "google")
+
+# Behaviour of the fake backend (override with CINELAB_FAKE_GENAI='{"errors": {...}}')
+FAKE_GENAI = {
+    "latency": {                      # Seconds per generate_content call
+        "text": {"distribution": "lognormal", "median": 2.0, "sigma": 0.4},
+        "image": {"distribution": "lognormal", "median": 8.0, "sigma": 0.3}
+    },
+    "errors": {                       # Probability per call
+        "rate_limit": 0.0,            # 429 ResourceExhausted
+        "server_error": 0.0,          # 500 InternalServerError
+        "unavailable": 0.0,           # 503 ServiceUnavailable
+        "blocked": 0.0                # No candidates, block_reason=SAFETY
+    },
+    "retry_after": 2.0,               # Hint carried by injected 429s
+    "image_size": 768,                # Edge of synthetic PNGs
+    "seed": None                      # Fix for reproducible runs
+}
+FAKE_GENAI.update(json.loads(os.environ.get("CINELAB_FAKE_GENAI", "{}")))
+
+def get_genai_backend(name=None):
+    """Resolve a backend alias or module path (default: GENAI_BACKEND)"""
+    name = name or GENAI_BACKEND
+    return GENAI_BACKENDS.get(name, name)
+
 def get_model(tool_name):
     """Get model for specific tool"""
     return MODELS.get(tool_name, "gemini-2.0-flash-exp")
@@ -33,3 +79,13 @@ def get_api_key_name(tool_name):
     """Get API key secret name for specific tool"""
     api = TOOL_API_MAP.get(tool_name, "api_1")
     return API_KEYS[api]
+
+def get_concurrency_limit(tool_name):
+    """Get max in-flight requests for the API key used by specific tool"""
+    api = TOOL_API_MAP.get(tool_name, "api_1")
+    return CONCURRENCY_LIMITS.get(api, 1)
+
+def get_rate_limit(tool_name):
+    """Get RPM/TPM budget for the API key used by specific tool"""
+    api = TOOL_API_MAP.get(tool_name, "api_1")
+    return RATE_LIMITS.get(api, {"rpm": 15, "tpm": None})
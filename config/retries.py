@@ -0,0 +1,35 @@
+"""
+CineLab Suite - Retry Configuration
+How transient model errors are retried and when slow calls are hedged
+"""
+
+# Shared by every tool unless overridden below
+RETRY_POLICY = {
+    "max_attempts": 4,          # First call + up to 3 retries
+    "base_delay": 1.0,          # Backoff: random(0, base * 2^n), capped at max_delay
+    "max_delay": 20.0,
+    "max_retry_after": 60.0,    # Server asks for a longer pause → give up instead
+    "deadline": 120.0,          # No new attempt starts after this many seconds
+    "hedge": False,             # Fire a second attempt when the first is slow
+    "hedge_percentile": 95,     # ... slower than this latency percentile
+    "hedge_min_samples": 20     # Latencies observed before hedging kicks in
+}
+
+# Prompt generation is cheap text output - hedge it; image generation is not
+TOOL_RETRY_OVERRIDES = {
+    "cinelab": {"hedge": True},
+    "camera_override": {"hedge": True},
+    "product_studio": {"hedge": True},
+    "factory": {"max_attempts": 3}
+}
+
+# Retries + hedges allowed per API key: `ratio` per first attempt,
+# plus a floor of `min_per_minute` so quiet periods can still retry
+RETRY_BUDGET = {
+    "ratio": 0.2,
+    "min_per_minute": 10
+}
+
+def get_retry_policy(tool_name):
+    """Get retry/hedge policy for specific tool"""
+    return {**RETRY_POLICY, **TOOL_RETRY_OVERRIDES.get(tool_name, {})}
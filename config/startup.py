@@ -0,0 +1,13 @@
+"""
+CineLab Suite - Startup Configuration
+Background warm-up started by the first page load in the server process
+"""
+
+import os
+
+# Steps run in order on one daemon thread; each is timed as stage "warmup".
+# CINELAB_WARMUP=0 disables it (pages then pay each cost on first use).
+WARMUP = {
+    "enabled": os.environ.get("CINELAB_WARMUP", "1") != "0",
+    "steps": ("sdk", "pillow", "libraries", "modules", "clients", "response_cache", "generation_history")
+}
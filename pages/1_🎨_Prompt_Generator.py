@@ -1,104 +1,167 @@
 import streamlit as st
-import google.generativeai as genai
-import json
 import os
 import sys
-import importlib
+import time
 
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from config.colors import get_theme_css
-from config.models import get_model, get_api_key_name
-from config.prompt_versions import get_prompt_version, get_logic_version
+from config.models import get_api_key_name
 from components.navbar import render_navbar
+from components.library_search import render_library_search
+from components.outputs import pick_result, render_download
+from components.selectors import fragment, render_search_select
+from services.assets import render_styles
+from services.gemini_pool import get_registry
+from services.response_cache import get_response_cache, make_key, describe_cache
+from services.result_history import get_result_history
+from services.generation_history import get_generation_history
+from services.image_prep import prepare_image, describe_savings
+from services.library_index import get_cinelab_index
+from services.library_search import get_library_search
+from services.dispatch import dispatch
+from services.rate_limiter import session_scope, describe_wait, describe_queue
+from services.rerun_profiler import start_rerun
+from services.warmup import start_warmup
+from services.metrics import timer
+from services.batch import BatchExport, expand_uploads
+from cinelab.engines import run_cine_engine
 
 # --- PAGE CONFIG ---
 st.set_page_config(page_title="Prompt Generator - CineLab", layout="wide", page_icon="🎨")
+profiler = start_rerun("prompt_generator")
+start_warmup()
 
 # --- APPLY THEME ---
-st.markdown(get_theme_css(), unsafe_allow_html=True)
+profiler.mark("theme")
+render_styles("navbar")
 
 # --- RENDER NAVBAR ---
+profiler.mark("navbar")
 render_navbar(current_page='prompt_generator')
 
 # --- LOAD LIBRARY ---
-def load_library():
-    lib_path = os.path.join(os.path.dirname(__file__), '..', 'data', 'cinelab_library.json')
-    try:
-        with open(lib_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except FileNotFoundError:
-        st.error("cinelab_library.json not found!")
-        return {}
+profiler.mark("library")
+try:
+    idx = get_cinelab_index("cinelab")
+    lib_search = get_library_search("cinelab")
+except FileNotFoundError:
+    st.error("cinelab_library.json not found!")
+    idx = lib_search = None
 
-lib = load_library()
+def searcher(section, group=None):
+    """Index-backed type-ahead for a selector (plain substring search without a library)"""
+    return lib_search.searcher(section, group) if lib_search else None
 
 # --- API CONFIG ---
+profiler.mark("api_config")
 api_key_name = get_api_key_name("cinelab")
-if api_key_name in st.secrets:
-    genai.configure(api_key=st.secrets[api_key_name])
+if get_registry().is_fake:
+    get_registry().configure(api_key_name, "fake")    # Local fake backend - no key needed
+elif api_key_name in st.secrets:
+    get_registry().configure(api_key_name, st.secrets[api_key_name])
 else:
     st.error(f"Error: {api_key_name} not found in Streamlit secrets.")
     st.stop()
 
-# --- LOAD ACTIVE PROMPT VERSION ---
-prompt_version = get_prompt_version("cinelab")
-prompt_module = importlib.import_module(f"prompts.{prompt_version}")
+# --- BATCH ENGINE ---
+BATCH_STATUS = {"queued": "⏳ Queued", "done": "✅ Done", "cached": "⚡ Cached", "failed": "❌ Failed"}
 
-# --- LOAD FINE ART NUDE LOGIC ---
-logic_version = get_logic_version("fine_art_nude")
-logic_module = importlib.import_module(f"logic.{logic_version}")
+def make_batch_job(item, params, bypass):
+    def job():
+        started = time.perf_counter()
+        # Downscale once; the original bytes are not needed after that
+        if "img_data" not in item:
+            prepared = prepare_image(item.pop("data"), item["mime_type"], "cinelab")
+            item["img_data"] = prepared["img_data"]
+            item["sha256"] = prepared["sha256"]
+        cache_key = make_key("cinelab", item["sha256"], params)
+        recipe, cached = get_response_cache().get_or_compute(
+            cache_key, "cinelab", lambda: run_cine_engine(params, item["img_data"]), bypass=bypass
+        )
+        return recipe, cached, time.perf_counter() - started
+    return job
 
+def batch_rows(items):
+    return [
+        {
+            "#": i + 1,
+            "Image": item["name"],
+            "Status": BATCH_STATUS[item["status"]],
+            "Attempts": item["attempts"],
+            "Seconds": item["seconds"],
+            "Error": item["error"]
+        }
+        for i, item in enumerate(items)
+    ]
 
-# --- CORE ENGINE ---
-def run_cine_engine(params, img_data):
-    # Get prompt structure from active version
-    prompt_data = prompt_module.generate_prompt(params, img_data)
-    
-    # Apply Fine Art Nude logic if needed
-    genre = params.get('genre', '')
-    if logic_module.should_apply(genre):
-        prompt_data['user_prompt'] = logic_module.apply_workaround(
-            prompt_data['user_prompt'], 
-            genre
-        )
+def run_batch(batch, indices, bypass):
+    """Run the given items with bounded concurrency, updating the table live"""
+    items = batch["items"]
+    progress = st.progress(0.0, text=f"0 / {len(indices)}")
+    queue_note = st.empty()
+    table = st.empty()
+    table.dataframe(batch_rows(items), hide_index=True, use_container_width=True)
     
-    # Get active model
-    model_name = get_model("cinelab")
-    model = genai.GenerativeModel(
-        model_name, 
-        system_instruction=prompt_data['system_instruction']
-    )
+    jobs = []
+    for i in indices:
+        items[i].update(status="queued", error="")
+        items[i]["attempts"] += 1
+        jobs.append(make_batch_job(items[i], batch["params"], bypass))
     
-    res = model.generate_content(
-        [prompt_data['user_prompt'], img_data],
-        generation_config=prompt_data['generation_config'],
-        safety_settings=prompt_data['safety_settings']
-    )
+    def show_queue():
+        note = describe_queue("cinelab")
+        queue_note.caption(note) if note else queue_note.empty()
     
-    return res.text
+    for finished, (j, result, error) in enumerate(dispatch("cinelab", jobs, on_idle=show_queue), start=1):
+        item = items[indices[j]]
+        if error is not None:
+            item.update(status="failed", error=str(error))
+        else:
+            recipe, cached, seconds = result
+            item.update(status="cached" if cached else "done", seconds=round(seconds, 2))
+            batch["export"].add(indices[j], item["name"], recipe)
+            if not cached:
+                get_generation_history().record("cinelab", batch["params"], recipe, image_sha256=item["sha256"])
+        progress.progress(finished / len(indices), text=f"{finished} / {len(indices)}")
+        table.dataframe(batch_rows(items), hide_index=True, use_container_width=True)
+        show_queue()
 
 # --- UI LAYOUT ---
+profiler.mark("layout")
+if idx:
+    render_library_search("cinelab_search", ("cinelab",))
+
 c1, c2, c3 = st.columns([0.9, 1.2, 1.2])
 
 with c1:
     st.markdown("### REFERENCE")
-    up = st.file_uploader("Upload Image", type=['jpg','png','jpeg'], label_visibility="collapsed")
-    if up: 
-        st.image(up, use_container_width=True)
+    batch_mode = st.toggle("Batch mode", help="Run one settings profile over many images (or a ZIP of images)")
+    if batch_mode:
+        ups = st.file_uploader(
+            "Upload Images", type=['jpg','png','jpeg','zip'],
+            accept_multiple_files=True, label_visibility="collapsed"
+        )
+        up = None
+        if ups:
+            st.caption(f"{len(ups)} file(s) selected")
+    else:
+        ups = []
+        up = st.file_uploader("Upload Image", type=['jpg','png','jpeg'], label_visibility="collapsed")
+        if up: 
+            st.image(up, use_container_width=True)
 
 with c2:
     st.markdown("### EQUIPMENT")
-    cam_list = sorted(lib['cameras'].keys()) if lib else []
-    cam = st.selectbox("Camera Body", cam_list, label_visibility="collapsed")
-    if lib:
-        st.markdown(f"<div class='info-box'>{lib['cameras'][cam]['info']} | {lib['cameras'][cam]['vibe']}</div>", unsafe_allow_html=True)
+    cam_list = idx.cameras if idx else []
+    cam = render_search_select("Camera Body", cam_list, "cinelab_camera", search=searcher("cameras"))
+    if idx and cam:
+        st.markdown(idx.camera_box[cam], unsafe_allow_html=True)
     
-    lens_list = sorted(lib['lenses'].keys()) if lib else []
-    lens = st.selectbox("Lens", lens_list, label_visibility="collapsed")
-    if lib:
-        st.markdown(f"<div class='info-box'>{lib['lenses'][lens]['info']} | {lib['lenses'][lens]['character']}</div>", unsafe_allow_html=True)
+    lens_list = idx.lenses if idx else []
+    lens = render_search_select("Lens", lens_list, "cinelab_lens", search=searcher("lenses"))
+    if idx and lens:
+        st.markdown(idx.lens_box[lens], unsafe_allow_html=True)
     
     sc1, sc2 = st.columns(2)
     with sc1:
@@ -107,23 +170,29 @@ with c2:
         iso = st.select_slider("ISO", options=["50", "100", "200", "400", "800", "1600", "3200", "6400", "Grainy"])
 
     st.markdown("### ART DIRECTION")
-    if lib:
-        genre = st.selectbox("Genre", sorted(lib['photographers'].keys()))
-        artist = st.selectbox("Artist", sorted(lib['photographers'][genre].keys()))
-        inf = lib['photographers'][genre][artist]
-        st.markdown(f"<div class='info-box'><b>Style:</b> {inf['style']}<br><b>Lighting:</b> {inf['lighting']}</div>", unsafe_allow_html=True)
+    genre = artist = None
+    if idx:
+        genre = st.selectbox("Genre", idx.genres, key="cinelab_genre")
+        artist = render_search_select(
+            "Artist", idx.artists[genre], f"cinelab_artist_{genre}",
+            search=searcher("photographers", genre), label_visibility="visible"
+        )
+        if artist:
+            st.markdown(idx.artist_box[(genre, artist)], unsafe_allow_html=True)
     
     notes = st.text_input("Director's Notes", placeholder="Mood, skin details, textures...", key="notes_input")
 
 with c3:
     st.markdown("### LIGHTING")
-    l_type = st.radio("Category", ["Studio", "Outdoor"], horizontal=True, label_visibility="collapsed")
+    l_type = st.radio("Category", ["Studio", "Outdoor"], horizontal=True, key="cinelab_light_type", label_visibility="collapsed")
     
     selected_p = ""
-    if lib:
-        presets = sorted(lib['lighting_presets'][l_type].keys())
-        selected_p = st.selectbox("Scenario", presets, label_visibility="collapsed")
-        st.markdown(f"<div class='info-box'>{lib['lighting_presets'][l_type][selected_p]['info']} | Result: {lib['lighting_presets'][l_type][selected_p]['result']}</div>", unsafe_allow_html=True)
+    if idx:
+        selected_p = render_search_select(
+            "Scenario", idx.presets[l_type], f"cinelab_preset_{l_type}", search=searcher("lighting_presets", l_type)
+        ) or ""
+        if selected_p:
+            st.markdown(idx.preset_box[(l_type, selected_p)], unsafe_allow_html=True)
 
     light_specs = ""
     if selected_p == "Low Key Lighting":
@@ -168,42 +237,125 @@ with c3:
 
     ratio = st.radio("Ratio", ["4:5", "16:9", "1:1", "9:16"], horizontal=True)
 
+    bypass_cache = st.checkbox("Bypass cache", help="Always call the model, even for an identical image + settings")
+    st.caption(describe_cache())
+
+    params = {
+        "cam": cam, 
+        "cam_info": idx.camera_info.get(cam, "") if idx else "",
+        "lens": lens, 
+        "lens_info": idx.lens_info.get(lens, "") if idx else "",
+        "f_stop": f_stop, 
+        "iso": iso, 
+        "ratio": ratio,
+        "artist": artist,
+        "genre": genre,  # Important for Fine Art Nude logic
+        "category": l_type, 
+        "scenario": selected_p,
+        "light_details": light_specs, 
+        "notes": notes
+    }
+
     if st.button("🚀 GENERATE JSON RECIPE"):
-        if up:
+        if batch_mode and ups:
+            try:
+                items = expand_uploads(ups)
+            except Exception as e:
+                items = []
+                st.error(f"Error: {e}")
+            if items:
+                for item in items:
+                    item.update(status="queued", attempts=0, seconds=None, error="")
+                st.session_state.batch = {"params": params, "items": items, "export": BatchExport()}
+                run_batch(st.session_state.batch, list(range(len(items))), bypass_cache)
+                st.rerun()
+            elif not st.session_state.get("batch"):
+                st.warning("⚠️ No images found in upload.")
+        elif up:
+            queue_note = st.empty()
             with st.spinner("Analyzing..."):
                 try:
-                    params = {
-                        "cam": cam, 
-                        "cam_info": f"{lib['cameras'][cam]['info']} | {lib['cameras'][cam]['vibe']}",
-                        "lens": lens, 
-                        "lens_info": f"{lib['lenses'][lens]['info']} | {lib['lenses'][lens]['character']}",
-                        "f_stop": f_stop, 
-                        "iso": iso, 
-                        "ratio": ratio,
-                        "artist": artist,
-                        "genre": genre,  # Important for Fine Art Nude logic
-                        "category": l_type, 
-                        "scenario": selected_p,
-                        "light_details": light_specs, 
-                        "notes": notes
-                    }
-                    img_data = {"mime_type": up.type, "data": up.getvalue()}
-                    st.session_state.res = run_cine_engine(params, img_data)
-                    st.success("✅ Recipe Generated!")
+                    prepared = prepare_image(up.getvalue(), up.type, "cinelab")
+                    img_data = prepared["img_data"]
+                    cache_key = make_key("cinelab", prepared["sha256"], params)
+                    with session_scope(on_wait=lambda pos, eta: queue_note.caption(describe_wait(pos, eta))):
+                        recipe, cached = get_response_cache().get_or_compute(
+                            cache_key, "cinelab", lambda: run_cine_engine(params, img_data), bypass=bypass_cache
+                        )
+                    st.session_state.recipe_handle = get_result_history().add("cinelab", recipe)
+                    if not cached:
+                        get_generation_history().record("cinelab", params, recipe, image_sha256=prepared["sha256"])
+                    queue_note.empty()
+                    st.success("✅ Recipe Generated! (from cache)" if cached else "✅ Recipe Generated!")
+                    st.caption(describe_savings(prepared))
                 except Exception as e: 
                     st.error(f"Error: {e}")
         else:
             st.warning("⚠️ Upload image first.")
 
-# --- OUTPUT ---
-if 'res' in st.session_state:
+# --- BATCH OUTPUT ---
+profiler.mark("batch_output")
+if batch_mode and st.session_state.get("batch"):
+    batch = st.session_state.batch
+    items = batch["items"]
     st.markdown("---")
-    st.markdown("### 📋 GENERATED RECIPE")
-    st.code(st.session_state.res, language="json")
-    st.download_button(
-        label="💾 Download JSON",
-        data=st.session_state.res,
-        file_name="cinelab_recipe.json",
-        mime="application/json",
-        use_container_width=True
-    )
+    st.markdown("### 📦 BATCH RESULTS")
+    
+    failed = [i for i, item in enumerate(items) if item["status"] == "failed"]
+    done = len(items) - len(failed) - sum(1 for item in items if item["status"] == "queued")
+    st.caption(f"{done} / {len(items)} recipes ready · {len(failed)} failed")
+    
+    if failed:
+        retry_all = st.button(f"🔁 Retry all failed ({len(failed)})")
+        retry_one = None
+        for i in failed:
+            r1, r2 = st.columns([4, 1])
+            with r1:
+                st.markdown(f"<div class='info-box'>❌ {items[i]['name']}: {items[i]['error']}</div>", unsafe_allow_html=True)
+            with r2:
+                if st.button("🔁 Retry", key=f"batch_retry_{i}", use_container_width=True):
+                    retry_one = i
+        if retry_all or retry_one is not None:
+            run_batch(batch, failed if retry_all else [retry_one], bypass_cache)
+            st.rerun()
+    
+    st.dataframe(batch_rows(items), hide_index=True, use_container_width=True)
+    
+    if batch["export"].count:
+        # Read from the spooled exports only when clicked
+        d1, d2 = st.columns(2)
+        with d1:
+            render_download(
+                f"💾 Download JSONL ({batch['export'].count})",
+                batch["export"].jsonl_bytes,
+                "cinelab_batch.jsonl",
+                "application/jsonl"
+            )
+        with d2:
+            render_download(
+                f"💾 Download ZIP ({batch['export'].count})",
+                batch["export"].zip_bytes,
+                "cinelab_batch.zip",
+                "application/zip"
+            )
+
+# --- OUTPUT ---
+profiler.mark("output")
+@fragment
+def render_recipe():
+    # Own rerun unit: interacting with the panel does not rerun the page
+    with timer("render", tool="cinelab"):
+        st.markdown("---")
+        st.markdown("### 📋 GENERATED RECIPE")
+        recipe = get_result_history().get(pick_result("cinelab", st.session_state.recipe_handle))
+        if recipe is None:
+            st.info("⌛ This result was cleared from the session history.")
+            return
+        st.code(recipe, language="json")
+        render_download("💾 Download JSON", lambda: recipe, "cinelab_recipe.json", "application/json")
+
+if not batch_mode and 'recipe_handle' in st.session_state:
+    render_recipe()
+
+# --- PROFILER ---
+profiler.finish()
@@ -1,74 +1,117 @@
 import streamlit as st
-import google.generativeai as genai
-from google.generativeai.types import HarmCategory, HarmBlockThreshold, GenerationConfig
-import io
-import json
 import os
 import sys
-import importlib
-from PIL import Image
 
 # Add parent directory to path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from config.colors import get_theme_css
 from config.models import get_model, get_api_key_name
 from config.prompt_versions import get_logic_version
 from components.navbar import render_navbar
 from components.navbar import render_navbar
+from components.outputs import render_download
+from components.selectors import fragment
+from services.assets import render_styles
+from services.dispatch import dispatch
+from services.rate_limiter import describe_queue
+from services.retry import describe_retries
+from services.rerun_profiler import start_rerun
+from services.metrics import timer
+from services.gemini_pool import get_registry, describe_pool
+from services.responses import safe_extract_response
+from services.result_history import get_result_history
+from services.generation_history import get_generation_history
+from services.candidates import CandidateCountUnsupported, generate_candidates
+from services.warmup import start_warmup
+from cinelab.engines import FACTORY_SAFETY, load_logic_module
 
 # --- PAGE CONFIG ---
 st.set_page_config(page_title="Factory - CineLab", layout="wide", page_icon="🏭")
+profiler = start_rerun("factory")
+start_warmup()
 
 # --- APPLY THEME ---
-st.markdown(get_theme_css(), unsafe_allow_html=True)
+profiler.mark("theme")
+render_styles("navbar")
 
 
 # --- RENDER NAVBAR ---
+profiler.mark("navbar")
 render_navbar(current_page="factory")
 # --- API CONFIG ---
+profiler.mark("api_config")
 api_key_name = get_api_key_name("factory")
-if api_key_name in st.secrets:
-    genai.configure(api_key=st.secrets[api_key_name])
+if get_registry().is_fake:
+    get_registry().configure(api_key_name, "fake")    # Local fake backend - no key needed
+elif api_key_name in st.secrets:
+    get_registry().configure(api_key_name, st.secrets[api_key_name])
 else:
     st.error(f"Error: {api_key_name} not found in secrets.")
     st.stop()
 
 # --- LOAD FACTORY BRIDGE LOGIC ---
+profiler.mark("bridge")
+logic_version = get_logic_version("factory_bridge")     # module is imported on first RUN
+
 # --- BACK BUTTON ---
 if st.button("← Back to Home"):
     st.switch_page("app.py")
 
 # --- SAFETY SETTINGS ---
-no_filter = {
-    HarmCategory.HARM_CATEGORY_HARASSMENT: HarmBlockThreshold.BLOCK_NONE,
-    HarmCategory.HARM_CATEGORY_HATE_SPEECH: HarmBlockThreshold.BLOCK_NONE,
-    HarmCategory.HARM_CATEGORY_SEXUALLY_EXPLICIT: HarmBlockThreshold.BLOCK_NONE,
-    HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT: HarmBlockThreshold.BLOCK_NONE,
-}
-
-# --- RESPONSE EXTRACTION ---
-def safe_extract_response(response):
-    try:
-        if not hasattr(response, 'candidates') or not response.candidates:
-            return None, "No candidates", None
-        parts = response.parts if hasattr(response, 'parts') else response.candidates[0].content.parts
-        for part in parts:
-            if hasattr(part, 'inline_data') and part.inline_data.mime_type.startswith('image/'):
-                img_bytes = part.inline_data.data
-                img = Image.open(io.BytesIO(img_bytes))
-                return (img, img_bytes), None, part.inline_data.mime_type
-            if hasattr(part, 'text') and part.text:
-                return None, part.text, "text/plain"
-        return None, None, None
-    except Exception as e: 
-        return None, str(e), None
+# Plain-dict form of the SDK's HarmCategory/HarmBlockThreshold enums (no SDK import)
+no_filter = FACTORY_SAFETY
+
+# --- SLOT RENDERING ---
+def render_slot(slot, i, result, error):
+    with timer("render", tool="factory"), slot.container():
+        if error is not None:
+            st.error(f"Error: {str(error)}")
+            return
+        
+        img_bytes, text_res, mime = result
+        if img_bytes:
+            st.image(img_bytes, use_container_width=True)     # bytes as returned, no re-encode
+            render_download("💾 SAVE", lambda: img_bytes, f"factory_v{i+1}.png", mime)
+        elif text_res:
+            st.error("❌ Error")
+            with st.expander("Details"):
+                st.code(text_res)
+        else:
+            st.error("🚫 Blocked")
+
+def render_grid(image_count):
+    """One placeholder per slot: master first, then the variants"""
+    grid_cols = st.columns(image_count)
+    slots = []
+    for i in range(image_count):
+        with grid_cols[i]:
+            with st.container(border=True):
+                if i == 0:
+                    st.caption("💎 Master")
+                else:
+                    st.caption(f"🎨 Variant {i}")
+                slots.append(st.empty())
+    return slots
+
+@fragment
+def render_last_run():
+    # Own rerun unit: redrawn from the stored results, SAVE clicks do not rerun the page
+    run = st.session_state.factory_run
+    slots = render_grid(len(run["results"]))
+    for i, (result, error) in enumerate(run["results"]):
+        handle, text_res, mime = result or (None, None, None)
+        img_bytes = get_result_history().get(handle) if handle else None
+        if handle and img_bytes is None:
+            error = "Image cleared from the session history"
+        render_slot(slots[i], i, (img_bytes, text_res, mime), error)
+    st.caption(run["note"])
 
 # --- MODEL LIST ---
+profiler.mark("model_list")
 @st.cache_data
 def get_available_models():
     try:
-        return [m.name for m in genai.list_models() if 'generateContent' in m.supported_generation_methods]
+        return [m.name for m in get_registry().list_models("factory") if 'generateContent' in m.supported_generation_methods]
     except:
         return [get_model("factory")]
 
@@ -78,6 +121,7 @@ available_models = get_available_models()
 col_left, col_right = st.columns([0.4, 0.6], gap="large")
 
 # --- LEFT: INPUT ---
+profiler.mark("input")
 with col_left:
     st.write("### Input")
     user_prompt = st.text_area(
@@ -101,62 +145,119 @@ with col_left:
 
     with c3:
         generate_btn = st.button("🚀 RUN", type="primary", use_container_width=True)
+    
+    multi_candidate = st.checkbox(
+        "⚡ Variants in one request",
+        value=False,
+        help="Ask for all variants as candidates of a single call. Falls back to one call per variant if the model does not support it."
+    )
 
 # --- RIGHT: OUTPUT ---
+profiler.mark("output")
 with col_right:
     st.write("### Output Stream")
     
     if generate_btn and user_prompt:
         # Process input through factory bridge
-        final_prompt = bridge_module.prepare_for_generation(user_prompt)
+        with timer("prepare_for_generation", tool="factory", logic_version=logic_version):
+            final_prompt = load_logic_module("factory_bridge").prepare_for_generation(user_prompt)
         
-        model = genai.GenerativeModel(selected_model)
+        model = get_registry().model("factory", selected_model)
         
-        # Grid System
-        grid_cols = st.columns(image_count)
+        # Grid System - one placeholder per slot, filled as results land
+        slots = render_grid(image_count)
+        for slot in slots:
+            slot.info("⏳ Generating...")
+        results = [((None, None, None), None)] * image_count
         
-        for i in range(image_count):
-            with grid_cols[i]:
-                with st.container(border=True):
-                    # Temperature logic
-                    current_temp = 0.2 if i == 0 else 0.9
-                    
-                    if i == 0:
-                        st.caption("💎 Master")
+        def land(k, result, error):
+            if error is None:
+                img_res, text_res, mime = result
+                result = (img_res[1] if img_res else None, text_res, mime)
+                # Session state keeps a history handle, not the image
+                handle = get_result_history().add("factory", result[0], mime=mime) if img_res else None
+                # Every paid call gets a History row; text, blocked and unkept images as text/plain
+                history = get_generation_history()
+                params = {"prompt": user_prompt, "temperature": 0.2 if k == 0 else 0.9, "slot": k}
+                if img_res and history.store_images:
+                    history.record("factory", params, result[0], model=selected_model, mime=mime)
+                else:
+                    if img_res:
+                        output = f"Image not kept ({mime}, {len(result[0]) / 1024:.0f} KB)"
                     else:
-                        st.caption(f"🎨 Variant {i}")
-                    
-                    with st.spinner("..."):
-                        try:
-                            config = GenerationConfig(temperature=current_temp)
-                            
-                            response = model.generate_content(
-                                final_prompt, 
-                                safety_settings=no_filter,
-                                generation_config=config
-                            )
-                            img_res, text_res, mime = safe_extract_response(response)
-
-                            if img_res:
-                                img_obj, img_bytes = img_res
-                                st.image(img_obj, use_container_width=True)
-                                st.download_button(
-                                    label="💾 SAVE", 
-                                    data=img_bytes, 
-                                    file_name=f"factory_v{i+1}.png", 
-                                    mime=mime, 
-                                    use_container_width=True
-                                )
-                            elif text_res:
-                                st.error("❌ Error")
-                                with st.expander("Details"):
-                                    st.code(text_res)
-                            else:
-                                st.error("🚫 Blocked")
-                        except Exception as e:
-                            st.error(f"Error: {str(e)}")
+                        output = text_res or "No image or text returned"
+                    history.record("factory", params, output, model=selected_model, mime="text/plain")
+                results[k] = ((handle, text_res, mime), None)
+            else:
+                results[k] = (None, str(error))        # not the exception: its traceback pins frames
+            render_slot(slots[k], k, result, error)
+        
+        queue_note = st.empty()
+        
+        def show_queue():
+            note = describe_queue("factory")
+            queue_note.caption(note) if note else queue_note.empty()
+        
+        def make_job(temperature):
+            def job():
+                response = model.generate_content(
+                    final_prompt, 
+                    safety_settings=no_filter,
+                    generation_config={"temperature": temperature}
+                )
+                return safe_extract_response(response)
+            return job
+        
+        def make_variants_job(count):
+            def job():
+                return generate_candidates(model, final_prompt, count, 0.9, safety_settings=no_filter)
+            return job
+        
+        # Temperature logic: master is conservative, variants explore
+        variant_count = image_count - 1
+        use_multi = multi_candidate and variant_count > 1
+        jobs = [make_job(0.2)]
+        slot_of = [0]                       # job index -> grid slot (None: the variants call)
+        if use_multi:
+            jobs.append(make_variants_job(variant_count))
+            slot_of.append(None)
+        else:
+            jobs += [make_job(0.9) for _ in range(variant_count)]
+            slot_of += range(1, image_count)
+        
+        def fall_back(first):
+            # One call per remaining variant, joining the running pool
+            for k in range(first, image_count):
+                jobs.append(make_job(0.9))
+                slot_of.append(k)
+        
+        for i, result, error in dispatch("factory", jobs, on_idle=show_queue):
+            if slot_of[i] is None:
+                if isinstance(error, CandidateCountUnsupported):
+                    fall_back(1)
+                elif error is not None:
+                    for k in range(1, image_count):
+                        land(k, None, error)
+                else:
+                    for k, res in enumerate(result, start=1):
+                        land(k, res, None)
+                    # Model returned fewer candidates than asked for
+                    fall_back(1 + len(result))
+                continue
+            land(slot_of[i], result, error)
+        
+        queue_note.empty()
+        note = f"{describe_pool()} · {describe_retries()}"
+        st.caption(note)
+        # Later reruns redraw this run instead of dropping it
+        st.session_state.factory_run = {"results": results, "note": note}
             
-    elif not generate_btn:
-        st.info("📥 Ready. Paste prompt and click RUN.")
-    else:
+    elif generate_btn:
         st.warning("⚠️ Paste prompt first.")
+    elif 'factory_run' in st.session_state:
+        render_last_run()
+    else:
+        st.info("📥 Ready. Paste prompt and click RUN.")
+
+# --- PROFILER ---
+profiler.finish()
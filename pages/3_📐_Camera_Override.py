@@ -1,152 +1,60 @@
 import streamlit as st
-import google.generativeai as genai
-import json
 import os
 import sys
-import importlib
 
 # Add parent directory to path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from config.colors import get_theme_css
-from config.models import get_model, get_api_key_name
-from config.prompt_versions import get_prompt_version
+from config.models import get_api_key_name
 from components.navbar import render_navbar
+from components.library_search import render_library_search
+from components.outputs import pick_result, render_download
+from components.selectors import fragment, render_choice
+from services.assets import render_styles
+from services.gemini_pool import get_registry
+from services.response_cache import get_response_cache, make_key, describe_cache
+from services.result_history import get_result_history
+from services.generation_history import get_generation_history
+from services.image_prep import prepare_image, describe_savings
+from cinelab.engines import run_camera_override
+from services.library_store import get_library
+from services.rate_limiter import session_scope, describe_wait
+from services.rerun_profiler import start_rerun
+from services.warmup import start_warmup
+from services.metrics import timer
 
 # --- PAGE CONFIG ---
 st.set_page_config(page_title="Camera Override - CineLab", layout="wide", page_icon="📐")
+profiler = start_rerun("camera_override")
+start_warmup()
 
 # --- APPLY THEME ---
-st.markdown(get_theme_css(), unsafe_allow_html=True)
+profiler.mark("theme")
+render_styles("navbar", "camera_override")
 
 # --- RENDER NAVBAR ---
+profiler.mark("navbar")
 render_navbar(current_page='camera_override')
 
-# --- CUSTOM CSS FOR SELECTION BUTTONS ---
-st.markdown("""
-<style>
-/* Button Grid */
-.button-grid {
-    display: grid;
-    grid-template-columns: repeat(4, 1fr);
-    gap: 0.8rem;
-    margin: 1.5rem 0;
-}
-
-/* Dark Theme Buttons */
-.custom-button {
-    background-color: #F9FEFF;
-    color: #222121;
-    border: 2px solid transparent;
-    padding: 1rem;
-    border-radius: 6px;
-    text-align: center;
-    cursor: pointer;
-    transition: all 0.2s ease;
-    font-size: 0.85rem;
-    font-weight: 600;
-    text-transform: uppercase;
-    letter-spacing: 0.5px;
-}
-
-.custom-button:hover {
-    border-color: #C0C0C0;
-}
-
-.custom-button.selected {
-    border-color: #F7BE14;
-    box-shadow: 0 0 0 1px #F7BE14;
-}
-
-/* Light Theme Override */
-@media (prefers-color-scheme: light) {
-    .custom-button {
-        background-color: #222121;
-        color: #F9FEFF;
-    }
-    
-    .custom-button:hover {
-        border-color: #C0C0C0;
-    }
-    
-    .custom-button.selected {
-        border-color: #F7BE14;
-    }
-}
-
-/* Section Headers */
-.section-title {
-    color: #CCD4D7;
-    font-size: 0.9rem;
-    font-weight: 700;
-    text-transform: uppercase;
-    letter-spacing: 2px;
-    margin: 2.5rem 0 0.5rem 0;
-    padding-bottom: 0.5rem;
-    border-bottom: 1px solid #30363d;
-}
-
-@media (prefers-color-scheme: light) {
-    .section-title {
-        color: #666666;
-        border-bottom-color: #e0e0e0;
-    }
-}
-
-/* Description text */
-.description-text {
-    color: #a3a3a3;
-    font-size: 0.8rem;
-    margin: 0.5rem 0 1rem 0;
-    font-style: italic;
-}
-
-/* Aspect Ratio Display */
-.ratio-display {
-    background-color: #161b22;
-    border: 1px solid #30363d;
-    border-radius: 6px;
-    padding: 0.8rem;
-    text-align: center;
-    font-size: 1rem;
-    color: #F9FEFF;
-    margin: 1rem 0;
-}
-
-@media (prefers-color-scheme: light) {
-    .ratio-display {
-        background-color: white;
-        border-color: #e0e0e0;
-        color: #222121;
-    }
-}
-</style>
-""", unsafe_allow_html=True)
-
 # --- LOAD LIBRARY ---
-def load_library():
-    lib_path = os.path.join(os.path.dirname(__file__), '..', 'data', 'camera_override_library.json')
-    try:
-        with open(lib_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except FileNotFoundError:
-        st.error("camera_override_library.json not found!")
-        return {}
-
-lib = load_library()
+profiler.mark("library")
+try:
+    lib = get_library("camera_override")
+except FileNotFoundError:
+    st.error("camera_override_library.json not found!")
+    lib = {}
 
 # --- API CONFIG ---
+profiler.mark("api_config")
 api_key_name = get_api_key_name("camera_override")
-if api_key_name in st.secrets:
-    genai.configure(api_key=st.secrets[api_key_name])
+if get_registry().is_fake:
+    get_registry().configure(api_key_name, "fake")    # Local fake backend - no key needed
+elif api_key_name in st.secrets:
+    get_registry().configure(api_key_name, st.secrets[api_key_name])
 else:
     st.error(f"Error: {api_key_name} not found in secrets.")
     st.stop()
 
-# --- LOAD ACTIVE PROMPT VERSION ---
-prompt_version = get_prompt_version("camera_override")
-prompt_module = importlib.import_module(f"prompts.{prompt_version}")
-
 # --- INITIALIZE SESSION STATE ---
 if 'selected_angle' not in st.session_state:
     st.session_state.selected_angle = 'eye_level'
@@ -157,129 +65,63 @@ if 'selected_lens' not in st.session_state:
 if 'selected_ratio' not in st.session_state:
     st.session_state.selected_ratio = '16:9'
 
-# --- CORE ENGINE ---
-def run_camera_override(params, img_data):
-    prompt_data = prompt_module.generate_prompt(params, img_data, lib)
-    
-    model_name = get_model("camera_override")
-    model = genai.GenerativeModel(
-        model_name,
-        system_instruction=prompt_data['system_instruction']
-    )
-    
-    res = model.generate_content(
-        [prompt_data['user_prompt'], img_data],
-        generation_config=prompt_data['generation_config'],
-        safety_settings=prompt_data['safety_settings']
-    )
-    
-    return res.text
-
-# --- LAYOUT ---
-col_left, col_right = st.columns([0.35, 0.65])
-
-with col_left:
-    st.markdown("### REFERENCE")
-    up = st.file_uploader("Upload architectural image", type=['jpg','png','jpeg'], label_visibility="collapsed")
-    if up:
-        st.image(up, use_container_width=True)
+# --- LIBRARY SEARCH ---
+if lib:
+    render_library_search("camera_search", ("camera_override",))
 
-with col_right:
+# --- SELECTORS ---
+# Fragment: picking an option reruns only this block, not the whole page
+@fragment
+def render_selectors():
     # CAMERA ANGLE
     st.markdown('<div class="section-title">Camera Angle</div>', unsafe_allow_html=True)
-    
     angles = lib.get('camera_angles', {})
-    angle_keys = list(angles.keys())
-    
-    # Create button grid HTML
-    angle_buttons_html = '<div class="button-grid">'
-    for angle_key in angle_keys:
-        selected_class = 'selected' if st.session_state.selected_angle == angle_key else ''
-        angle_buttons_html += f'<div class="custom-button {selected_class}" onclick="window.parent.postMessage({{type: \'streamlit:setComponentValue\', value: \'{angle_key}\'}}, \'*\')">{angles[angle_key]["ui_label"]}</div>'
-    angle_buttons_html += '</div>'
-    
-    # Display buttons (not interactive yet, using st.columns as fallback)
-    angle_cols = st.columns(4)
-    for idx, angle_key in enumerate(angle_keys):
-        col_idx = idx % 4
-        with angle_cols[col_idx]:
-            if st.button(
-                angles[angle_key]['ui_label'],
-                key=f"angle_{angle_key}",
-                use_container_width=True
-            ):
-                st.session_state.selected_angle = angle_key
-                st.rerun()
-    
+    render_choice("Camera Angle", list(angles), "selected_angle", lambda k: angles[k]['ui_label'])
     if st.session_state.selected_angle in angles:
         st.markdown(f'<div class="description-text">📝 {angles[st.session_state.selected_angle]["ui_description"]}</div>', unsafe_allow_html=True)
     
     # SHOT SCALE
     st.markdown('<div class="section-title">Shot Scale</div>', unsafe_allow_html=True)
-    
     scales = lib.get('shot_scales', {})
-    scale_keys = list(scales.keys())
-    
-    scale_cols = st.columns(4)
-    for idx, scale_key in enumerate(scale_keys):
-        col_idx = idx % 4
-        with scale_cols[col_idx]:
-            if st.button(
-                scales[scale_key]['ui_label'],
-                key=f"scale_{scale_key}",
-                use_container_width=True
-            ):
-                st.session_state.selected_scale = scale_key
-                st.rerun()
-    
+    render_choice("Shot Scale", list(scales), "selected_scale", lambda k: scales[k]['ui_label'])
     if st.session_state.selected_scale in scales:
         st.markdown(f'<div class="description-text">📝 {scales[st.session_state.selected_scale]["ui_description"]}</div>', unsafe_allow_html=True)
     
     # LENS
     st.markdown('<div class="section-title">Lens Choice</div>', unsafe_allow_html=True)
-    
     lenses = lib.get('lenses', {})
-    lens_keys = list(lenses.keys())
-    
-    lens_cols = st.columns(4)
-    for idx, lens_key in enumerate(lens_keys):
-        col_idx = idx % 4
-        with lens_cols[col_idx]:
-            if st.button(
-                lenses[lens_key]['ui_label'],
-                key=f"lens_{lens_key}",
-                use_container_width=True
-            ):
-                st.session_state.selected_lens = lens_key
-                st.rerun()
-    
+    render_choice("Lens", list(lenses), "selected_lens", lambda k: lenses[k]['ui_label'])
     if st.session_state.selected_lens in lenses:
         st.markdown(f'<div class="description-text">📝 {lenses[st.session_state.selected_lens]["ui_description"]}</div>', unsafe_allow_html=True)
     
     # ASPECT RATIO
     st.markdown('<div class="section-title">Aspect Ratio</div>', unsafe_allow_html=True)
-    
     ratios = lib.get('aspect_ratios', {})
-    ratio_keys = list(ratios.keys())
-    
-    ratio_cols = st.columns(8)
-    for idx, ratio_key in enumerate(ratio_keys):
-        with ratio_cols[idx]:
-            ratio_label = ratios[ratio_key]['ui_label'].split()[0]
-            if st.button(
-                ratio_label,
-                key=f"ratio_{ratio_key}",
-                use_container_width=True
-            ):
-                st.session_state.selected_ratio = ratio_label
-                st.rerun()
-    
+    render_choice("Aspect Ratio", [r['ui_label'].split()[0] for r in ratios.values()], "selected_ratio")
     st.markdown(f'<div class="ratio-display">Selected: {st.session_state.selected_ratio}</div>', unsafe_allow_html=True)
+
+# --- LAYOUT ---
+profiler.mark("layout")
+col_left, col_right = st.columns([0.35, 0.65])
+
+with col_left:
+    st.markdown("### REFERENCE")
+    up = st.file_uploader("Upload architectural image", type=['jpg','png','jpeg'], label_visibility="collapsed")
+    if up:
+        st.image(up, use_container_width=True)
+
+with col_right:
+    profiler.mark("selectors")
+    render_selectors()
     
     # GENERATE BUTTON
+    profiler.mark("generate")
     st.markdown("---")
+    bypass_cache = st.checkbox("Bypass cache", help="Always call the model, even for an identical image + settings")
+    st.caption(describe_cache())
     if st.button("🚀 GENERATE JSON PROTOCOL", use_container_width=True, type="primary"):
         if up:
+            queue_note = st.empty()
             with st.spinner("Analyzing architecture..."):
                 try:
                     params = {
@@ -288,23 +130,41 @@ with col_right:
                         "lens": st.session_state.selected_lens,
                         "aspect_ratio": st.session_state.selected_ratio
                     }
-                    img_data = {"mime_type": up.type, "data": up.getvalue()}
-                    st.session_state.camera_result = run_camera_override(params, img_data)
-                    st.success("✅ Protocol Generated!")
+                    prepared = prepare_image(up.getvalue(), up.type, "camera_override")
+                    img_data = prepared["img_data"]
+                    cache_key = make_key("camera_override", prepared["sha256"], params)
+                    with session_scope(on_wait=lambda pos, eta: queue_note.caption(describe_wait(pos, eta))):
+                        protocol, cached = get_response_cache().get_or_compute(
+                            cache_key, "camera_override", lambda: run_camera_override(params, img_data, lib), bypass=bypass_cache
+                        )
+                    st.session_state.camera_handle = get_result_history().add("camera_override", protocol)
+                    if not cached:
+                        get_generation_history().record("camera_override", params, protocol, image_sha256=prepared["sha256"])
+                    queue_note.empty()
+                    st.success("✅ Protocol Generated! (from cache)" if cached else "✅ Protocol Generated!")
+                    st.caption(describe_savings(prepared))
                 except Exception as e:
                     st.error(f"Error: {e}")
         else:
             st.warning("⚠️ Upload image first.")
 
 # --- OUTPUT ---
-if 'camera_result' in st.session_state:
-    st.markdown("---")
-    st.markdown("### 📋 GENERATED CAMERA OVERRIDE PROTOCOL")
-    st.code(st.session_state.camera_result, language="json")
-    st.download_button(
-        label="💾 Download JSON",
-        data=st.session_state.camera_result,
-        file_name="camera_override_protocol.json",
-        mime="application/json",
-        use_container_width=True
-    )
+profiler.mark("output")
+@fragment
+def render_protocol():
+    # Own rerun unit: interacting with the panel does not rerun the page
+    with timer("render", tool="camera_override"):
+        st.markdown("---")
+        st.markdown("### 📋 GENERATED CAMERA OVERRIDE PROTOCOL")
+        protocol = get_result_history().get(pick_result("camera_override", st.session_state.camera_handle))
+        if protocol is None:
+            st.info("⌛ This result was cleared from the session history.")
+            return
+        st.code(protocol, language="json")
+        render_download("💾 Download JSON", lambda: protocol, "camera_override_protocol.json", "application/json")
+
+if 'camera_handle' in st.session_state:
+    render_protocol()
+
+# --- PROFILER ---
+profiler.finish()
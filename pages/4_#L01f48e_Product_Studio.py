@@ -1,73 +1,72 @@
 import streamlit as st
-import google.generativeai as genai
 import json
 import os
 import sys
-import importlib
 
 # Add parent directory to path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from config.colors import get_theme_css
-from config.models import get_model, get_api_key_name
-from config.prompt_versions import get_prompt_version
+from config.models import get_api_key_name
 from components.back_button import render_back_button
+from components.library_search import render_library_search
+from components.outputs import pick_result, render_download
+from components.selectors import fragment, render_search_select
+from services.assets import render_styles
+from services.gemini_pool import get_registry
+from services.response_cache import get_response_cache, make_key, describe_cache
+from services.result_history import get_result_history
+from services.generation_history import get_generation_history
+from services.image_prep import prepare_image, describe_savings
+from cinelab.engines import run_product_studio
+from services.library_store import get_library
+from services.library_index import get_cinelab_index
+from services.library_search import get_library_search
+from services.rate_limiter import session_scope, describe_wait
+from services.rerun_profiler import start_rerun
+from services.warmup import start_warmup
+from services.metrics import timer
 
 # --- PAGE CONFIG ---
 st.set_page_config(page_title="Product Studio - CineLab", layout="wide", page_icon="💎")
+profiler = start_rerun("product_studio")
+start_warmup()
 
 # --- APPLY THEME ---
-st.markdown(get_theme_css(), unsafe_allow_html=True)
+profiler.mark("theme")
+render_styles("navbar")
 
 # --- RENDER NAVBAR ---
+profiler.mark("navbar")
 render_navbar(current_page="product_studio")
 
 # --- LOAD LIBRARY (for photographer styles) ---
-def load_library():
-    lib_path = os.path.join(os.path.dirname(__file__), '..', 'data', 'cinelab_library.json')
-    try:
-        with open(lib_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except FileNotFoundError:
-        st.error("cinelab_library.json not found!")
-        return {}
-
-lib = load_library()
+profiler.mark("library")
+try:
+    lib = get_library("product_studio")
+    idx = get_cinelab_index("product_studio")
+    lib_search = get_library_search("product_studio")
+except FileNotFoundError:
+    st.error("cinelab_library.json not found!")
+    lib = {}
+    idx = lib_search = None
 
 # --- API CONFIG ---
+profiler.mark("api_config")
 api_key_name = get_api_key_name("product_studio")
-if api_key_name in st.secrets:
-    genai.configure(api_key=st.secrets[api_key_name])
+if get_registry().is_fake:
+    get_registry().configure(api_key_name, "fake")    # Local fake backend - no key needed
+elif api_key_name in st.secrets:
+    get_registry().configure(api_key_name, st.secrets[api_key_name])
 else:
     st.error(f"Error: {api_key_name} not found in secrets.")
     st.stop()
 
-# --- LOAD ACTIVE PROMPT VERSION ---
-prompt_version = get_prompt_version("product_studio")
-prompt_module = importlib.import_module(f"prompts.{prompt_version}")
 # --- BACK BUTTON ---
 if st.button("← Back to Home"):
     st.switch_page("app.py")
 
-# --- CORE ENGINE ---
-def run_product_studio(params, img_data):
-    prompt_data = prompt_module.generate_prompt(params, img_data, lib)
-    
-    model_name = get_model("product_studio")
-    model = genai.GenerativeModel(
-        model_name,
-        system_instruction=prompt_data['system_instruction']
-    )
-    
-    res = model.generate_content(
-        [prompt_data['user_prompt'], img_data],
-        generation_config=prompt_data['generation_config'],
-        safety_settings=prompt_data['safety_settings']
-    )
-    
-    return res.text
-
 # --- LAYOUT ---
+profiler.mark("layout")
 col_left, col_right = st.columns([0.4, 0.6])
 
 with col_left:
@@ -92,44 +91,59 @@ with col_right:
     # Photographer preset (optional)
     st.markdown("### PHOTOGRAPHER STYLE (Optional)")
     
-    use_photographer = st.checkbox("Apply photographer style")
+    use_photographer = st.checkbox("Apply photographer style", key="product_use_photographer")
     
     photographer = None
-    if use_photographer and lib:
-        # Only show Fashion photographers for product photography
-        fashion_photographers = lib.get('photographers', {}).get('Fashion', {})
-        if fashion_photographers:
-            photographer = st.selectbox(
-                "Select photographer",
-                options=["None"] + sorted(fashion_photographers.keys())
+    genre = None
+    if use_photographer and idx:
+        render_library_search("product_search", ("product_studio",))
+        # Fashion suits most product work, so it is the default genre
+        if "Fashion" in idx.genres:
+            st.session_state.setdefault("product_genre", "Fashion")
+        genre = st.selectbox("Genre", idx.genres, key="product_genre")
+        genre_photographers = idx.artists.get(genre, ())
+        if genre_photographers:
+            photographer = render_search_select(
+                "Select photographer", ("None",) + genre_photographers, f"product_photographer_{genre}",
+                search=lib_search.searcher("photographers", genre), label_visibility="visible"
             )
             
-            if photographer != "None":
-                photo_info = fashion_photographers[photographer]
-                st.markdown(f"""
-                <div class='info-box'>
-                    <b>Style:</b> {photo_info['style']}<br>
-                    <b>Lighting:</b> {photo_info['lighting']}<br>
-                    <b>Vibe:</b> {photo_info['vibe']}
-                </div>
-                """, unsafe_allow_html=True)
+            if photographer not in (None, "None"):
+                st.markdown(idx.artist_detail_box[(genre, photographer)], unsafe_allow_html=True)
             else:
                 photographer = None
     
     st.markdown("---")
     
+    bypass_cache = st.checkbox("Bypass cache", help="Always call the model, even for an identical image + settings")
+    st.caption(describe_cache())
+    
     # Generate button
     if st.button("🚀 GENERATE PRODUCT PROMPT", use_container_width=True, type="primary"):
         if up and user_text.strip():
+            queue_note = st.empty()
             with st.spinner("Analyzing product..."):
                 try:
                     params = {
                         "user_text": user_text,
-                        "photographer": photographer if photographer != "None" else None
+                        "photographer": photographer if photographer != "None" else None,
+                        "photographer_genre": genre if photographer else None
                     }
-                    img_data = {"mime_type": up.type, "data": up.getvalue()}
-                    st.session_state.product_result = run_product_studio(params, img_data)
-                    st.success("✅ Prompt Generated!")
+                    prepared = prepare_image(up.getvalue(), up.type, "product_studio")
+                    img_data = prepared["img_data"]
+                    cache_key = make_key("product_studio", prepared["sha256"], params)
+                    with session_scope(on_wait=lambda pos, eta: queue_note.caption(describe_wait(pos, eta))):
+                        prompt, cached = get_response_cache().get_or_compute(
+                            cache_key, "product_studio", lambda: run_product_studio(params, img_data, lib), bypass=bypass_cache
+                        )
+                    st.session_state.product_handle = get_result_history().add("product_studio", prompt)
+                    if not cached:
+                        get_generation_history().record(
+                            "product_studio", params, prompt, image_sha256=prepared["sha256"], mime="text/plain"
+                        )
+                    queue_note.empty()
+                    st.success("✅ Prompt Generated! (from cache)" if cached else "✅ Prompt Generated!")
+                    st.caption(describe_savings(prepared))
                 except Exception as e:
                     st.error(f"Error: {e}")
         elif not up:
@@ -138,34 +152,40 @@ with col_right:
             st.warning("⚠️ Describe the context first.")
 
 # --- OUTPUT ---
-if 'product_result' in st.session_state:
-    st.markdown("---")
-    st.markdown("### 📋 GENERATED PRODUCT PROMPT")
-    st.text_area(
-        "Final prompt:",
-        value=st.session_state.product_result,
-        height=300,
-        label_visibility="collapsed"
-    )
-    
-    col1, col2 = st.columns(2)
-    with col1:
-        st.download_button(
-            label="💾 Download as TXT",
-            data=st.session_state.product_result,
-            file_name="product_studio_prompt.txt",
-            mime="text/plain",
-            use_container_width=True
-        )
-    with col2:
-        # Wrap in JSON for Factory compatibility
-        json_wrapped = json.dumps({"prompt": st.session_state.product_result}, indent=2)
-        st.download_button(
-            label="💾 Download as JSON",
-            data=json_wrapped,
-            file_name="product_studio_prompt.json",
-            mime="application/json",
-            use_container_width=True
+profiler.mark("output")
+@fragment
+def render_prompt():
+    # Own rerun unit: editing the text box does not rerun the page
+    with timer("render", tool="product_studio"):
+        st.markdown("---")
+        st.markdown("### 📋 GENERATED PRODUCT PROMPT")
+        prompt = get_result_history().get(pick_result("product_studio", st.session_state.product_handle))
+        if prompt is None:
+            st.info("⌛ This result was cleared from the session history.")
+            return
+        st.text_area(
+            "Final prompt:",
+            value=prompt,
+            height=300,
+            label_visibility="collapsed"
         )
     
-    st.info("💡 Tip: Copy this prompt and paste into Factory to generate the image!")
+        col1, col2 = st.columns(2)
+        with col1:
+            render_download("💾 Download as TXT", lambda: prompt, "product_studio_prompt.txt", "text/plain")
+        with col2:
+            # Wrap in JSON for Factory compatibility
+            render_download(
+                "💾 Download as JSON",
+                lambda: json.dumps({"prompt": prompt}, indent=2),
+                "product_studio_prompt.json",
+                "application/json"
+            )
+    
+        st.info("💡 Tip: Copy this prompt and paste into Factory to generate the image!")
+
+if 'product_handle' in st.session_state:
+    render_prompt()
+
+# --- PROFILER ---
+profiler.finish()
@@ -0,0 +1,156 @@
+import streamlit as st
+import json
+import os
+import sys
+import time
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from components.navbar import render_navbar
+from components.outputs import render_download
+from components.selectors import fragment
+from services.assets import render_styles
+from services.generation_history import FIELDS, get_generation_history, describe_generation_history
+from services.rerun_profiler import start_rerun
+from services.warmup import start_warmup
+from services.metrics import timer
+
+# --- PAGE CONFIG ---
+st.set_page_config(page_title="History - CineLab", layout="wide", page_icon="📚")
+profiler = start_rerun("history")
+start_warmup()
+
+# --- APPLY THEME ---
+profiler.mark("theme")
+render_styles("navbar")
+
+# --- RENDER NAVBAR ---
+profiler.mark("navbar")
+render_navbar(current_page="history")
+
+TOOL_LABELS = {
+    "cinelab": "🎨 Prompt Generator",
+    "factory": "🏭 Factory",
+    "camera_override": "📐 Camera Override",
+    "product_studio": "💎 Product Studio"
+}
+FILE_TYPES = {"application/json": "json", "text/plain": "txt", "image/png": "png", "image/jpeg": "jpg", "image/webp": "webp"}
+
+history = get_generation_history()
+
+# --- FILTERS ---
+profiler.mark("filters")
+st.markdown("### 📚 GENERATION HISTORY")
+
+def any_of(column, tool_name=None, label=None):
+    """Filter selectbox over the values recorded for one indexed column"""
+    return st.selectbox(
+        label or column.replace("_", " ").title(),
+        [None] + history.distinct(column, tool_name),
+        format_func=lambda value: "Any" if value is None else TOOL_LABELS.get(value, value)
+    )
+
+f1, f2, f3 = st.columns(3)
+with f1:
+    tool = any_of("tool")
+with f2:
+    model = any_of("model", tool)
+with f3:
+    prompt_version = any_of("prompt_version", tool, "Prompt version")
+
+field_cols = st.columns(len(FIELDS) + 1)
+filters = {"tool": tool, "model": model, "prompt_version": prompt_version}
+for col, column in zip(field_cols, FIELDS):
+    with col:
+        filters[column] = any_of(column, tool)
+with field_cols[-1]:
+    filters["image_sha256"] = st.text_input("Image hash", placeholder="SHA-256 prefix").strip()
+
+# --- PAGINATION (keyset: one "older than" cursor per page) ---
+profiler.mark("query")
+if st.session_state.get("history_filters") != filters:
+    st.session_state.history_filters = filters
+    st.session_state.history_cursors = []
+
+def older(cursor):
+    st.session_state.history_cursors.append(cursor)
+
+def newer():
+    st.session_state.history_cursors.pop()
+
+cursors = st.session_state.history_cursors
+with timer("history_query"):
+    rows, more = history.query(filters, before_id=cursors[-1] if cursors else None)
+    total = history.count(filters)
+
+st.caption(f"{total} matching runs · page {len(cursors) + 1} · {describe_generation_history()}")
+
+if not rows:
+    st.info("📭 No runs recorded yet for these filters. Results land here after each fresh generation.")
+else:
+    st.dataframe(
+        [
+            {
+                "#": row["id"],
+                "When": time.strftime("%Y-%m-%d %H:%M", time.localtime(row["created_at"])),
+                "Tool": TOOL_LABELS.get(row["tool"], row["tool"]),
+                "Model": row["model"],
+                "Prompt": row["prompt_version"],
+                "Camera": row["camera"],
+                "Lens": row["lens"],
+                "Artist": row["artist"],
+                "Angle": row["angle"],
+                "Image": (row["image_sha256"] or "")[:12],
+                "Preview": row["preview"] or "🖼 image"
+            }
+            for row in rows
+        ],
+        hide_index=True,
+        use_container_width=True
+    )
+
+    n1, n2, _ = st.columns([1, 1, 4])
+    with n1:
+        st.button("← Newer", on_click=newer, disabled=not cursors, use_container_width=True)
+    with n2:
+        st.button("Older →", on_click=older, args=(rows[-1]["id"],), disabled=not more, use_container_width=True)
+
+# --- RUN DETAIL ---
+profiler.mark("detail")
+@fragment
+def render_run(run_ids):
+    # Own rerun unit: opening another run reads just that row's payload
+    run_id = st.selectbox("Open run", run_ids, format_func=lambda run_id: f"#{run_id}")
+    run = history.get(run_id)
+    if run is None:
+        st.info("⌛ This run has been pruned from the history.")
+        return
+    with timer("render", tool="history"):
+        st.markdown("---")
+        st.markdown(f"### 📋 RUN #{run['id']} · {TOOL_LABELS.get(run['tool'], run['tool'])}")
+        st.caption(
+            f"{run['model']} · prompt {run['prompt_version'] or '-'} · logic {run['logic_version'] or '-'} · "
+            f"library {(run['library_version'] or '-')[:12]} · image {(run['image_sha256'] or '-')[:12]}"
+        )
+        output, mime = run["output"], run["output_mime"]
+        if mime.startswith("image/"):
+            st.image(output, use_container_width=True)
+        elif mime == "application/json":
+            st.code(output, language="json")
+        else:
+            st.text_area("Output", value=output, height=300, label_visibility="collapsed")
+        render_download(
+            "💾 Download",
+            lambda: output,
+            f"{run['tool']}_run{run['id']}.{FILE_TYPES.get(mime, 'txt')}",
+            mime
+        )
+        with st.expander("Settings"):
+            st.code(json.dumps(run["params"], indent=2, ensure_ascii=False), language="json")
+
+if rows:
+    render_run([row["id"] for row in rows])
+
+# --- PROFILER ---
+profiler.finish()
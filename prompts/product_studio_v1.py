@@ -8,7 +8,7 @@ def generate_prompt(params, img_data, library):
     Generate Product Studio prompt
     
     Args:
-        params: dict with user_text, photographer (optional)
+        params: dict with user_text, photographer and photographer_genre (optional, default Fashion)
         img_data: reference product image data
         library: cinelab_library.json (for photographer styles)
     
@@ -18,11 +18,12 @@ def generate_prompt(params, img_data, library):
     
     user_text = params['user_text']
     photographer = params.get('photographer', None)
+    genre = params.get('photographer_genre') or 'Fashion'
     
     # Build photographer style injection if selected
     photographer_style = ""
-    if photographer and photographer in library.get('photographers', {}).get('Fashion', {}):
-        photo_info = library['photographers']['Fashion'][photographer]
+    if photographer and photographer in library.get('photographers', {}).get(genre, {}):
+        photo_info = library['photographers'][genre][photographer]
         photographer_style = f"""
         
         ARTISTIC STYLE APPLICATION:
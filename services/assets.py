@@ -0,0 +1,186 @@
+"""
+CineLab Suite - Static Style Bundles
+Content-hashed stylesheets in static/css/, linked once instead of re-sent every rerun
+
+Bundles (components/styles.py) are compiled on first use in the process and
+written only when their hashed file is missing, so a deploy without a build
+step still works; `python -m cinelab assets` writes them ahead of time and
+removes stale ones.
+"""
+
+import glob
+import hashlib
+import os
+import re
+import threading
+import urllib.request
+
+import streamlit as st
+
+from components.styles import BUNDLES
+from config.assets import ASSETS, FONTS, FONTS_CSS_URL, STATIC_DIR, STATIC_URL
+
+_COMMENT = re.compile(r"/\*.*?\*/", re.S)
+_FONT_FACE = re.compile(r"/\* ([\w-]+) \*/\s*@font-face \{(.*?)\}", re.S)
+# Google Fonts only serves woff2 to browsers it recognises
+_FONT_AGENT = "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0 Safari/537.36"
+
+_lock = threading.Lock()
+_bundles = None             # name -> (file name, css)
+
+
+def font_file(family, weight):
+    """File name of a self-hosted font weight"""
+    return f"{family.lower().replace(' ', '-')}-{weight}.woff2"
+
+
+def font_faces(static_dir=STATIC_DIR):
+    """@font-face rules for the FONTS weights present in static/fonts/"""
+    rules = []
+    for family, weights in FONTS.items():
+        for weight in weights:
+            name = font_file(family, weight)
+            if os.path.exists(os.path.join(static_dir, ASSETS["fonts_dir"], name)):
+                rules.append(
+                    f"@font-face {{\nfont-family: '{family}';\nfont-style: normal;\nfont-weight: {weight};\n"
+                    f"font-display: swap;\nsrc: local('{family}'), "
+                    f"url('../{ASSETS['fonts_dir']}/{name}') format('woff2');\n}}"
+                )
+    return "\n".join(rules)
+
+
+def minify(css):
+    """Drop comments, indentation and blank lines"""
+    lines = (line.strip() for line in _COMMENT.sub("", css).splitlines())
+    return "\n".join(line for line in lines if line)
+
+
+def compile_bundle(name, static_dir=STATIC_DIR):
+    """
+    CSS and hashed file name of one bundle
+
+    Returns:
+        (file name, css) - e.g. ("cinelab.3f2a9c1d0b7e.css", "...")
+    """
+    parts = list(BUNDLES[name])
+    if name == "home":
+        # Only the landing page hero uses the self-hosted fonts
+        parts.insert(0, font_faces(static_dir))
+    css = minify("\n".join(parts)) + "\n"
+    digest = hashlib.sha256(css.encode('utf-8')).hexdigest()[:12]
+    return f"{name}.{digest}.css", css
+
+
+def _write(path, css):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        f.write(css)
+    os.replace(tmp, path)
+
+
+def build_bundles(static_dir=STATIC_DIR, prune=True):
+    """
+    Write every bundle to static/css/ (skipping files that already exist)
+
+    Args:
+        prune: delete every other .css file in static/css/ (old hashes, removed bundles)
+
+    Returns:
+        dict of bundle name -> (file name, css)
+    """
+    css_dir = os.path.join(static_dir, ASSETS["css_dir"])
+    built = {}
+    for name in BUNDLES:
+        file_name, css = compile_bundle(name, static_dir)
+        path = os.path.join(css_dir, file_name)
+        if not os.path.exists(path):
+            _write(path, css)
+        built[name] = (file_name, css)
+    if prune:
+        current = {file_name for file_name, _ in built.values()}
+        for old in glob.glob(os.path.join(css_dir, "*.css")):
+            if os.path.basename(old) not in current:
+                os.remove(old)
+    return built
+
+
+def fetch_fonts(static_dir=STATIC_DIR):
+    """
+    Download the latin woff2 files of FONTS from Google Fonts into static/fonts/
+
+    Returns:
+        list of file names written
+    """
+    fonts_dir = os.path.join(static_dir, ASSETS["fonts_dir"])
+    os.makedirs(fonts_dir, exist_ok=True)
+    written = []
+    for family, weights in FONTS.items():
+        url = FONTS_CSS_URL.format(family=family.replace(' ', '+'), weights=";".join(map(str, weights)))
+        request = urllib.request.Request(url, headers={"User-Agent": _FONT_AGENT})
+        with urllib.request.urlopen(request, timeout=30) as response:
+            css = response.read().decode('utf-8')
+        for subset, rule in _FONT_FACE.findall(css):
+            weight = re.search(r"font-weight: (\d+)", rule)
+            src = re.search(r"url\((https://[^)]+\.woff2)\)", rule)
+            if subset != "latin" or not weight or not src:
+                continue
+            name = font_file(family, weight.group(1))
+            with urllib.request.urlopen(src.group(1), timeout=30) as response:
+                data = response.read()
+            with open(os.path.join(fonts_dir, name), 'wb') as f:
+                f.write(data)
+            written.append(name)
+    return written
+
+
+def get_bundles():
+    """Compiled bundles for this process (built and written on first call)"""
+    global _bundles
+    with _lock:
+        if _bundles is None:
+            try:
+                _bundles = build_bundles(prune=False)
+            except OSError:
+                # Read-only checkout: serve inline from memory
+                _bundles = {name: compile_bundle(name) for name in BUNDLES}
+        return _bundles
+
+
+def _serves_css():
+    # Streamlit's older (Tornado) static handler sends files outside its safe
+    # extension list as text/plain + nosniff, which browsers refuse as a stylesheet
+    try:
+        from streamlit.web.server.app_static_file_handler import SAFE_APP_STATIC_FILE_EXTENSIONS
+    except ImportError:
+        return True
+    return ".css" in SAFE_APP_STATIC_FILE_EXTENSIONS
+
+
+def use_static():
+    """True when pages should <link> the bundles instead of inlining them"""
+    mode = ASSETS["mode"]
+    if mode in ("static", "inline"):
+        return mode == "static"
+    return bool(st.get_option("server.enableStaticServing")) and _serves_css()
+
+
+def render_styles(*names):
+    """
+    Apply the shared "cinelab" bundle plus any page bundles
+
+    Each rerun sends one short <link> per bundle; the browser fetches the
+    hashed file once. Without static serving the CSS is inlined instead.
+    """
+    bundles = get_bundles()
+    names = ("cinelab",) + names
+    if use_static():
+        html = "".join(
+            f'<link rel="stylesheet" href="{STATIC_URL}/{ASSETS["css_dir"]}/{bundles[name][0]}">'
+            for name in names
+        )
+    else:
+        # Same font files, addressed from the page instead of from static/css/
+        css = "".join(bundles[name][1] for name in names)
+        html = "<style>" + css.replace("url('../", f"url('{STATIC_URL}/") + "</style>"
+    st.markdown(html, unsafe_allow_html=True)
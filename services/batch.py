@@ -0,0 +1,89 @@
+"""
+CineLab Suite - Batch Helpers
+Expand multi-file / ZIP uploads and stream finished recipes into JSONL + ZIP exports
+"""
+
+import io
+import json
+import mimetypes
+import os
+import tempfile
+import zipfile
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png')
+
+# Exports stay in memory up to this size, then spill to a temp file
+SPOOL_BYTES = 8 * 1024 * 1024
+
+
+def expand_uploads(files):
+    """
+    Flatten uploaded images and ZIP archives into a list of items
+
+    Args:
+        files: Streamlit UploadedFile objects (images and/or .zip)
+
+    Returns:
+        List of {"name", "mime_type", "data"} in upload order
+    """
+    items = []
+    for up in files:
+        if up.name.lower().endswith('.zip'):
+            with zipfile.ZipFile(io.BytesIO(up.getvalue())) as zf:
+                for info in sorted(zf.infolist(), key=lambda i: i.filename):
+                    name = info.filename
+                    if info.is_dir() or name.startswith('__MACOSX/') or os.path.basename(name).startswith('.'):
+                        continue
+                    if not name.lower().endswith(IMAGE_EXTENSIONS):
+                        continue
+                    items.append({
+                        "name": name,
+                        "mime_type": mimetypes.guess_type(name)[0] or "image/jpeg",
+                        "data": zf.read(info)
+                    })
+        else:
+            items.append({"name": up.name, "mime_type": up.type, "data": up.getvalue()})
+    return items
+
+
+def recipe_file_name(index, name):
+    """Unique, filesystem-safe name for one recipe inside the ZIP"""
+    stem = os.path.splitext(os.path.basename(name))[0] or "image"
+    return f"{index + 1:03d}_{stem}.json"
+
+
+class BatchExport:
+    """
+    JSONL and ZIP exports appended to as each recipe lands
+
+    Both are spooled temp files, so a large batch does not have to be
+    rebuilt - or held twice - when the user downloads it.
+    """
+
+    def __init__(self):
+        self._jsonl = tempfile.SpooledTemporaryFile(max_size=SPOOL_BYTES)
+        self._zip = tempfile.SpooledTemporaryFile(max_size=SPOOL_BYTES)
+        self.count = 0
+
+    def add(self, index, name, recipe):
+        """Append one finished recipe (raw model text) to both exports"""
+        try:
+            parsed = json.loads(recipe)
+        except ValueError:
+            parsed = recipe
+        line = json.dumps({"index": index, "name": name, "recipe": parsed}, ensure_ascii=False) + "\n"
+        self._jsonl.seek(0, io.SEEK_END)
+        self._jsonl.write(line.encode('utf-8'))
+
+        # Append mode rewrites only the central directory
+        with zipfile.ZipFile(self._zip, 'a', zipfile.ZIP_DEFLATED) as zf:
+            zf.writestr(recipe_file_name(index, name), recipe)
+        self.count += 1
+
+    def jsonl_bytes(self):
+        self._jsonl.seek(0)
+        return self._jsonl.read()
+
+    def zip_bytes(self):
+        self._zip.seek(0)
+        return self._zip.read()
@@ -0,0 +1,76 @@
+"""
+CineLab Suite - Multi-Candidate Requests
+Ask for several variants in a single generate_content round trip
+"""
+
+import threading
+import time
+
+from services.responses import safe_extract_candidates
+
+# Models that rejected candidate_count > 1 -> when to try again (learned at
+# runtime, process-wide). Entries expire so a misread error cannot switch the
+# feature off for every session until a restart.
+_UNSUPPORTED_TTL = 3600
+_unsupported = {}
+_lock = threading.Lock()
+
+
+class CandidateCountUnsupported(Exception):
+    """Model does not accept candidate_count > 1 - fall back to separate calls"""
+
+
+def supports_candidate_count(model_name):
+    """False for a while after a model has rejected a multi-candidate request"""
+    with _lock:
+        retry_at = _unsupported.get(model_name)
+        if retry_at is not None and time.monotonic() >= retry_at:
+            del _unsupported[model_name]
+            retry_at = None
+        return retry_at is None
+
+
+def _is_rejection(error):
+    # 400 / InvalidArgument from google.api_core (without importing it here) that
+    # is about candidate_count - not a bad prompt, safety setting or input size
+    bad_request = getattr(error, 'code', None) == 400 or type(error).__name__ in ("InvalidArgument", "BadRequest")
+    message = str(error).lower()
+    return bad_request and ("candidate_count" in message or "candidatecount" in message)
+
+
+def generate_candidates(model, prompt, count, temperature, **kwargs):
+    """
+    Request `count` candidates from one generate_content call
+
+    Args:
+        model: GenerativeModel instance
+        prompt: final prompt (string or parts list)
+        count: number of candidates to ask for
+        temperature: sampling temperature shared by all candidates
+        **kwargs: forwarded to generate_content (e.g. safety_settings)
+
+    Returns:
+        List of (img_res, text_res, mime), one per candidate returned.
+        The model may return fewer than `count`.
+
+    Raises:
+        CandidateCountUnsupported: model rejects candidate_count
+    """
+    model_name = getattr(model, 'model_name', str(model))
+    if not supports_candidate_count(model_name):
+        raise CandidateCountUnsupported(model_name)
+
+    try:
+        response = model.generate_content(
+            prompt,
+            generation_config={"temperature": temperature, "candidate_count": count},
+            **kwargs
+        )
+    except Exception as e:
+        if _is_rejection(e):
+            with _lock:
+                _unsupported[model_name] = time.monotonic() + _UNSUPPORTED_TTL
+            raise CandidateCountUnsupported(model_name) from e
+        raise
+
+    return safe_extract_candidates(response)[:count]
@@ -0,0 +1,75 @@
+"""
+CineLab Suite - Request Dispatch
+Run model calls concurrently, bounded per API key across all sessions
+"""
+
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from config.models import TOOL_API_MAP, get_concurrency_limit
+from services.rate_limiter import current_session_id, session_scope
+
+# How often on_idle() is called while every job is still running
+IDLE_INTERVAL = 0.5
+
+_slots = {}
+_slots_lock = threading.Lock()
+
+
+def key_slots(tool_name):
+    """Get the process-wide semaphore guarding the API key of specific tool"""
+    api = TOOL_API_MAP.get(tool_name, "api_1")
+    with _slots_lock:
+        if api not in _slots:
+            _slots[api] = threading.BoundedSemaphore(get_concurrency_limit(tool_name))
+        return _slots[api]
+
+
+def dispatch(tool_name, jobs, on_idle=None):
+    """
+    Run jobs concurrently and yield results in completion order
+
+    Args:
+        tool_name: tool whose API key limit applies (see config/models.py)
+        jobs: list of zero-argument callables (must not touch st.*); jobs the
+            caller appends while iterating (e.g. fallbacks for a failed job)
+            join the same pool and get the next indexes
+        on_idle: optional callback run in the calling thread every
+            IDLE_INTERVAL seconds without a result (e.g. to show the
+            rate-limit queue position)
+
+    Yields:
+        (index, result, error) - error is the raised exception or None
+    """
+    if not jobs:
+        return
+
+    slots = key_slots(tool_name)
+    # Worker threads queue for the rate limit on behalf of the caller's session
+    session_id = current_session_id()
+
+    def guarded(job):
+        with session_scope(session_id), slots:
+            return job()
+
+    # Threads beyond the key limit would only wait on the semaphore (the pool
+    # starts them on demand, so appended jobs still get their own thread)
+    workers = get_concurrency_limit(tool_name)
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"cinelab-{tool_name}") as pool:
+        futures = {pool.submit(guarded, job): i for i, job in enumerate(jobs)}
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, timeout=IDLE_INTERVAL, return_when=FIRST_COMPLETED)
+            if not done:
+                if on_idle is not None:
+                    on_idle()
+                continue
+            for future in done:
+                try:
+                    yield futures[future], future.result(), None
+                except Exception as e:
+                    yield futures[future], None, e
+                for i in range(len(futures), len(jobs)):
+                    added = pool.submit(guarded, jobs[i])
+                    futures[added] = i
+                    pending.add(added)
@@ -0,0 +1,278 @@
+"""
+CineLab Suite - Fake Gemini Backend
+Local stand-in for the google.generativeai surface the tools use (no keys, no network)
+
+Select it with CINELAB_GENAI_BACKEND=fake (see config/models.py).
+Latency, error injection and image size come from FAKE_GENAI and can be
+changed at runtime with set_behavior().
+"""
+
+import copy
+import hashlib
+import io
+import json
+import math
+import random
+import threading
+import time
+from functools import lru_cache
+from types import SimpleNamespace
+
+from PIL import Image
+
+from config.models import FAKE_GENAI, MODELS
+
+IS_FAKE = True
+
+_settings = copy.deepcopy(FAKE_GENAI)
+_rng = random.Random(_settings["seed"])
+_lock = threading.Lock()
+_stats = {"calls": 0, "rate_limit": 0, "server_error": 0, "unavailable": 0, "blocked": 0}
+
+
+def set_behavior(**settings):
+    """Override FAKE_GENAI keys for this process (nested dicts are merged)"""
+    global _rng
+    with _lock:
+        for key, value in settings.items():
+            if isinstance(value, dict) and isinstance(_settings.get(key), dict):
+                _settings[key].update(value)
+            else:
+                _settings[key] = value
+        if "seed" in settings:
+            _rng = random.Random(settings["seed"])
+
+
+def get_stats():
+    """Calls served and errors injected so far"""
+    with _lock:
+        return dict(_stats)
+
+
+def sample_latency(spec, rng):
+    """Draw one latency (seconds) from a distribution spec"""
+    kind = spec.get("distribution", "fixed")
+    if kind == "fixed":
+        return spec.get("value", spec.get("median", 0.0))
+    if kind == "uniform":
+        return rng.uniform(spec["low"], spec["high"])
+    if kind == "exponential":
+        return rng.expovariate(1.0 / spec["mean"])
+    if kind == "lognormal":
+        return rng.lognormvariate(math.log(spec["median"]), spec["sigma"])
+    raise ValueError(f"Unknown latency distribution: {kind}")
+
+
+# --- ERRORS (same names and codes as google.api_core.exceptions) ---
+class GoogleAPICallError(Exception):
+    code = None
+
+    def __init__(self, message, retry_after=None):
+        super().__init__(f"{self.code} {message}")
+        self.message = message
+        self.retry_after = retry_after
+
+
+class ResourceExhausted(GoogleAPICallError):
+    code = 429
+
+
+class InternalServerError(GoogleAPICallError):
+    code = 500
+
+
+class ServiceUnavailable(GoogleAPICallError):
+    code = 503
+
+
+class InvalidArgument(GoogleAPICallError):
+    code = 400
+
+
+# --- TYPES (subset of google.generativeai.types) ---
+class HarmCategory:
+    HARM_CATEGORY_HARASSMENT = "HARM_CATEGORY_HARASSMENT"
+    HARM_CATEGORY_HATE_SPEECH = "HARM_CATEGORY_HATE_SPEECH"
+    HARM_CATEGORY_SEXUALLY_EXPLICIT = "HARM_CATEGORY_SEXUALLY_EXPLICIT"
+    HARM_CATEGORY_DANGEROUS_CONTENT = "HARM_CATEGORY_DANGEROUS_CONTENT"
+
+
+class HarmBlockThreshold:
+    BLOCK_NONE = "BLOCK_NONE"
+    BLOCK_ONLY_HIGH = "BLOCK_ONLY_HIGH"
+    BLOCK_MEDIUM_AND_ABOVE = "BLOCK_MEDIUM_AND_ABOVE"
+
+
+class GenerationConfig:
+    def __init__(self, candidate_count=None, temperature=None, response_mime_type=None, **kwargs):
+        self.candidate_count = candidate_count
+        self.temperature = temperature
+        self.response_mime_type = response_mime_type
+        for key, value in kwargs.items():
+            setattr(self, key, value)
+
+
+types = SimpleNamespace(
+    HarmCategory=HarmCategory, HarmBlockThreshold=HarmBlockThreshold, GenerationConfig=GenerationConfig
+)
+
+
+# --- RESPONSES ---
+class Part:
+    def __init__(self, text=None, inline_data=None):
+        if text is not None:
+            self.text = text
+        if inline_data is not None:
+            self.inline_data = inline_data
+
+
+class Candidate:
+    def __init__(self, parts, finish_reason="STOP"):
+        self.content = SimpleNamespace(parts=parts, role="model")
+        self.finish_reason = finish_reason
+
+
+class GenerateContentResponse:
+    """Mirrors the accessors of the real response, including their errors"""
+
+    def __init__(self, candidates, block_reason=None):
+        self.candidates = candidates
+        self.prompt_feedback = SimpleNamespace(block_reason=block_reason)
+
+    @property
+    def parts(self):
+        if len(self.candidates) != 1:
+            raise ValueError("The `response.parts` quick accessor only works for a single candidate.")
+        return self.candidates[0].content.parts
+
+    @property
+    def text(self):
+        if not self.candidates:
+            raise ValueError("The `response.text` quick accessor requires a candidate; the prompt was blocked.")
+        texts = [p.text for p in self.parts if hasattr(p, 'text')]
+        if not texts:
+            raise ValueError("The `response.text` quick accessor only works for text parts.")
+        return "".join(texts)
+
+
+# --- SYNTHETIC PAYLOADS ---
+@lru_cache(maxsize=32)
+def _png(shade, size):
+    """Vertical gradient PNG; 16 shades × sizes keeps the cache small"""
+    top = (40 + shade * 12, 30 + shade * 6, 60)
+    gradient = Image.linear_gradient('L').resize((size, size))
+    img = Image.merge('RGB', [gradient.point(lambda v, c=c: c + v * (255 - c) // 255) for c in top])
+    out = io.BytesIO()
+    img.save(out, format='PNG')
+    return out.getvalue()
+
+
+def _cinelab_recipe(seed):
+    return {
+        "cinematography_recipe": {
+            "phase_1_subject_retention": {
+                "environment_override": {"location": "Studio cyclorama"},
+                "four_by_four_analysis": {"pose": ["Standing", "Hands tucked in pockets"]}
+            },
+            "phase_4_lighting_physics": {
+                "key_light": "Large softbox at 45 degrees camera left",
+                "fill_light": "Bounce board, -2 stops",
+                "back_light": "Strip light rim",
+                "setup": "Three-point setup",
+                "director_notes": f"Synthetic recipe #{seed}"
+            }
+        }
+    }
+
+
+def _camera_override_protocol(seed):
+    return {
+        "camera_override_protocol": {"camera_angle": "eye_level", "shot_scale": "full_shot"},
+        "final_technical_prompt": f"Synthetic architectural re-framing #{seed}, 35mm, eye level.",
+        "consistency_anchors": "Facade materials, window rhythm, roofline"
+    }
+
+
+def _text_payload(prompt_text, system_instruction, mime_type, seed):
+    context = f"{system_instruction or ''} {prompt_text}".lower()
+    if mime_type == "application/json":
+        if "camera override" in context or "camera_override" in context:
+            return json.dumps(_camera_override_protocol(seed), indent=2)
+        return json.dumps(_cinelab_recipe(seed), indent=2)
+    return f"Synthetic product photograph #{seed}: the product on a marble plinth, soft window light."
+
+
+def _config_value(config, key):
+    if config is None:
+        return None
+    if isinstance(config, dict):
+        return config.get(key)
+    return getattr(config, key, None)
+
+
+# --- SDK SURFACE ---
+def configure(api_key=None, **kwargs):
+    """Accepts any key"""
+
+
+def list_models(**kwargs):
+    """Every model named in config/models.py, all supporting generateContent"""
+    for name in sorted(set(MODELS.values()) | {"gemini-2.0-flash-exp-image-generation"}):
+        yield SimpleNamespace(
+            name=f"models/{name}", display_name=name,
+            supported_generation_methods=["generateContent", "countTokens"]
+        )
+
+
+class GenerativeModel:
+    """generate_content() sleeps, maybe fails, then returns synthetic JSON / text / PNG"""
+
+    def __init__(self, model_name="gemini-2.0-flash-exp", system_instruction=None,
+                 generation_config=None, safety_settings=None, **kwargs):
+        self.model_name = model_name if model_name.startswith("models/") else f"models/{model_name}"
+        self._system_instruction = system_instruction
+        self._generation_config = generation_config
+        self._client = None
+
+    def generate_content(self, contents, generation_config=None, safety_settings=None, **kwargs):
+        parts = contents if isinstance(contents, (list, tuple)) else [contents]
+        prompt_text = " ".join(p for p in parts if isinstance(p, str))
+        has_image = any(not isinstance(p, str) for p in parts)
+        config = generation_config if generation_config is not None else self._generation_config
+        count = _config_value(config, "candidate_count") or 1
+        mime_type = _config_value(config, "response_mime_type")
+
+        # Reference image in → prompt text out; text only (Factory) → image out
+        kind = "text" if has_image else "image"
+        with _lock:
+            _stats["calls"] += 1
+            latency = sample_latency(_settings["latency"][kind], _rng)
+            roll = _rng.random()
+            seed = _rng.randrange(10_000)
+            errors = dict(_settings["errors"])
+            retry_after = _settings["retry_after"]
+            size = _settings["image_size"]
+        time.sleep(latency)
+
+        threshold = 0.0
+        for name, error in (("rate_limit", ResourceExhausted), ("server_error", InternalServerError),
+                            ("unavailable", ServiceUnavailable), ("blocked", None)):
+            threshold += errors.get(name, 0.0)
+            if roll < threshold:
+                with _lock:
+                    _stats[name] += 1
+                if error is None:
+                    return GenerateContentResponse([], block_reason="SAFETY")
+                if error is ResourceExhausted:
+                    raise error(f"Resource has been exhausted. Please retry in {retry_after}s.", retry_after)
+                raise error("Injected by fake_genai")
+
+        candidates = []
+        for i in range(count):
+            if kind == "text":
+                part = Part(text=_text_payload(prompt_text, self._system_instruction, mime_type, seed + i))
+            else:
+                shade = int(hashlib.sha1(f"{prompt_text}{seed + i}".encode('utf-8')).hexdigest(), 16) % 16
+                part = Part(inline_data=SimpleNamespace(mime_type="image/png", data=_png(shade, size)))
+            candidates.append(Candidate([part]))
+        return GenerateContentResponse(candidates)
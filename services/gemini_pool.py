@@ -0,0 +1,188 @@
+"""
+CineLab Suite - Gemini Client Pool
+Configure each API key once and reuse model handles across reruns and sessions
+"""
+
+import importlib
+import json
+import threading
+from collections import OrderedDict
+
+from config.models import GENAI_BACKENDS, get_model, get_api_key_name, get_genai_backend
+from services.retry import RetryingModel
+
+# Model handles kept per process (least recently used are dropped)
+MAX_MODELS = 64
+
+
+def _freeze_config(generation_config):
+    if generation_config is None:
+        return None
+    if isinstance(generation_config, dict):
+        return json.dumps(generation_config, sort_keys=True, default=str)
+    return repr(generation_config)
+
+
+class ModelRegistry:
+    """
+    Process-level registry of API keys, transports and GenerativeModel handles
+
+    The first registered key becomes the SDK's global default; every other
+    key gets its own GenerativeServiceClient, so tools on different keys can
+    run side by side without re-calling genai.configure(). Model handles are
+    reused per (key, model, system_instruction, generation_config).
+
+    Registering a key does not import the backend: the SDK is imported and
+    configured on the first model / list_models call (or by warm()).
+    """
+
+    def __init__(self, backend=None, max_models=MAX_MODELS):
+        self.backend = get_genai_backend(backend) if backend is None or isinstance(backend, str) else backend
+        self.max_models = max_models
+        self._genai = None
+        self._keys = {}                 # secret name -> key value
+        self._default_key = None
+        self._configured = None         # key value last passed to genai.configure()
+        self._transports = {}           # key value -> GenerativeServiceClient
+        self._models = OrderedDict()
+        self._lock = threading.RLock()
+        self.stats = {
+            "configure_calls": 0, "configure_skipped": 0,
+            "transports_built": 0, "models_built": 0, "model_reuses": 0
+        }
+
+    @property
+    def genai(self):
+        """The google.generativeai-compatible backend module"""
+        if self._genai is None:
+            self._genai = importlib.import_module(self.backend) if isinstance(self.backend, str) else self.backend
+        return self._genai
+
+    @property
+    def is_fake(self):
+        """True for the local fake backend (services.fake_genai)"""
+        if self._genai is None and self.backend == GENAI_BACKENDS["google"]:
+            return False                # answer without paying the SDK import
+        return getattr(self.genai, 'IS_FAKE', False)
+
+    def _is_google(self):
+        return getattr(self.genai, '__name__', '') == "google.generativeai"
+
+    def configure(self, key_name, api_key):
+        """
+        Register the value of an API key secret
+
+        Cheap to call on every rerun: the SDK is only touched the first
+        time a key is seen or when its value changes.
+        """
+        with self._lock:
+            if self._keys.get(key_name) == api_key:
+                self.stats["configure_skipped"] += 1
+                return
+            old_key = self._keys.get(key_name)
+            self._keys[key_name] = api_key
+            if old_key is not None:
+                # Rotated secret: forget handles bound to the old key
+                for cache_key in [k for k in self._models if k[0] == key_name]:
+                    del self._models[cache_key]
+            if self._default_key is None or self._default_key == old_key:
+                self._default_key = api_key
+
+    def _sdk(self):
+        """Backend module with the default key applied"""
+        genai = self.genai
+        with self._lock:
+            if self._default_key is not None and self._configured != self._default_key:
+                genai.configure(api_key=self._default_key)
+                self._configured = self._default_key
+                self.stats["configure_calls"] += 1
+        return genai
+
+    def _transport(self, api_key):
+        """Dedicated transport for keys other than the SDK default"""
+        if api_key is None or api_key == self._default_key or not self._is_google():
+            return None
+        if api_key not in self._transports:
+            from google.ai import generativelanguage as glm
+            self._transports[api_key] = glm.GenerativeServiceClient(client_options={"api_key": api_key})
+            self.stats["transports_built"] += 1
+        return self._transports[api_key]
+
+    def model(self, tool_name, model_name=None, system_instruction=None, generation_config=None):
+        """Get a (possibly shared), rate-limited, retrying GenerativeModel for specific tool"""
+        key_name = get_api_key_name(tool_name)
+        model_name = model_name or get_model(tool_name)
+        cache_key = (key_name, model_name, system_instruction, _freeze_config(generation_config))
+
+        with self._lock:
+            model = self._models.get(cache_key)
+            if model is not None:
+                self._models.move_to_end(cache_key)
+                self.stats["model_reuses"] += 1
+                return model
+
+            kwargs = {}
+            if system_instruction:
+                kwargs["system_instruction"] = system_instruction
+            if generation_config is not None:
+                kwargs["generation_config"] = generation_config
+            model = self._sdk().GenerativeModel(model_name, **kwargs)
+            transport = self._transport(self._keys.get(key_name))
+            if transport is not None and hasattr(model, '_client'):
+                model._client = transport
+            # Every call on the handle is rate limited, retried and hedged
+            model = RetryingModel(model, tool_name)
+            self.stats["models_built"] += 1
+
+            self._models[cache_key] = model
+            if len(self._models) > self.max_models:
+                self._models.popitem(last=False)
+            return model
+
+    def model_factory(self, tool_name, model_name, system_instruction=None):
+        """Adapter matching the model_factory signature used by cinelab.engines"""
+        return self.model(tool_name, model_name, system_instruction)
+
+    def list_models(self, tool_name):
+        """genai.list_models() using the key of specific tool"""
+        genai = self._sdk()
+        api_key = self._keys.get(get_api_key_name(tool_name))
+        if self._is_google() and api_key is not None and api_key != self._default_key:
+            from google.ai import generativelanguage as glm
+            return genai.list_models(client=glm.ModelServiceClient(client_options={"api_key": api_key}))
+        return genai.list_models()
+
+    def warm(self):
+        """
+        Import the backend, apply the default key and build every key's client
+
+        Called from the background warm-up so the first real request does not
+        pay for the SDK import or transport construction.
+        """
+        genai = self._sdk()              # the import itself runs outside the lock
+        with self._lock:
+            for api_key in set(self._keys.values()):
+                self._transport(api_key)
+            if self._is_google() and self._default_key is not None:
+                from google.generativeai import client as genai_client
+                genai_client.get_default_generative_client()
+        return genai
+
+    def get_stats(self):
+        """Construction vs reuse counters"""
+        with self._lock:
+            return dict(self.stats, keys=len(self._keys), models_cached=len(self._models))
+
+
+# --- PROCESS-WIDE INSTANCE ---
+_registry = ModelRegistry()
+
+def get_registry():
+    """Get the shared model registry"""
+    return _registry
+
+def describe_pool():
+    """One-line summary for the UI"""
+    s = _registry.get_stats()
+    return (f"Models: {s['models_built']} built / {s['model_reuses']} reused · "
+            f"SDK configured {s['configure_calls']}× ({s['configure_skipped']} skipped)")
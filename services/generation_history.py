@@ -0,0 +1,271 @@
+"""
+CineLab Suite - Generation History
+Persistent, indexed record of every generation across tools and sessions
+
+Each fresh (non-cached) result is one row: tool, model, prompt/logic and
+library versions, the reference image hash and the camera / lens / artist /
+angle it was made with, each indexed together with the row id so filtered
+listings page through the index newest first. Params and text outputs are
+stored zlib-compressed; images are stored as returned (already compressed).
+Listings never read the payload columns - only get() does.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+from config.cache import GENERATION_HISTORY
+from config.libraries import TOOL_LIBRARY_MAP
+from config.models import get_model
+from config.prompt_versions import ACTIVE_PROMPTS, get_prompt_version, get_logic_version
+from services.library_store import get_library_version
+
+# Indexed columns and the params keys they are taken from (first present wins)
+FIELDS = {
+    "camera": ("cam",),
+    "lens": ("lens",),
+    "artist": ("artist", "photographer"),
+    "angle": ("camera_angle",)
+}
+FILTERS = ("tool", "model", "prompt_version") + tuple(FIELDS)
+
+# Logic module whose version is recorded per tool
+_TOOL_LOGIC = {"cinelab": "fine_art_nude", "factory": "factory_bridge"}
+
+_LIST_COLUMNS = ("id", "created_at", "tool", "model", "prompt_version", "logic_version", "library_version",
+                 "image_sha256", "camera", "lens", "artist", "angle", "output_mime", "size", "preview")
+_PREVIEW_CHARS = 160
+
+
+def _field(params, keys):
+    for key in keys:
+        value = params.get(key)
+        if value not in (None, ""):
+            return str(value)
+    return None
+
+
+def _hash_range(prefix):
+    # Prefix match that can use the image_sha256 index (LIKE cannot by default)
+    prefix = prefix.lower()
+    return prefix, prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+class GenerationHistory:
+    """
+    SQLite-backed generation log with size-capped retention
+
+    One connection is shared by all sessions in the process and guarded
+    by a lock, as in services/response_cache.py.
+    """
+
+    def __init__(self, path, max_bytes, compress_level, store_images, page_size):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.compress_level = compress_level
+        self.store_images = store_images
+        self.page_size = page_size
+        self.stats = {"writes": 0, "pruned": 0, "failed": 0}
+        self._bytes = None              # running total of the size column
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _db(self):
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS runs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    created_at REAL NOT NULL,
+                    tool TEXT NOT NULL,
+                    model TEXT,
+                    prompt_version TEXT,
+                    logic_version TEXT,
+                    library_version TEXT,
+                    image_sha256 TEXT,
+                    camera TEXT,
+                    lens TEXT,
+                    artist TEXT,
+                    angle TEXT,
+                    params BLOB NOT NULL,
+                    output BLOB NOT NULL,
+                    output_mime TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    preview TEXT
+                )
+            """)
+            # (column, id): equality filter + newest-first paging straight off the index
+            for column in FILTERS + ("image_sha256",):
+                conn.execute(f"CREATE INDEX IF NOT EXISTS runs_{column} ON runs({column}, id)")
+            self._bytes = conn.execute("SELECT COALESCE(SUM(size), 0) FROM runs").fetchone()[0]
+            self._conn = conn
+        return self._conn
+
+    def warm(self):
+        """Open the database (and create the table) ahead of the first write"""
+        with self._lock:
+            self._db()
+
+    # --- WRITE ---
+    def record(self, tool_name, params, output, image_sha256=None, model=None, mime="application/json"):
+        """
+        Store one generation
+
+        Args:
+            tool_name: cinelab, camera_override, product_studio or factory
+            params: settings the result was made with (JSON-serialisable)
+            output: text result, or image bytes for an image mime type
+            image_sha256: reference image hash (None for text-only tools)
+            model: model name (default: the tool's configured model)
+            mime: output type; image/* outputs are stored uncompressed
+
+        Returns:
+            row id, or None when images are not kept or the write failed
+        """
+        is_image = mime.startswith("image/")
+        if is_image and not self.store_images:
+            return None
+        try:
+            library_version = get_library_version(tool_name) if tool_name in TOOL_LIBRARY_MAP else None
+        except FileNotFoundError:
+            library_version = None
+        logic = _TOOL_LOGIC.get(tool_name)
+        params_blob = zlib.compress(json.dumps(params, ensure_ascii=False, default=str).encode('utf-8'),
+                                    self.compress_level)
+        if is_image:
+            output_blob, preview = bytes(output), None
+        else:
+            output_blob = zlib.compress(output.encode('utf-8'), self.compress_level)
+            preview = " ".join(output.split())[:_PREVIEW_CHARS]
+        size = len(params_blob) + len(output_blob)
+        row = (
+            time.time(), tool_name, model or get_model(tool_name),
+            get_prompt_version(tool_name) if tool_name in ACTIVE_PROMPTS else None,
+            get_logic_version(logic) if logic else None,
+            library_version, image_sha256,
+            *(_field(params, keys) for keys in FIELDS.values()),
+            params_blob, output_blob, mime, size, preview
+        )
+        with self._lock:
+            try:
+                db = self._db()
+                cursor = db.execute(
+                    "INSERT INTO runs (created_at, tool, model, prompt_version, logic_version, library_version, "
+                    "image_sha256, camera, lens, artist, angle, params, output, output_mime, size, preview) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", row
+                )
+                self._bytes += size
+                self.stats["writes"] += 1
+                self._prune(db)
+                return cursor.lastrowid
+            except (sqlite3.Error, OSError):
+                self.stats["failed"] += 1
+                return None                 # The result was paid for: never lose it to the log
+
+    def _prune(self, db):
+        if self._bytes <= self.max_bytes:
+            return
+        doomed = []
+        for run_id, size in db.execute("SELECT id, size FROM runs ORDER BY id"):
+            if self._bytes <= self.max_bytes:
+                break
+            doomed.append((run_id,))
+            self._bytes -= size
+        db.executemany("DELETE FROM runs WHERE id = ?", doomed)
+        self.stats["pruned"] += len(doomed)
+
+    # --- READ ---
+    def _where(self, filters, before_id):
+        clauses, args = [], []
+        for column in FILTERS:
+            if filters.get(column):
+                clauses.append(f"{column} = ?")
+                args.append(filters[column])
+        if filters.get("image_sha256"):
+            low, high = _hash_range(filters["image_sha256"])
+            clauses.append("image_sha256 >= ? AND image_sha256 < ?")
+            args += [low, high]
+        if before_id is not None:
+            clauses.append("id < ?")
+            args.append(before_id)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", args
+
+    def query(self, filters=None, before_id=None, limit=None):
+        """
+        One page of runs, newest first (payload columns are not read)
+
+        Args:
+            filters: dict of FILTERS column -> exact value, plus image_sha256 -> hash prefix
+            before_id: keyset cursor - only runs older than this id
+            limit: page size (default: page_size)
+
+        Returns:
+            (rows as dicts, True when older runs remain)
+        """
+        where, args = self._where(filters or {}, before_id)
+        limit = limit or self.page_size
+        with self._lock:
+            rows = self._db().execute(
+                f"SELECT {', '.join(_LIST_COLUMNS)} FROM runs{where} ORDER BY id DESC LIMIT ?", args + [limit + 1]
+            ).fetchall()
+        return [dict(zip(_LIST_COLUMNS, row)) for row in rows[:limit]], len(rows) > limit
+
+    def count(self, filters=None):
+        """Number of runs matching the filters"""
+        where, args = self._where(filters or {}, None)
+        with self._lock:
+            return self._db().execute(f"SELECT COUNT(*) FROM runs{where}", args).fetchone()[0]
+
+    def distinct(self, column, tool_name=None):
+        """Recorded values of one FILTERS column (optionally for one tool), sorted"""
+        if column not in FILTERS:
+            raise ValueError(f"Not a history filter: {column}")
+        where = f" WHERE {column} IS NOT NULL" + (" AND tool = ?" if tool_name and column != "tool" else "")
+        args = [tool_name] if tool_name and column != "tool" else []
+        with self._lock:
+            return [row[0] for row in self._db().execute(
+                f"SELECT DISTINCT {column} FROM runs{where} ORDER BY {column}", args
+            )]
+
+    def get(self, run_id):
+        """
+        One run with its payload decoded
+
+        Returns:
+            dict (params as a dict, output as str or image bytes), or None
+        """
+        with self._lock:
+            row = self._db().execute(
+                f"SELECT {', '.join(_LIST_COLUMNS)}, params, output FROM runs WHERE id = ?", (run_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        run = dict(zip(_LIST_COLUMNS, row))
+        run["params"] = json.loads(zlib.decompress(row[-2]).decode('utf-8'))
+        run["output"] = row[-1] if run["output_mime"].startswith("image/") else zlib.decompress(row[-1]).decode('utf-8')
+        return run
+
+    def get_stats(self):
+        """Counters plus stored runs and bytes"""
+        with self._lock:
+            db = self._db()
+            runs = db.execute("SELECT COUNT(*) FROM runs").fetchone()[0]
+            return dict(self.stats, runs=runs, bytes=self._bytes)
+
+
+# --- PROCESS-WIDE INSTANCE ---
+_history = GenerationHistory(**GENERATION_HISTORY)
+
+def get_generation_history():
+    """Get the shared generation history"""
+    return _history
+
+def describe_generation_history():
+    """One-line summary for the UI"""
+    s = _history.get_stats()
+    return f"History: {s['runs']} runs · {s['bytes'] / 1e6:.1f} MB"
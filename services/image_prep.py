@@ -0,0 +1,119 @@
+"""
+CineLab Suite - Reference Image Pre-processing
+Orientation fix, sRGB normalization, downscale and compact re-encode before upload
+"""
+
+import io
+from functools import lru_cache
+
+from config.images import JPEG_QUALITY, WEBP_QUALITY, get_max_edge
+from services.metrics import timer
+from services.response_cache import image_digest
+
+
+# --- PILLOW (imported on first upload, not with the page) ---
+@lru_cache(maxsize=1)
+def _color_management():
+    """(ImageCms module, sRGB profile), or (None, None) without littleCMS"""
+    try:
+        from PIL import ImageCms
+        return ImageCms, ImageCms.ImageCmsProfile(ImageCms.createProfile("sRGB"))
+    except (ImportError, OSError):
+        return None, None
+
+
+def _to_srgb(img):
+    """Convert embedded colour profiles (Display P3, Adobe RGB, CMYK...) to sRGB"""
+    icc = img.info.get('icc_profile')
+    ImageCms, srgb = _color_management()
+    if icc and ImageCms is not None:
+        try:
+            source = ImageCms.ImageCmsProfile(io.BytesIO(icc))
+            mode = 'RGBA' if 'A' in img.getbands() else 'RGB'
+            return ImageCms.profileToProfile(img, source, srgb, outputMode=mode)
+        except (ImageCms.PyCMSError, OSError, ValueError):
+            pass
+    return img
+
+
+def warm():
+    """Import Pillow and build the sRGB profile ahead of the first upload"""
+    from PIL import Image, ImageOps
+    _color_management()
+
+
+def _has_alpha(img):
+    return 'A' in img.getbands() or (img.mode == 'P' and 'transparency' in img.info)
+
+
+def prepare_image(data, mime_type, tool_name):
+    """
+    Shrink and re-encode a reference image for the model
+
+    Args:
+        data: original uploaded bytes
+        mime_type: original mime type
+        tool_name: tool whose max edge applies (see config/images.py)
+
+    Returns:
+        dict with
+            img_data: {"mime_type", "data"} ready for generate_content
+            sha256: hash of the ORIGINAL bytes (use for cache keys)
+            original_bytes / bytes / saved: sizes before and after
+            size: (width, height) sent to the model
+    """
+    max_edge = get_max_edge(tool_name)
+    report = {
+        "img_data": {"mime_type": mime_type, "data": data},
+        "sha256": image_digest(data),
+        "original_bytes": len(data),
+        "bytes": len(data),
+        "saved": 0,
+        "size": None
+    }
+
+    from PIL import Image, ImageOps
+
+    try:
+        with timer("image_prep", tool=tool_name):
+            img = Image.open(io.BytesIO(data))
+            if img.format == 'JPEG':
+                # DCT-domain downscale while decoding: never below max_edge
+                img.draft('RGB', (max_edge, max_edge))
+            rotated = img.getexif().get(0x0112, 1) != 1
+            img = ImageOps.exif_transpose(img)
+            img = _to_srgb(img)
+            if max(img.size) > max_edge:
+                img.thumbnail((max_edge, max_edge), Image.LANCZOS)
+
+            out = io.BytesIO()
+            if _has_alpha(img):
+                img.convert('RGBA').save(out, format='WEBP', quality=WEBP_QUALITY, method=4)
+                out_mime = 'image/webp'
+            else:
+                img.convert('RGB').save(out, format='JPEG', quality=JPEG_QUALITY, optimize=True, progressive=True)
+                out_mime = 'image/jpeg'
+            encoded = out.getvalue()
+    except Exception:
+        # Unreadable by Pillow - let the model try the original
+        return report
+
+    report["size"] = img.size
+    if rotated or len(encoded) < len(data):
+        report["img_data"] = {"mime_type": out_mime, "data": encoded}
+        report["bytes"] = len(encoded)
+        report["saved"] = len(data) - len(encoded)
+    return report
+
+
+def describe_savings(report):
+    """One-line summary for the UI"""
+    if not report["saved"]:
+        return f"Reference sent as-is ({report['original_bytes'] / 1e3:,.0f} KB)"
+    if report["saved"] < 0:
+        # Re-encoded only to apply the EXIF rotation, and came out larger
+        return (f"Reference re-encoded to fix orientation: {report['original_bytes'] / 1e3:,.0f} KB → "
+                f"{report['bytes'] / 1e3:,.0f} KB (no savings)")
+    pct = 100 * report["saved"] / report["original_bytes"]
+    return (f"Reference optimised: {report['original_bytes'] / 1e3:,.0f} KB → "
+            f"{report['bytes'] / 1e3:,.0f} KB (−{pct:.0f}%)")
@@ -0,0 +1,225 @@
+"""
+CineLab Suite - SQLite Library Backend
+Indexed snapshot of a library JSON, served as a lazy read-only mapping
+
+The snapshot keeps every entry of a section ("cameras", "lenses", ...) as
+one row, and every entry of a grouped section ("photographers" by genre,
+"lighting_presets" by category) as one row under its group. SQLiteLibrary
+answers the same lookups as the frozen JSON tree (lib['cameras'][name],
+lib.get('photographers', {}).get('Fashion', {}), iteration in file order)
+but only reads the keys or rows a lookup needs, so a catalogue of tens of
+thousands of entries costs a few index pages instead of one parsed tree.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import weakref
+from collections.abc import Mapping
+
+SCHEMA = """
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE sections (name TEXT PRIMARY KEY, kind TEXT NOT NULL, position INTEGER NOT NULL, value TEXT);
+CREATE TABLE groups (section TEXT NOT NULL, name TEXT NOT NULL, position INTEGER NOT NULL,
+                     PRIMARY KEY (section, name)) WITHOUT ROWID;
+CREATE TABLE entries (section TEXT NOT NULL, grp TEXT NOT NULL, name TEXT NOT NULL, position INTEGER NOT NULL,
+                      data TEXT NOT NULL, PRIMARY KEY (section, grp, name)) WITHOUT ROWID;
+CREATE INDEX entries_order ON entries(section, grp, position, name);
+"""
+
+
+def section_kind(value):
+    """'grouped' (group -> name -> entry), 'flat' (name -> entry) or 'value' (anything else)"""
+    if not isinstance(value, dict) or not all(isinstance(v, dict) for v in value.values()):
+        return "value"
+    if value and all(v and all(isinstance(e, dict) for e in v.values()) for v in value.values()):
+        return "grouped"
+    return "flat"
+
+
+def build_snapshot(data, version, path):
+    """
+    Write the snapshot of a parsed library (atomically replacing any old one)
+
+    Args:
+        data: parsed library JSON
+        version: content hash of the source file, checked by open_snapshot()
+        path: snapshot file
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    if os.path.exists(tmp):
+        os.remove(tmp)
+    conn = sqlite3.connect(tmp)
+    try:
+        conn.executescript(SCHEMA)
+        entries = []
+        for position, (name, value) in enumerate(data.items()):
+            kind = section_kind(value)
+            conn.execute("INSERT INTO sections VALUES (?, ?, ?, ?)",
+                         (name, kind, position, json.dumps(value, ensure_ascii=False) if kind == "value" else None))
+            groups = value.items() if kind == "grouped" else [("", value)] if kind == "flat" else []
+            for group_position, (group, items) in enumerate(groups):
+                if kind == "grouped":
+                    conn.execute("INSERT INTO groups VALUES (?, ?, ?)", (name, group, group_position))
+                entries.extend(
+                    (name, group, key, i, json.dumps(entry, ensure_ascii=False))
+                    for i, (key, entry) in enumerate(items.items())
+                )
+        conn.executemany("INSERT INTO entries VALUES (?, ?, ?, ?, ?)", entries)
+        conn.execute("INSERT INTO meta VALUES ('version', ?)", (version,))
+        conn.commit()
+    finally:
+        conn.close()
+    os.replace(tmp, path)
+
+
+def snapshot_version(path):
+    """Source hash a snapshot was built from, or None if missing/unreadable"""
+    if not os.path.exists(path):
+        return None
+    try:
+        conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        try:
+            row = conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        return None
+    return row[0] if row else None
+
+
+class _Db:
+    """
+    Read-only connection shared by the views of one snapshot
+
+    Closed once the last view (library, index, search, running fragment)
+    holding it is garbage collected, not when a reload replaces it.
+    """
+
+    def __init__(self, path):
+        self._conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._finalizer = weakref.finalize(self, self._conn.close)
+
+    def rows(self, sql, args=()):
+        with self._lock:
+            return self._conn.execute(sql, args).fetchall()
+
+    def one(self, sql, args=()):
+        with self._lock:
+            return self._conn.execute(sql, args).fetchone()
+
+    def close(self):
+        with self._lock:
+            self._finalizer()
+
+
+class _Entries(Mapping):
+    """name -> frozen entry of one section (or one group of a grouped section)"""
+
+    def __init__(self, db, section, group, freeze):
+        self._db, self._section, self._group, self._freeze = db, section, group, freeze
+
+    def __getitem__(self, name):
+        row = self._db.one("SELECT data FROM entries WHERE section = ? AND grp = ? AND name = ?",
+                           (self._section, self._group, name))
+        if row is None:
+            raise KeyError(name)
+        return self._freeze(json.loads(row[0]))
+
+    def __contains__(self, name):
+        return self._db.one("SELECT 1 FROM entries WHERE section = ? AND grp = ? AND name = ?",
+                            (self._section, self._group, name)) is not None
+
+    def __iter__(self):
+        # Names only: a covering-index scan, no entry data is read
+        return iter([row[0] for row in self._db.rows(
+            "SELECT name FROM entries WHERE section = ? AND grp = ? ORDER BY position",
+            (self._section, self._group)
+        )])
+
+    def __len__(self):
+        return self._db.one("SELECT COUNT(*) FROM entries WHERE section = ? AND grp = ?",
+                            (self._section, self._group))[0]
+
+    def items(self):
+        # One query instead of one lookup per key
+        return [(name, self._freeze(json.loads(data))) for name, data in self._db.rows(
+            "SELECT name, data FROM entries WHERE section = ? AND grp = ? ORDER BY position",
+            (self._section, self._group)
+        )]
+
+    def values(self):
+        return [value for _, value in self.items()]
+
+
+class _Groups(Mapping):
+    """group -> _Entries of a grouped section (e.g. genre -> artists)"""
+
+    def __init__(self, db, section, freeze):
+        self._db, self._section, self._freeze = db, section, freeze
+
+    def __getitem__(self, group):
+        if self._db.one("SELECT 1 FROM groups WHERE section = ? AND name = ?", (self._section, group)) is None:
+            raise KeyError(group)
+        return _Entries(self._db, self._section, group, self._freeze)
+
+    def __iter__(self):
+        return iter([row[0] for row in self._db.rows(
+            "SELECT name FROM groups WHERE section = ? ORDER BY position", (self._section,)
+        )])
+
+    def __len__(self):
+        return self._db.one("SELECT COUNT(*) FROM groups WHERE section = ?", (self._section,))[0]
+
+
+class SQLiteLibrary(Mapping):
+    """
+    Read-only library view backed by a snapshot
+
+    Args:
+        path: snapshot file written by build_snapshot()
+        freeze: turns a parsed entry into the read-only form the JSON backend hands out
+    """
+
+    def __init__(self, path, freeze):
+        self.path = path
+        self._db = _Db(path)
+        self._sections = {}
+        for name, kind, value in self._db.rows("SELECT name, kind, value FROM sections ORDER BY position"):
+            if kind == "value":
+                self._sections[name] = freeze(json.loads(value))
+            elif kind == "grouped":
+                self._sections[name] = _Groups(self._db, name, freeze)
+            else:
+                self._sections[name] = _Entries(self._db, name, "", freeze)
+
+    def __getitem__(self, name):
+        return self._sections[name]
+
+    def __iter__(self):
+        return iter(self._sections)
+
+    def __len__(self):
+        return len(self._sections)
+
+    def close(self):
+        """Close the snapshot connection (the entry views stop working)"""
+        self._db.close()
+
+
+def open_snapshot(raw, version, path, freeze):
+    """
+    SQLiteLibrary for a library file, building the snapshot first if it is stale
+
+    Args:
+        raw: library file bytes (only parsed when a rebuild is needed)
+        version: sha256 of raw
+        path: snapshot file
+        freeze: see SQLiteLibrary
+    """
+    if snapshot_version(path) != version:
+        build_snapshot(json.loads(raw.decode('utf-8')), version, path)
+    return SQLiteLibrary(path, freeze)
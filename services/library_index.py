@@ -0,0 +1,109 @@
+"""
+CineLab Suite - Compiled Library Index
+Pre-sorted selector options and info fragments, built once per library version
+"""
+
+from services.library_store import derive_from_library
+
+
+class _Lazy(dict):
+    """Dict filled on first lookup of each key (KeyError for keys the library lacks)"""
+
+    def __init__(self, build):
+        super().__init__()
+        self._build = build
+
+    def __missing__(self, key):
+        value = self[key] = self._build(key)
+        return value
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+
+class CineLabIndex:
+    """
+    Everything the Prompt Generator / Product Studio derive from cinelab_library.json
+
+    Option lists are tuples ready for st.selectbox; *_info strings are the
+    values passed to prompts.generate_prompt; *_box strings are the
+    'info-box' HTML fragments rendered under each selector.
+
+    Only the top-level option lists are built up front. Per-genre artist
+    lists, info strings and boxes are built on first use and then kept, so
+    with the sqlite backend a catalogue of tens of thousands of entries only
+    reads the genres and entries a page actually shows.
+    """
+
+    __slots__ = (
+        "cameras", "camera_info", "camera_box",
+        "lenses", "lens_info", "lens_box",
+        "genres", "artists", "artist_box", "artist_detail_box",
+        "lighting_categories", "presets", "preset_box"
+    )
+
+    def __init__(self, lib):
+        cameras = lib.get('cameras', {})
+        self.cameras = tuple(sorted(cameras))
+        self.camera_info = _Lazy(lambda name: f"{cameras[name]['info']} | {cameras[name]['vibe']}")
+        self.camera_box = _Lazy(lambda name: _box(self.camera_info[name]))
+
+        lenses = lib.get('lenses', {})
+        self.lenses = tuple(sorted(lenses))
+        self.lens_info = _Lazy(lambda name: f"{lenses[name]['info']} | {lenses[name]['character']}")
+        self.lens_box = _Lazy(lambda name: _box(self.lens_info[name]))
+
+        photographers = lib.get('photographers', {})
+        self.genres = tuple(sorted(photographers))
+        self.artists = _Lazy(lambda genre: tuple(sorted(photographers[genre])))
+        # Keyed by (genre, artist)
+        self.artist_box = _Lazy(lambda key: _box(_style_lighting(photographers[key[0]][key[1]])))
+        self.artist_detail_box = _Lazy(lambda key: _box(
+            f"{_style_lighting(photographers[key[0]][key[1]])}<br><b>Vibe:</b> {photographers[key[0]][key[1]]['vibe']}"
+        ))
+
+        presets = lib.get('lighting_presets', {})
+        self.lighting_categories = tuple(presets)
+        self.presets = _Lazy(lambda l_type: tuple(sorted(presets[l_type])))
+        # Keyed by (category, preset)
+        self.preset_box = _Lazy(lambda key: _box(
+            f"{presets[key[0]][key[1]]['info']} | Result: {presets[key[0]][key[1]]['result']}"
+        ))
+
+
+def _style_lighting(inf):
+    return f"<b>Style:</b> {inf['style']}<br><b>Lighting:</b> {inf['lighting']}"
+
+
+def _box(content):
+    return f"<div class='info-box'>{content}</div>"
+
+
+def search_options(options, query, limit):
+    """
+    Type-ahead matches from a sorted option tuple, case-insensitive
+
+    Prefix matches come first, then the other substring matches, each in
+    option order. An empty query returns the first `limit` options.
+    """
+    query = query.strip().lower()
+    if not query:
+        return list(options[:limit])
+    prefix, inner = [], []
+    for option in options:
+        name = option.lower()
+        if name.startswith(query):
+            prefix.append(option)
+            if len(prefix) >= limit:
+                break
+        elif query in name and len(inner) < limit:
+            inner.append(option)
+    return (prefix + inner)[:limit]
+
+
+def get_cinelab_index(tool_name="cinelab"):
+    """Get compiled index for a tool that reads cinelab_library.json"""
+    return derive_from_library(tool_name, CineLabIndex)
@@ -0,0 +1,214 @@
+"""
+CineLab Suite - Library Search
+Ranked type-ahead search over library entries, built once per library version
+
+Every entry of a library (cameras, lenses, photographers of every genre,
+lighting presets, camera angles, ...) is one document: its name and
+ui_label, plus its group and SEARCH_FIELDS text (style, lighting, vibe, ...).
+Words map to posting arrays of document ids; the sorted vocabulary answers
+word-prefix lookups and a trigram index over the vocabulary answers
+substrings inside words, so a query only touches the postings of the words
+it can match. Matches in the name rank above matches in the text, prefixes
+above substrings, and every query word has to match.
+"""
+
+import heapq
+import re
+from array import array
+from bisect import bisect_left
+from collections import defaultdict
+from collections.abc import Mapping
+
+from config.libraries import SEARCH_FIELDS, SEARCH_LIMIT, TOOL_LIBRARY_MAP
+from services.library_store import derive_from_library
+
+_WORD = re.compile(r"[^\W_]+")
+_SNIPPET_CHARS = 120
+# A single letter only matches names: as a text prefix it hits most entries
+_MIN_TEXT_TOKEN = 2
+
+# Per query word: name word prefix < name word substring < text word prefix < text word substring
+_NAME, _TEXT, _SUBSTRING = 0, 2, 1
+
+
+def _words(text):
+    return _WORD.findall(text.lower())
+
+
+def _trigrams(word):
+    return {word[i:i + 3] for i in range(len(word) - 2)}
+
+
+def _entries(lib):
+    """(section, group, name, entry) of every flat (name -> entry) and grouped (group -> name -> entry) section"""
+    for section, value in lib.items():
+        if not isinstance(value, Mapping):
+            continue
+        items = list(value.items())
+        if not items or not all(isinstance(v, Mapping) for _, v in items):
+            continue                                    # e.g. metadata
+        groups = [(group, list(v.items())) for group, v in items]
+        if all(entries and all(isinstance(e, Mapping) for _, e in entries) for _, entries in groups):
+            for group, entries in groups:
+                for name, entry in entries:
+                    yield section, group, name, entry
+        else:
+            for name, entry in items:
+                yield section, None, name, entry
+
+
+def _text(entry):
+    return " ".join(entry[field] for field in SEARCH_FIELDS if isinstance(entry.get(field), str))
+
+
+class LibrarySearch:
+    """
+    Search index of one library file (build with derive_from_library)
+
+    Args:
+        lib: read-only library view
+    """
+
+    def __init__(self, lib):
+        self._lib = lib
+        self._docs = []                     # (section, group, name, label)
+        name_post, text_post = defaultdict(list), defaultdict(list)
+        for doc_id, (section, group, name, entry) in enumerate(_entries(lib)):
+            label = entry.get("ui_label") if isinstance(entry.get("ui_label"), str) else name
+            self._docs.append((section, group, name, label))
+            name_words = set(_words(f"{name} {label}"))
+            for word in name_words:
+                name_post[word].append(doc_id)
+            # Group (genre, lighting category) counts as entry text
+            for word in set(_words(f"{group or ''} {_text(entry)}")) - name_words:
+                text_post[word].append(doc_id)
+
+        # Compact postings: 4 bytes per (word, document)
+        self._name_post = {word: array('I', ids) for word, ids in name_post.items()}
+        self._text_post = {word: array('I', ids) for word, ids in text_post.items()}
+        self._vocab = sorted(set(name_post) | set(text_post))
+        self._grams = defaultdict(set)      # trigram -> vocabulary words containing it
+        for word in self._vocab:
+            for gram in _trigrams(word):
+                self._grams[gram].add(word)
+
+    def __len__(self):
+        return len(self._docs)
+
+    def _matching_words(self, token):
+        """(word, tier offset) of vocabulary words starting with or (3+ chars) containing token"""
+        found = []
+        i = bisect_left(self._vocab, token)
+        while i < len(self._vocab) and self._vocab[i].startswith(token):
+            found.append((self._vocab[i], 0))
+            i += 1
+        if len(token) >= 3:
+            sets = sorted((self._grams.get(gram, set()) for gram in _trigrams(token)), key=len)
+            for word in set.intersection(*sets) if sets[0] else ():
+                if token in word and not word.startswith(token):
+                    found.append((word, _SUBSTRING))
+        return found
+
+    def search(self, query, sections=None, group=None, limit=SEARCH_LIMIT):
+        """
+        Ranked matches for a query
+
+        Args:
+            query: free text; every word must match a name or text word
+            sections: only these sections (e.g. ("cameras",)); default all
+            group: only this group of a grouped section (e.g. a genre)
+            limit: most matches returned
+
+        Returns:
+            list of dicts with section, group, name, label, score (lower is better)
+        """
+        tokens = _words(query)
+        if not tokens:
+            return []
+        scores = None
+        for token in tokens:
+            tiers = {}
+            sources = ((self._name_post, _NAME), (self._text_post, _TEXT))
+            for word, offset in self._matching_words(token):
+                for postings, base in sources[:1 if len(token) < _MIN_TEXT_TOKEN else 2]:
+                    tier = base + offset
+                    for doc_id in postings.get(word, ()):
+                        if tiers.get(doc_id, 9) > tier:
+                            tiers[doc_id] = tier
+            if scores is None:
+                scores = tiers
+            else:
+                scores = {doc_id: score + tiers[doc_id] for doc_id, score in scores.items() if doc_id in tiers}
+            if not scores:
+                return []
+
+        docs = self._docs
+        if sections is not None or group is not None:
+            scores = {
+                doc_id: score for doc_id, score in scores.items()
+                if (sections is None or docs[doc_id][0] in sections) and (group is None or docs[doc_id][1] == group)
+            }
+        phrase = " ".join(tokens)
+
+        def rank(doc_id):
+            name = docs[doc_id][3].lower()
+            # Whole query at the start of the name beats everything else
+            bonus = -2 if name.startswith(phrase) else -1 if phrase in name else 0
+            return (scores[doc_id] + bonus, len(name), name)
+
+        return [
+            {"section": docs[doc_id][0], "group": docs[doc_id][1], "name": docs[doc_id][2],
+             "label": docs[doc_id][3], "score": rank(doc_id)}
+            for doc_id in heapq.nsmallest(limit, scores, key=rank)
+        ]
+
+    def snippet(self, hit):
+        """Text of the first SEARCH_FIELDS field of a hit's entry (shortened), '' if none"""
+        section = self._lib[hit["section"]]
+        entry = (section[hit["group"]] if hit["group"] is not None else section)[hit["name"]]
+        text = _text(entry)
+        return text if len(text) <= _SNIPPET_CHARS else text[:_SNIPPET_CHARS - 1].rsplit(" ", 1)[0] + "…"
+
+    def searcher(self, section, group=None):
+        """
+        search= callable for components.selectors.render_search_select over one section
+
+        Args:
+            section: library section the selector lists
+            group: group within a grouped section
+        """
+        def search(options, query, limit):
+            if not _words(query):
+                return list(options[:limit])
+            return [hit["name"] for hit in self.search(query, (section,), group, limit)]
+        return search
+
+
+# --- PER-LIBRARY INDEXES ---
+def get_library_search(tool_name="cinelab"):
+    """Get search index of the library a tool reads, rebuilt only when it changes"""
+    return derive_from_library(tool_name, LibrarySearch)
+
+
+def search_libraries(query, tool_names=None, sections=None, limit=SEARCH_LIMIT):
+    """
+    Ranked matches across several libraries
+
+    Args:
+        query: free text
+        tool_names: tools whose libraries are searched (default: every library file once)
+        sections: only these sections
+        limit: most matches returned
+
+    Returns:
+        search() hits, each with the tool it came from
+    """
+    if tool_names is None:
+        files = {}
+        for tool_name, file_name in TOOL_LIBRARY_MAP.items():
+            files.setdefault(file_name, tool_name)
+        tool_names = list(files.values())
+    hits = []
+    for tool_name in tool_names:
+        hits.extend(dict(hit, tool=tool_name) for hit in get_library_search(tool_name).search(query, sections, limit=limit))
+    return heapq.nsmallest(limit, hits, key=lambda hit: hit["score"])
@@ -0,0 +1,179 @@
+"""
+CineLab Suite - Library Store
+Process-wide, hot-reloading cache of the JSON libraries in data/
+
+With LIBRARY_BACKEND = "sqlite" the same views are served from indexed
+snapshots (services/library_db.py) instead of parsed trees.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from types import MappingProxyType
+
+from config.libraries import LIBRARY_BACKEND, LIBRARY_CHECK_INTERVAL, LIBRARY_SNAPSHOT_DIR, get_library_file
+from services.library_db import open_snapshot
+from services.metrics import observe
+
+DATA_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'data'))
+
+
+def freeze(value):
+    """Recursively turn dicts into read-only mappings and lists into tuples"""
+    if isinstance(value, dict):
+        return MappingProxyType({k: freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(freeze(v) for v in value)
+    return value
+
+
+class _Entry:
+    """One loaded library file"""
+
+    __slots__ = ("view", "version", "signature", "checked_at", "derived")
+
+    def __init__(self, view, version, signature, checked_at):
+        self.view = view
+        self.version = version          # sha256 of the file contents
+        self.signature = signature      # (mtime_ns, size) seen on last stat
+        self.checked_at = checked_at
+        self.derived = {}               # builder -> value, dropped on reload
+
+
+class LibraryStore:
+    """
+    Shared library cache for every session in the process
+
+    Each file is parsed once and handed out as a frozen view. A loaded
+    file is re-stat'ed at most every `check_interval` seconds; it is only
+    re-read when mtime/size change and only re-parsed when its content
+    hash changes, so an edit is picked up without a restart.
+    """
+
+    def __init__(self, data_dir=DATA_DIR, check_interval=LIBRARY_CHECK_INTERVAL,
+                 backend=LIBRARY_BACKEND, snapshot_dir=LIBRARY_SNAPSHOT_DIR):
+        self.data_dir = data_dir
+        self.check_interval = check_interval
+        self.backend = backend
+        self.snapshot_dir = snapshot_dir
+        self._entries = {}
+        self._lock = threading.Lock()
+        self.stats = {
+            "hits": 0, "checks": 0, "reloads": 0, "reload_errors": 0, "derived_builds": 0
+        }
+
+    def get(self, file_name):
+        """
+        Get read-only view of a library file
+
+        Raises:
+            FileNotFoundError: if the file has never been loaded and is missing
+        """
+        return self._entry(file_name).view
+
+    def version(self, file_name):
+        """Get content hash of the currently served library"""
+        return self._entry(file_name).version
+
+    def derive(self, file_name, builder):
+        """
+        Get builder(view), computed once per library version
+
+        Args:
+            file_name: library file in data/
+            builder: pure function of the read-only library view
+
+        Returns:
+            Cached builder result; rebuilt only after the library changes
+        """
+        entry = self._entry(file_name)
+        try:
+            return entry.derived[builder]
+        except KeyError:
+            pass
+        value = builder(entry.view)
+        entry.derived[builder] = value
+        with self._lock:
+            self.stats["derived_builds"] += 1
+        return value
+
+    def get_stats(self):
+        """Snapshot of hit/reload counters"""
+        with self._lock:
+            return dict(self.stats, loaded=sorted(self._entries), backend=self.backend)
+
+    def snapshot_path(self, file_name):
+        """SQLite snapshot file of a library (sqlite backend)"""
+        return os.path.join(self.snapshot_dir, os.path.splitext(file_name)[0] + ".sqlite3")
+
+    def _entry(self, file_name):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(file_name)
+            if entry is not None and now - entry.checked_at < self.check_interval:
+                self.stats["hits"] += 1
+                return entry
+            return self._refresh(file_name, entry, now)
+
+    def _refresh(self, file_name, entry, now):
+        path = os.path.join(self.data_dir, file_name)
+        self.stats["checks"] += 1
+        try:
+            stat = os.stat(path)
+            signature = (stat.st_mtime_ns, stat.st_size)
+            if entry is not None and entry.signature == signature:
+                entry.checked_at = now
+                self.stats["hits"] += 1
+                return entry
+
+            started = time.perf_counter()
+            with open(path, 'rb') as f:
+                raw = f.read()
+            version = hashlib.sha256(raw).hexdigest()
+            if entry is not None and entry.version == version:
+                # Touched but not changed - keep the parsed view
+                entry.signature = signature
+                entry.checked_at = now
+                self.stats["hits"] += 1
+                return entry
+
+            if self.backend == "sqlite":
+                view = open_snapshot(raw, version, self.snapshot_path(file_name), freeze)
+            else:
+                view = freeze(json.loads(raw.decode('utf-8')))
+            observe("library_load", time.perf_counter() - started, file=file_name, backend=self.backend)
+        except (OSError, ValueError, sqlite3.Error):
+            # Half-written or removed file: keep serving the last good copy
+            if entry is None:
+                raise
+            self.stats["reload_errors"] += 1
+            entry.checked_at = now
+            return entry
+
+        entry = _Entry(view, version, signature, now)
+        self._entries[file_name] = entry
+        self.stats["reloads"] += 1
+        return entry
+
+
+# --- PROCESS-WIDE INSTANCE ---
+_store = LibraryStore()
+
+def get_store():
+    """Get the shared library store"""
+    return _store
+
+def get_library(tool_name):
+    """Get read-only library view for specific tool"""
+    return _store.get(get_library_file(tool_name))
+
+def derive_from_library(tool_name, builder):
+    """Get builder(library) for specific tool, cached per library version"""
+    return _store.derive(get_library_file(tool_name), builder)
+
+def get_library_version(tool_name):
+    """Get content hash of the library used by specific tool"""
+    return _store.version(get_library_file(tool_name))
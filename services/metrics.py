@@ -0,0 +1,214 @@
+"""
+CineLab Suite - Stage Metrics
+Labelled latency histograms with Prometheus text and JSON-lines export
+"""
+
+import atexit
+import bisect
+import functools
+import json
+import os
+import threading
+import time
+
+from config.metrics import LATENCY_BUCKETS, METRICS
+
+METRIC_NAME = "cinelab_stage_seconds"
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram (Prometheus semantics)"""
+
+    __slots__ = ("bounds", "counts", "total", "count")
+
+    def __init__(self, bounds=LATENCY_BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)   # last slot is +Inf
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(self.bounds, seconds)] += 1
+        self.total += seconds
+        self.count += 1
+
+    def cumulative(self):
+        """[(upper bound, cumulative count)] including +Inf"""
+        running, out = 0, []
+        for bound, n in zip(self.bounds + (float("inf"),), self.counts):
+            running += n
+            out.append((bound, running))
+        return out
+
+    def quantile(self, q):
+        """Bucket upper bound containing quantile q (0-1)"""
+        if not self.count:
+            return None
+        target = q * self.count
+        for bound, running in self.cumulative():
+            if running >= target:
+                return bound
+        return float("inf")
+
+
+class _Timer:
+    """Context manager / decorator produced by MetricsRegistry.timer()"""
+
+    __slots__ = ("_registry", "_stage", "_labels", "_started")
+
+    def __init__(self, registry, stage, labels):
+        self._registry = registry
+        self._stage = stage
+        self._labels = labels
+        self._started = None
+
+    def __enter__(self):
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        labels = dict(self._labels, outcome="error") if exc_type is not None else self._labels
+        self._registry.observe(self._stage, time.perf_counter() - self._started, **labels)
+        return False
+
+    def __call__(self, fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with _Timer(self._registry, self._stage, self._labels):
+                return fn(*args, **kwargs)
+        return wrapper
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _label_text(labels, extra=None):
+    items = list(labels) + ([extra] if extra else [])
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in items) + "}"
+
+
+class MetricsRegistry:
+    """
+    In-memory histograms keyed by stage + labels
+
+    Every observation also lands in an event buffer; both are written to
+    `out_dir` at most every `flush_interval` seconds:
+    metrics.prom (Prometheus text, replaced atomically) and
+    events.jsonl (one line per timed stage, appended).
+    """
+
+    def __init__(self, out_dir=METRICS["dir"], flush_interval=METRICS["flush_interval"],
+                 enabled=METRICS["enabled"], max_buffered=METRICS["max_buffered_events"]):
+        self.out_dir = out_dir
+        self.flush_interval = flush_interval
+        self.enabled = enabled
+        self.max_buffered = max_buffered
+        self._histograms = {}           # (stage, sorted label items) -> Histogram
+        self._events = []
+        self._dropped = 0
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+
+    def timer(self, stage, **labels):
+        """
+        Time a block or function
+
+        Usage:
+            with timer("generate_prompt", tool="cinelab", prompt_version="v1"):
+                ...
+
+            @timer("extract_response")
+            def safe_extract_response(...): ...
+        """
+        return _Timer(self, stage, {k: v for k, v in labels.items() if v is not None})
+
+    def observe(self, stage, seconds, **labels):
+        """Record one duration (seconds) for a stage"""
+        if not self.enabled:
+            return
+        key = (stage, tuple(sorted((k, str(v)) for k, v in labels.items() if v is not None)))
+        with self._lock:
+            hist = self._histograms.get(key)
+            if hist is None:
+                hist = self._histograms[key] = Histogram()
+            hist.observe(seconds)
+            if len(self._events) < self.max_buffered:
+                self._events.append({"ts": round(time.time(), 3), "stage": stage,
+                                     "seconds": round(seconds, 6), **dict(key[1])})
+            else:
+                self._dropped += 1
+            due = time.monotonic() - self._last_flush >= self.flush_interval
+        if due:
+            self.flush()
+
+    def prometheus_text(self):
+        """All histograms in Prometheus text exposition format"""
+        with self._lock:
+            items = [(key, list(h.cumulative()), h.total, h.count) for key, h in sorted(self._histograms.items())]
+        lines = [f"# HELP {METRIC_NAME} Time spent per CineLab pipeline stage",
+                 f"# TYPE {METRIC_NAME} histogram"]
+        for (stage, labels), buckets, total, count in items:
+            base = (("stage", stage),) + labels
+            for bound, running in buckets:
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f"{METRIC_NAME}_bucket{_label_text(base, ('le', le))} {running}")
+            lines.append(f"{METRIC_NAME}_sum{_label_text(base)} {total:.6f}")
+            lines.append(f"{METRIC_NAME}_count{_label_text(base)} {count}")
+        return "\n".join(lines) + "\n"
+
+    def flush(self):
+        """Write metrics.prom and append buffered events to events.jsonl"""
+        if not self._flush_lock.acquire(blocking=False):
+            return                      # Another thread is already flushing
+        try:
+            with self._lock:
+                events, self._events = self._events, []
+                dropped, self._dropped = self._dropped, 0
+                self._last_flush = time.monotonic()
+            os.makedirs(self.out_dir, exist_ok=True)
+            prom_path = os.path.join(self.out_dir, "metrics.prom")
+            tmp_path = f"{prom_path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(self.prometheus_text())
+            os.replace(tmp_path, prom_path)
+            if events or dropped:
+                with open(os.path.join(self.out_dir, "events.jsonl"), 'a', encoding='utf-8') as f:
+                    for event in events:
+                        f.write(json.dumps(event, ensure_ascii=False) + "\n")
+                    if dropped:
+                        f.write(json.dumps({"ts": round(time.time(), 3), "dropped_events": dropped}) + "\n")
+        except OSError:
+            pass                        # Metrics must never break a request
+        finally:
+            self._flush_lock.release()
+
+    def summary(self):
+        """Rows of stage, labels, count, mean and bucketed p50/p95"""
+        with self._lock:
+            items = sorted(self._histograms.items())
+            return [
+                {"stage": stage, **dict(labels), "count": h.count,
+                 "mean_s": round(h.total / h.count, 4), "p50_s": h.quantile(0.5), "p95_s": h.quantile(0.95)}
+                for (stage, labels), h in items
+            ]
+
+
+# --- PROCESS-WIDE INSTANCE ---
+_metrics = MetricsRegistry()
+
+def get_metrics():
+    """Get the shared metrics registry"""
+    return _metrics
+
+def timer(stage, **labels):
+    """Timer on the shared registry (context manager or decorator)"""
+    return _metrics.timer(stage, **labels)
+
+def observe(stage, seconds, **labels):
+    """Record a duration on the shared registry"""
+    _metrics.observe(stage, seconds, **labels)
+
+# Export whatever is still buffered when the process exits
+atexit.register(_metrics.flush)
@@ -0,0 +1,220 @@
+"""
+CineLab Suite - Rate Limiter
+Token buckets per API key with round-robin queuing between sessions
+"""
+
+import contextvars
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+
+from config.models import TOOL_API_MAP, get_rate_limit
+
+# Rough request-size estimate used against the TPM budget
+CHARS_PER_TOKEN = 4
+IMAGE_TOKENS = 1032           # ~4 tiles of 258 tokens for a downscaled reference
+DEFAULT_OUTPUT_TOKENS = 1024
+
+_session = contextvars.ContextVar("cinelab_session", default=None)
+_on_wait = contextvars.ContextVar("cinelab_on_wait", default=None)
+
+
+def current_session_id():
+    """Session id set by session_scope(), else the Streamlit session, else 'default'"""
+    session_id = _session.get()
+    if session_id is not None:
+        return session_id
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+        ctx = get_script_run_ctx(suppress_warning=True)
+    except ImportError:
+        ctx = None
+    return ctx.session_id if ctx is not None else "default"
+
+
+@contextmanager
+def session_scope(session_id=None, on_wait=None):
+    """
+    Attribute model calls in this block to a session
+
+    Args:
+        session_id: queue owner (defaults to the current Streamlit session)
+        on_wait: callback(position, eta_seconds) while queued; it runs in the
+            calling thread, so only pass UI callbacks from the script thread
+    """
+    session_token = _session.set(session_id or current_session_id())
+    wait_token = _on_wait.set(on_wait)
+    try:
+        yield
+    finally:
+        _on_wait.reset(wait_token)
+        _session.reset(session_token)
+
+
+def estimate_tokens(contents, generation_config=None):
+    """Approximate prompt + output tokens of one generate_content call"""
+    parts = contents if isinstance(contents, (list, tuple)) else [contents]
+    total = 0
+    for part in parts:
+        if isinstance(part, str):
+            total += len(part) // CHARS_PER_TOKEN
+        else:
+            total += IMAGE_TOKENS
+    config = generation_config if isinstance(generation_config, dict) else {}
+    return total + config.get("max_output_tokens", DEFAULT_OUTPUT_TOKENS)
+
+
+class _Bucket:
+    def __init__(self, per_minute):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.level = self.capacity
+        self.stamp = time.monotonic()
+
+    def refill(self, now):
+        self.level = min(self.capacity, self.level + (now - self.stamp) * self.rate)
+        self.stamp = now
+
+    def take(self, amount):
+        self.level -= min(amount, self.capacity)
+
+
+class _Ticket:
+    __slots__ = ("session_id", "tokens")
+
+    def __init__(self, session_id, tokens):
+        self.session_id = session_id
+        self.tokens = tokens
+
+
+class KeyRateLimiter:
+    """
+    RPM/TPM budget for one API key
+
+    Waiting calls are queued per session and served round-robin, so one
+    session's 4-up grid or batch cannot starve everyone else.
+    """
+
+    def __init__(self, rpm, tpm=None):
+        self.requests = _Bucket(rpm)
+        self.tokens = _Bucket(tpm) if tpm else None
+        self._cond = threading.Condition()
+        self._queues = OrderedDict()        # session -> deque of tickets
+        self.stats = {"granted": 0, "queued": 0, "wait_seconds": 0.0}
+
+    def _order(self):
+        """Waiting tickets in service order"""
+        queues = list(self._queues.values())
+        order = []
+        for i in range(max((len(q) for q in queues), default=0)):
+            order.extend(q[i] for q in queues if i < len(q))
+        return order
+
+    def _wait_for(self, tickets):
+        """Seconds until the budget covers `tickets` back to back"""
+        wait = (len(tickets) - self.requests.level) / self.requests.rate
+        if self.tokens is not None:
+            needed = sum(min(t.tokens, self.tokens.capacity) for t in tickets)
+            wait = max(wait, (needed - self.tokens.level) / self.tokens.rate)
+        return max(wait, 0.0)
+
+    def _remove(self, ticket):
+        queue = self._queues.get(ticket.session_id)
+        if queue is not None and ticket in queue:
+            queue.remove(ticket)
+            if not queue:
+                del self._queues[ticket.session_id]
+
+    def acquire(self, session_id, tokens=1, on_wait=None):
+        """
+        Block until the budget allows one request of `tokens` tokens
+
+        Returns:
+            Seconds spent waiting
+        """
+        ticket = _Ticket(session_id, tokens)
+        started = time.monotonic()
+        with self._cond:
+            self._queues.setdefault(session_id, deque()).append(ticket)
+            try:
+                while True:
+                    now = time.monotonic()
+                    self.requests.refill(now)
+                    if self.tokens is not None:
+                        self.tokens.refill(now)
+                    order = self._order()
+                    position = order.index(ticket)
+                    if position == 0 and self._wait_for([ticket]) <= 0:
+                        self.requests.take(1)
+                        if self.tokens is not None:
+                            self.tokens.take(tokens)
+                        self._remove(ticket)
+                        # Round robin: this session goes to the back of the line
+                        if session_id in self._queues:
+                            self._queues.move_to_end(session_id)
+                        waited = now - started
+                        self.stats["granted"] += 1
+                        self.stats["wait_seconds"] += waited
+                        if waited > 0.01:
+                            self.stats["queued"] += 1
+                        self._cond.notify_all()
+                        return waited
+
+                    eta = self._wait_for(order[:position + 1])
+                    if on_wait is not None:
+                        self._cond.release()
+                        try:
+                            on_wait(position + 1, eta)
+                        finally:
+                            self._cond.acquire()
+                    head_wait = self._wait_for(order[:1])
+                    self._cond.wait(timeout=min(max(head_wait, 0.05), 0.5))
+            except BaseException:
+                self._remove(ticket)
+                self._cond.notify_all()
+                raise
+
+    def session_status(self, session_id):
+        """(queued calls, best position, eta seconds) for a session, or None"""
+        with self._cond:
+            order = self._order()
+            mine = [i for i, t in enumerate(order) if t.session_id == session_id]
+            if not mine:
+                return None
+            return len(mine), mine[0] + 1, self._wait_for(order[:mine[0] + 1])
+
+    def get_stats(self):
+        with self._cond:
+            return dict(self.stats, waiting=sum(len(q) for q in self._queues.values()))
+
+
+# --- PROCESS-WIDE LIMITERS (one per API key) ---
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+def get_limiter(tool_name):
+    """Get the shared limiter for the API key used by specific tool"""
+    api = TOOL_API_MAP.get(tool_name, "api_1")
+    with _limiters_lock:
+        if api not in _limiters:
+            budget = get_rate_limit(tool_name)
+            _limiters[api] = KeyRateLimiter(budget["rpm"], budget.get("tpm"))
+        return _limiters[api]
+
+def acquire(tool_name, tokens=1):
+    """Wait for budget on behalf of the current session"""
+    return get_limiter(tool_name).acquire(current_session_id(), tokens, _on_wait.get())
+
+def describe_wait(position, eta):
+    """on_wait message for a single queued call"""
+    return f"⏳ Waiting for rate limit: #{position} in line · ~{eta:.0f}s"
+
+def describe_queue(tool_name, session_id=None):
+    """Queue position / ETA line for the UI ('' when nothing is waiting)"""
+    status = get_limiter(tool_name).session_status(session_id or current_session_id())
+    if status is None:
+        return ""
+    count, position, eta = status
+    return f"⏳ Rate limit: {count} call(s) queued · next is #{position} in line · ~{eta:.0f}s"
+
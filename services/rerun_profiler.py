@@ -0,0 +1,269 @@
+"""
+CineLab Suite - Rerun Profiler
+Opt-in per-rerun timing, element counts and payload bytes for page scripts
+
+Usage in a page (right after st.set_page_config):
+    profiler = start_rerun("prompt_generator")
+    profiler.mark("theme")
+    ...
+    profiler.mark("output")
+    ...
+    profiler.finish()
+
+Each mark() closes the previous section. Disabled (the default), every
+call is a no-op. A rerun cut short by st.stop()/st.rerun() is discarded
+when the session's next rerun starts.
+"""
+
+import cProfile
+import os
+import threading
+import time
+import tracemalloc
+from collections import deque
+
+import streamlit as st
+
+from config.metrics import PROFILER
+from services.metrics import observe
+
+MODES = {"1": "cprofile", "on": "cprofile", "true": "cprofile", "cprofile": "cprofile", "mem": "mem"}
+
+
+class _NullProfile:
+    enabled = False
+
+    def mark(self, section):
+        pass
+
+    def finish(self):
+        pass
+
+
+_NULL = _NullProfile()
+
+
+class ProfileStore:
+    """Recent rerun records per page and the dumps of the slowest ones"""
+
+    def __init__(self, out_dir, keep_slowest, history):
+        self.out_dir = out_dir
+        self.keep_slowest = keep_slowest
+        self.history = history
+        self._records = {}              # page -> deque of records
+        self._slowest = {}              # page -> [(wall, [paths])], slowest first
+        self._lock = threading.Lock()
+
+    def is_slow(self, page, wall):
+        """True if a rerun this slow belongs among the kept dumps"""
+        with self._lock:
+            slowest = self._slowest.get(page, [])
+            return len(slowest) < self.keep_slowest or wall > slowest[-1][0]
+
+    def add(self, page, record, dumps=()):
+        with self._lock:
+            self._records.setdefault(page, deque(maxlen=self.history)).append(record)
+            if not dumps:
+                return
+            slowest = self._slowest.setdefault(page, [])
+            slowest.append((record["wall"], list(dumps)))
+            slowest.sort(key=lambda item: item[0], reverse=True)
+            evicted = slowest[self.keep_slowest:]
+            del slowest[self.keep_slowest:]
+        for _, paths in evicted:
+            for path in paths:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    def records(self, page):
+        with self._lock:
+            return list(self._records.get(page, ()))
+
+    def dumps(self, page):
+        with self._lock:
+            return [(wall, list(paths)) for wall, paths in self._slowest.get(page, [])]
+
+
+class RerunProfile:
+    """Measures one script run of one page"""
+
+    enabled = True
+
+    def __init__(self, page, mode, store):
+        self.page = page
+        self.mode = mode
+        self.store = store
+        self.sections = {}              # name -> [seconds, elements, bytes]
+        self._current = "setup"
+        self._started = time.perf_counter()
+        self._section_started = self._started
+        self._ctx = None
+        self._original_enqueue = None
+        self._profiler = None
+        self._tracing = False
+
+        self._wrap_enqueue()
+        if mode == "mem" and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._tracing = True
+        self._profiler = cProfile.Profile()
+        try:
+            self._profiler.enable()
+        except ValueError:
+            # Another profiler is active on this thread
+            self._profiler = None
+
+    def _section(self, name):
+        return self.sections.setdefault(name, [0.0, 0, 0])
+
+    def _wrap_enqueue(self):
+        """Count deltas and serialized bytes of every message this rerun sends"""
+        ctx = _script_ctx()
+        if ctx is None or not hasattr(ctx, "_enqueue"):
+            return
+        original = ctx._enqueue
+        ctx._cinelab_profile = self
+
+        def enqueue(msg):
+            section = self._section(self._current)
+            if msg.HasField("delta"):
+                section[1] += 1
+            section[2] += msg.ByteSize()
+            original(msg)
+
+        ctx._enqueue = enqueue
+        self._ctx = ctx
+        self._original_enqueue = original
+
+    def _unwrap_enqueue(self):
+        if self._ctx is not None:
+            self._ctx._enqueue = self._original_enqueue
+            self._ctx._cinelab_profile = None
+            self._ctx = None
+
+    def abort(self):
+        """Undo all hooks without recording (rerun never reached finish())"""
+        if self._profiler is not None:
+            self._profiler.disable()
+            self._profiler = None
+        self._unwrap_enqueue()
+        if self._tracing:
+            tracemalloc.stop()
+            self._tracing = False
+
+    def mark(self, section):
+        """Close the running section and start `section`"""
+        now = time.perf_counter()
+        self._section(self._current)[0] += now - self._section_started
+        self._current = section
+        self._section_started = now
+
+    def finish(self):
+        """Record this rerun, dump profiles if it is among the slowest, show the panel"""
+        self.mark("panel")
+        if self._profiler is not None:
+            self._profiler.disable()
+        self._unwrap_enqueue()
+        wall = self._section_started - self._started
+        self.sections.pop("panel", None)
+
+        record = {
+            "ts": time.time(),
+            "wall": wall,
+            "elements": sum(s[1] for s in self.sections.values()),
+            "bytes": sum(s[2] for s in self.sections.values()),
+            "sections": {name: tuple(s) for name, s in self.sections.items()}
+        }
+        dumps = []
+        if self.store.is_slow(self.page, wall):
+            dumps = self._dump(wall)
+        if self._tracing:
+            tracemalloc.stop()
+        self.store.add(self.page, record, dumps)
+        observe("rerun", wall, page=self.page)
+        render_panel(self.page, record, self.store)
+
+    def _dump(self, wall):
+        os.makedirs(self.store.out_dir, exist_ok=True)
+        stem = os.path.join(
+            self.store.out_dir, f"{self.page}-{time.strftime('%Y%m%d-%H%M%S')}-{int(wall * 1000)}ms"
+        )
+        paths = []
+        try:
+            if self._profiler is not None:
+                self._profiler.dump_stats(f"{stem}.prof")
+                paths.append(f"{stem}.prof")
+            if self._tracing:
+                tracemalloc.take_snapshot().dump(f"{stem}.tracemalloc")
+                paths.append(f"{stem}.tracemalloc")
+        except OSError:
+            pass
+        return paths
+
+
+def render_panel(page, record, store):
+    """Summary expander: this rerun by section, then recent reruns of the page"""
+    records = store.records(page)
+    walls = sorted(r["wall"] for r in records)
+    with st.expander(f"⏱ Rerun profile · {record['wall'] * 1000:.0f} ms · "
+                     f"{record['elements']} elements · {record['bytes'] / 1024:.1f} KB"):
+        st.dataframe(
+            [{"section": name, "ms": round(s[0] * 1000, 1), "elements": s[1], "KB": round(s[2] / 1024, 1)}
+             for name, s in record["sections"].items()],
+            hide_index=True, use_container_width=True
+        )
+        st.caption(
+            f"Last {len(records)} reruns of {page}: "
+            f"p50 {walls[len(walls) // 2] * 1000:.0f} ms · p95 {walls[int(len(walls) * 0.95)] * 1000:.0f} ms · "
+            f"avg {sum(r['elements'] for r in records) / len(records):.0f} elements · "
+            f"avg {sum(r['bytes'] for r in records) / len(records) / 1024:.1f} KB"
+        )
+        dumps = store.dumps(page)
+        if dumps:
+            # File names only: server paths are not shown to visitors
+            st.caption("Slowest reruns, in the profile directory "
+                       "(load with `python -m pstats` / `tracemalloc.Snapshot.load`):")
+            st.code("\n".join(f"{wall * 1000:>7.0f} ms  {' '.join(os.path.basename(p) for p in paths)}"
+                              for wall, paths in dumps),
+                    language=None)
+
+
+def _script_ctx():
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+    except ImportError:
+        return None
+    return get_script_run_ctx()
+
+
+# --- PROCESS-WIDE STORE ---
+_store = ProfileStore(PROFILER["dir"], PROFILER["keep_slowest"], PROFILER["history"])
+
+def get_profile_store():
+    """Get the shared rerun record store"""
+    return _store
+
+def profiling_mode():
+    """'cprofile', 'mem' or None: the environment setting, or the query param where it allows"""
+    configured = (PROFILER["mode"] or "").lower()
+    if configured != PROFILER["query_mode"]:
+        return MODES.get(configured)
+    try:
+        requested = st.query_params.get(PROFILER["query_param"])
+    except Exception:
+        requested = None
+    # Visitors only get cProfile: tracemalloc is process-wide and slows every session
+    return "cprofile" if MODES.get((requested or "").lower()) else None
+
+def start_rerun(page):
+    """Start profiling this rerun of a page (a no-op object unless enabled)"""
+    ctx = _script_ctx()
+    unfinished = getattr(ctx, "_cinelab_profile", None)
+    if unfinished is not None:
+        unfinished.abort()
+    mode = profiling_mode()
+    if mode is None:
+        return _NULL
+    return RerunProfile(page, mode, _store)
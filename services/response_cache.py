@@ -0,0 +1,203 @@
+"""
+CineLab Suite - Response Cache
+Content-addressed, disk-backed cache for prompt-generation responses
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from config.cache import RESPONSE_CACHE
+from config.images import JPEG_QUALITY, WEBP_QUALITY, get_max_edge
+from config.models import get_model
+from config.prompt_versions import get_prompt_version, get_logic_version
+from services.library_store import get_library_version
+
+
+def image_digest(data):
+    """SHA-256 of the original image bytes"""
+    return hashlib.sha256(data).hexdigest()
+
+
+def _normalize(value):
+    if isinstance(value, str):
+        return " ".join(value.split())
+    if isinstance(value, dict):
+        return {str(k): _normalize(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    return value
+
+
+def make_key(tool_name, image_sha256, params):
+    """
+    Build the cache key for one engine call
+
+    Covers everything that changes the model's answer: the reference
+    image, how it is prepared before upload (config/images.py), normalized
+    params, active prompt/logic versions, model and the version of the
+    library the params were resolved against.
+    """
+    try:
+        library_version = get_library_version(tool_name)
+    except FileNotFoundError:
+        library_version = None
+    material = {
+        "tool": tool_name,
+        "image": image_sha256,
+        "image_prep": [get_max_edge(tool_name), JPEG_QUALITY, WEBP_QUALITY],
+        "params": _normalize(params),
+        "prompt_version": get_prompt_version(tool_name),
+        "logic_version": get_logic_version("fine_art_nude") if tool_name == "cinelab" else None,
+        "model": get_model(tool_name),
+        "library_version": library_version
+    }
+    blob = json.dumps(material, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(blob.encode('utf-8')).hexdigest()
+
+
+class ResponseCache:
+    """
+    SQLite-backed response store with TTL and size-based LRU eviction
+
+    One connection is shared by all sessions in the process and guarded
+    by a lock; hit/miss counters are per process. Entry count and bytes are
+    running totals, read from the table only on open and before evicting.
+    """
+
+    def __init__(self, path, max_bytes, ttl_seconds):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.stats = {"hits": 0, "misses": 0, "expired": 0, "evictions": 0, "writes": 0}
+        self._entries = self._bytes = None
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _count(self, db):
+        self._entries, self._bytes = db.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()
+
+    def _db(self):
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    tool TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses(accessed_at)")
+            self._count(conn)
+            self._conn = conn
+        return self._conn
+
+    def warm(self):
+        """Open the database (and create the table) ahead of the first lookup"""
+        with self._lock:
+            self._db()
+
+    def get(self, key):
+        """Get cached value or None (expired entries count as misses)"""
+        now = time.time()
+        with self._lock:
+            db = self._db()
+            row = db.execute("SELECT value, size, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.stats["misses"] += 1
+                return None
+            value, size, created_at = row
+            if now - created_at > self.ttl_seconds:
+                db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._entries -= 1
+                self._bytes -= size
+                self.stats["expired"] += 1
+                self.stats["misses"] += 1
+                return None
+            db.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            self.stats["hits"] += 1
+            return value
+
+    def put(self, key, tool_name, value):
+        """Store value, then evict least recently used entries above max_bytes"""
+        now = time.time()
+        size = len(value.encode('utf-8'))
+        with self._lock:
+            db = self._db()
+            old = db.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                (key, tool_name, value, size, now, now)
+            )
+            if old is None:
+                self._entries += 1
+            self._bytes += size - (old[0] if old else 0)
+            self.stats["writes"] += 1
+            self._evict(db)
+
+    def _evict(self, db):
+        if self._bytes <= self.max_bytes:
+            return
+        # Re-read before evicting: another process (e.g. the CLI) may share the file
+        self._count(db)
+        total = self._bytes
+        if total <= self.max_bytes:
+            return
+        rows = db.execute("SELECT key, size FROM responses ORDER BY accessed_at").fetchall()
+        doomed = []
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            doomed.append((key,))
+            total -= size
+        db.executemany("DELETE FROM responses WHERE key = ?", doomed)
+        self.stats["evictions"] += len(doomed)
+        self._entries -= len(doomed)
+        self._bytes = total
+
+    def get_or_compute(self, key, tool_name, compute, bypass=False):
+        """
+        Serve from cache or call compute() and store its result
+
+        Args:
+            bypass: skip the lookup (the fresh result is still stored)
+
+        Returns:
+            (value, hit)
+        """
+        if not bypass:
+            cached = self.get(key)
+            if cached is not None:
+                return cached, True
+        value = compute()
+        self.put(key, tool_name, value)
+        return value, False
+
+    def get_stats(self):
+        """Counters plus current entry count and stored bytes (running totals, no query)"""
+        with self._lock:
+            self._db()
+            return dict(self.stats, entries=self._entries, bytes=self._bytes)
+
+
+# --- PROCESS-WIDE INSTANCE ---
+_cache = ResponseCache(**RESPONSE_CACHE)
+
+def get_response_cache():
+    """Get the shared response cache"""
+    return _cache
+
+def describe_cache():
+    """One-line summary for the UI"""
+    s = _cache.get_stats()
+    return f"Cache: {s['hits']} hits / {s['misses']} misses · {s['entries']} entries · {s['bytes'] / 1e6:.1f} MB"
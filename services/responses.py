@@ -0,0 +1,50 @@
+"""
+CineLab Suite - Response Extraction
+Pull images/text out of Gemini responses, one result per candidate
+"""
+
+import io
+
+from services.metrics import timer
+
+
+def extract_parts(parts):
+    """
+    Extract the first image (or text) from a list of response parts
+
+    Returns:
+        (img_res, text_res, mime) - img_res is (PIL image, raw bytes) or None
+    """
+    for part in parts:
+        if hasattr(part, 'inline_data') and part.inline_data.mime_type.startswith('image/'):
+            from PIL import Image       # deferred: Pillow stays off the page import path
+            img_bytes = part.inline_data.data
+            img = Image.open(io.BytesIO(img_bytes))
+            return (img, img_bytes), None, part.inline_data.mime_type
+        if hasattr(part, 'text') and part.text:
+            return None, part.text, "text/plain"
+    return None, None, None
+
+
+@timer("extract_response")
+def safe_extract_response(response, candidate_index=0):
+    """Extract one candidate's result; errors come back as text_res"""
+    try:
+        if not hasattr(response, 'candidates') or not response.candidates:
+            return None, "No candidates", None
+        if candidate_index == 0 and len(response.candidates) == 1 and hasattr(response, 'parts'):
+            parts = response.parts
+        else:
+            parts = response.candidates[candidate_index].content.parts
+        return extract_parts(parts)
+    except Exception as e: 
+        return None, str(e), None
+
+
+@timer("extract_response", mode="candidates")
+def safe_extract_candidates(response):
+    """Extract every candidate's result, in candidate order"""
+    candidates = getattr(response, 'candidates', None)
+    if not candidates:
+        return [safe_extract_response(response)]
+    return [safe_extract_response(response, i) for i in range(len(candidates))]
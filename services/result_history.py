@@ -0,0 +1,227 @@
+"""
+CineLab Suite - Result History
+Bounded per-session history of generated results, large payloads spilled to disk
+
+Pages keep only handles in st.session_state. Small results stay in memory
+(least recently used spill once a session holds more than memory_bytes);
+anything above inline_bytes - Factory images, long JSON - is written to
+the spill directory right away. Per-session and global byte caps evict the
+least recently used results, so a busy session costs a bounded amount of
+memory and disk however long it runs.
+"""
+
+import atexit
+import os
+import secrets
+import shutil
+import threading
+import time
+from collections import OrderedDict
+
+from config.cache import RESULT_HISTORY
+from services.metrics import observe
+from services.rate_limiter import current_session_id
+
+
+class _Entry:
+    __slots__ = ("handle", "tool", "meta", "size", "text", "value", "path", "created_at", "accessed_at")
+
+    def __init__(self, handle, tool, value, meta):
+        self.handle = handle
+        self.tool = tool
+        self.meta = meta
+        self.text = isinstance(value, str)
+        self.value = value.encode('utf-8') if self.text else bytes(value)
+        self.size = len(self.value)
+        self.path = None                    # set once spilled; value is then None
+        self.created_at = self.accessed_at = time.time()
+
+
+class ResultHistory:
+    """
+    Handle-addressed results per session with memory, session and global caps
+
+    One instance is shared by all sessions in the process and guarded by a
+    lock. Spill files live in a directory per process and are removed at exit.
+    """
+
+    def __init__(self, dir, inline_bytes, memory_bytes, session_bytes, global_bytes, max_items, session_ttl):
+        self.dir = dir
+        self.inline_bytes = inline_bytes
+        self.memory_bytes = memory_bytes
+        self.session_bytes = session_bytes
+        self.global_bytes = global_bytes
+        self.max_items = max_items
+        self.session_ttl = session_ttl
+        self.stats = {"adds": 0, "spills": 0, "evictions": 0, "evicted_bytes": 0, "misses": 0}
+        self._sessions = {}                 # session id -> OrderedDict handle -> _Entry (LRU first)
+        self._seen = {}                     # session id -> last activity
+        self._spill_dir = None
+        self._lock = threading.Lock()
+
+    # --- SPILL FILES ---
+    def _spill_path(self, handle):
+        if self._spill_dir is None:
+            self._spill_dir = os.path.join(self.dir, str(os.getpid()))
+            self._remove_stale()
+            # Same pid as an earlier (dead) process, e.g. after a container restart
+            shutil.rmtree(self._spill_dir, ignore_errors=True)
+            os.makedirs(self._spill_dir, exist_ok=True)
+            atexit.register(shutil.rmtree, self._spill_dir, True)
+        return os.path.join(self._spill_dir, f"{handle}.bin")
+
+    def _remove_stale(self):
+        # Left behind by processes that did not exit cleanly
+        cutoff = time.time() - self.session_ttl
+        for name in os.listdir(self.dir) if os.path.isdir(self.dir) else ():
+            path = os.path.join(self.dir, name)
+            if path != self._spill_dir and os.path.isdir(path) and os.path.getmtime(path) < cutoff:
+                shutil.rmtree(path, ignore_errors=True)
+
+    def _spill(self, entry):
+        started = time.perf_counter()
+        path = self._spill_path(entry.handle)
+        try:
+            with open(path, 'wb') as f:
+                f.write(entry.value)
+        except OSError:
+            return False                    # Read-only disk: keep it in memory
+        entry.path, entry.value = path, None
+        self.stats["spills"] += 1
+        observe("history_spill", time.perf_counter() - started, tool=entry.tool)
+        return True
+
+    def _discard(self, session_id, handle, reason):
+        entry = self._sessions[session_id].pop(handle)
+        if entry.path is not None:
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
+        self.stats["evictions"] += 1
+        self.stats["evicted_bytes"] += entry.size
+        # Recorded as the age of the evicted result: short ages mean the caps are too tight
+        observe("history_evict", time.time() - entry.created_at, tool=entry.tool, reason=reason)
+
+    # --- CAPS ---
+    def _enforce(self, session_id, keep):
+        entries = self._sessions[session_id]
+        in_memory = sum(e.size for e in entries.values() if e.value is not None)
+        for entry in list(entries.values()):
+            if in_memory <= self.memory_bytes:
+                break
+            if entry.value is not None and self._spill(entry):
+                in_memory -= entry.size
+
+        # The result just added is never evicted, even when it alone is over a cap
+        total = sum(e.size for e in entries.values())
+        for handle in list(entries):
+            if total <= self.session_bytes and len(entries) <= self.max_items:
+                break
+            if handle != keep:
+                total -= entries[handle].size
+                self._discard(session_id, handle, "session")
+
+        total = sum(e.size for items in self._sessions.values() for e in items.values())
+        if total > self.global_bytes:
+            candidates = sorted(
+                ((e.accessed_at, sid, h, e.size) for sid, items in self._sessions.items()
+                 for h, e in items.items() if h != keep)
+            )
+            for _, sid, handle, size in candidates:
+                if total <= self.global_bytes:
+                    break
+                total -= size
+                self._discard(sid, handle, "global")
+
+    def _expire_sessions(self, now):
+        for session_id, seen in list(self._seen.items()):
+            if now - seen > self.session_ttl:
+                for handle in list(self._sessions[session_id]):
+                    self._discard(session_id, handle, "idle")
+                del self._sessions[session_id], self._seen[session_id]
+
+    # --- API ---
+    def add(self, tool_name, value, session_id=None, **meta):
+        """
+        Store one result for the current session
+
+        Args:
+            tool_name: producing tool (used to list a tool's results)
+            value: str or bytes
+            session_id: owner (defaults to the current Streamlit session)
+            **meta: small descriptive fields kept in memory (mime, label, ...)
+
+        Returns:
+            handle to pass to get()
+        """
+        session_id = session_id or current_session_id()
+        entry = _Entry(secrets.token_hex(8), tool_name, value, meta)
+        with self._lock:
+            now = time.time()
+            self._expire_sessions(now)
+            self._sessions.setdefault(session_id, OrderedDict())[entry.handle] = entry
+            self._seen[session_id] = now
+            self.stats["adds"] += 1
+            if entry.size > self.inline_bytes:
+                self._spill(entry)
+            self._enforce(session_id, entry.handle)
+        return entry.handle
+
+    def get(self, handle, session_id=None):
+        """Stored value (str or bytes as added), or None once evicted"""
+        session_id = session_id or current_session_id()
+        with self._lock:
+            entry = self._sessions.get(session_id, {}).get(handle)
+            if entry is None:
+                self.stats["misses"] += 1
+                return None
+            self._sessions[session_id].move_to_end(handle)
+            entry.accessed_at = self._seen[session_id] = time.time()
+            value, path = entry.value, entry.path
+        if value is None:
+            try:
+                with open(path, 'rb') as f:
+                    value = f.read()
+            except OSError:
+                with self._lock:
+                    self.stats["misses"] += 1
+                return None
+        return value.decode('utf-8') if entry.text else value
+
+    def entries(self, tool_name=None, session_id=None):
+        """Metadata of the session's results, newest first"""
+        session_id = session_id or current_session_id()
+        with self._lock:
+            items = list(self._sessions.get(session_id, {}).values())
+        items.sort(key=lambda e: e.created_at, reverse=True)
+        return [
+            dict(e.meta, handle=e.handle, tool=e.tool, size=e.size, created_at=e.created_at, spilled=e.path is not None)
+            for e in items if tool_name is None or e.tool == tool_name
+        ]
+
+    def get_stats(self):
+        """Counters plus sessions, entries and bytes held in memory / on disk"""
+        with self._lock:
+            items = [e for entries in self._sessions.values() for e in entries.values()]
+            return dict(
+                self.stats,
+                sessions=len(self._sessions),
+                entries=len(items),
+                memory_bytes=sum(e.size for e in items if e.value is not None),
+                disk_bytes=sum(e.size for e in items if e.path is not None)
+            )
+
+
+# --- PROCESS-WIDE INSTANCE ---
+_history = ResultHistory(**RESULT_HISTORY)
+
+def get_result_history():
+    """Get the shared result history"""
+    return _history
+
+def describe_history():
+    """One-line summary for the UI"""
+    s = _history.get_stats()
+    return (f"History: {s['entries']} results · {s['memory_bytes'] / 1e3:.0f} KB in memory · "
+            f"{s['disk_bytes'] / 1e6:.1f} MB on disk · {s['evictions']} evicted")
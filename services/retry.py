@@ -0,0 +1,267 @@
+"""
+CineLab Suite - Retry Policy
+Backoff with jitter, Retry-After, per-key retry budgets and hedged requests
+"""
+
+import random
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from config.models import TOOL_API_MAP
+from config.retries import RETRY_BUDGET, get_retry_policy
+from services.metrics import observe
+from services.rate_limiter import acquire, current_session_id, estimate_tokens, get_limiter, session_scope
+
+# HTTP statuses / google.api_core exception names worth another attempt
+RETRYABLE_CODES = {408, 429, 500, 502, 503, 504}
+RETRYABLE_NAMES = {
+    "ResourceExhausted", "TooManyRequests", "ServiceUnavailable", "InternalServerError",
+    "DeadlineExceeded", "GatewayTimeout", "BadGateway", "Aborted"
+}
+
+# Latencies kept per (tool, model) for the hedge threshold
+LATENCY_WINDOW = 200
+
+_RETRY_IN = re.compile(r"retry in ([\d.]+)\s*s", re.IGNORECASE)
+
+
+def is_retryable(error):
+    """True for rate limiting, overload and transient server/network errors"""
+    if isinstance(error, (ConnectionError, TimeoutError)):
+        return True
+    code = getattr(error, 'code', None)
+    if isinstance(code, int) and code in RETRYABLE_CODES:
+        return True
+    return type(error).__name__ in RETRYABLE_NAMES
+
+
+def retry_after(error):
+    """
+    Seconds the server asked us to wait, if it said so
+
+    Looks at a Retry-After header, google.rpc.RetryInfo details and the
+    "Please retry in 12.3s" hint Gemini puts in quota errors.
+    """
+    value = getattr(error, 'retry_after', None)
+    if value is not None:
+        return float(value)
+    response = getattr(error, 'response', None)
+    headers = getattr(response, 'headers', None) or {}
+    try:
+        if headers.get('Retry-After') is not None:
+            return float(headers.get('Retry-After'))
+    except (TypeError, ValueError):
+        pass
+    for detail in getattr(error, 'details', None) or ():
+        delay = getattr(detail, 'retry_delay', None)
+        if delay is not None:
+            return delay.seconds + delay.nanos / 1e9
+    match = _RETRY_IN.search(str(error))
+    return float(match.group(1)) if match else None
+
+
+def backoff_delay(attempt, policy, server_delay=None):
+    """
+    Pause before retry number `attempt` (1-based)
+
+    Returns:
+        Seconds to sleep, or None if the server wants a longer pause than
+        the policy allows
+    """
+    if server_delay is not None:
+        if server_delay > policy["max_retry_after"]:
+            return None
+        # Honour the server, with a little jitter so sessions don't stampede
+        return server_delay + random.uniform(0, policy["base_delay"])
+    # Full jitter
+    return random.uniform(0, min(policy["max_delay"], policy["base_delay"] * 2 ** attempt))
+
+
+class RetryBudget:
+    """
+    Caps retries + hedges at a fraction of first attempts
+
+    Every first attempt deposits `ratio`; every retry or hedge withdraws 1.
+    A floor of `min_per_minute` refills over time so a quiet key can still
+    retry, while an outage cannot multiply traffic.
+    """
+
+    def __init__(self, ratio, min_per_minute):
+        self.ratio = ratio
+        self.refill_rate = min_per_minute / 60.0
+        self.capacity = float(max(min_per_minute, 1))
+        self.balance = self.capacity
+        self._stamp = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.balance = min(self.capacity, self.balance + (now - self._stamp) * self.refill_rate)
+        self._stamp = now
+
+    def deposit(self):
+        with self._lock:
+            self._refill()
+            self.balance = min(self.capacity, self.balance + self.ratio)
+
+    def withdraw(self):
+        """Take one retry from the budget; False when it is spent"""
+        with self._lock:
+            self._refill()
+            if self.balance < 1:
+                return False
+            self.balance -= 1
+            return True
+
+
+class LatencyTracker:
+    """Rolling window of successful call latencies"""
+
+    def __init__(self, window=LATENCY_WINDOW):
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, pct, min_samples=1):
+        """Latency at `pct`, or None with fewer than min_samples observations"""
+        with self._lock:
+            if len(self._samples) < max(min_samples, 1):
+                return None
+            ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+# --- PROCESS-WIDE STATE ---
+_budgets = {}
+_trackers = {}
+_state_lock = threading.Lock()
+_hedge_pool = ThreadPoolExecutor(max_workers=16, thread_name_prefix="cinelab-hedge")
+_stats = {"calls": 0, "retries": 0, "gave_up": 0, "budget_exhausted": 0, "hedges": 0, "hedge_wins": 0}
+
+def get_budget(tool_name):
+    """Get the shared retry budget for the API key used by specific tool"""
+    api = TOOL_API_MAP.get(tool_name, "api_1")
+    with _state_lock:
+        if api not in _budgets:
+            _budgets[api] = RetryBudget(RETRY_BUDGET["ratio"], RETRY_BUDGET["min_per_minute"])
+        return _budgets[api]
+
+def get_tracker(tool_name, model_name):
+    """Get the latency window for a tool/model pair"""
+    with _state_lock:
+        return _trackers.setdefault((tool_name, model_name), LatencyTracker())
+
+def _count(name):
+    with _state_lock:
+        _stats[name] += 1
+
+def get_stats():
+    """Retry / hedge counters since process start"""
+    with _state_lock:
+        return dict(_stats)
+
+def describe_retries():
+    """One-line summary for the UI"""
+    s = get_stats()
+    return (f"Retries: {s['retries']} · gave up {s['gave_up']} · "
+            f"hedged {s['hedges']} ({s['hedge_wins']} won)")
+
+
+class RetryingModel:
+    """
+    GenerativeModel proxy applying rate limit, retry policy and hedging
+
+    Each attempt first waits for the key's rate-limit budget (in the
+    calling thread, so queue callbacks still reach the UI). generate_content
+    has no side effects, so retries and hedges are safe to repeat; the
+    per-key RetryBudget bounds how much extra traffic they add.
+    """
+
+    def __init__(self, model, tool_name):
+        self._model = model
+        self._tool_name = tool_name
+
+    def __getattr__(self, name):
+        return getattr(self._model, name)
+
+    def _timed(self, contents, kwargs, tracker):
+        model_name = getattr(self._model, 'model_name', None)
+        started = time.monotonic()
+        try:
+            response = self._model.generate_content(contents, **kwargs)
+        except Exception:
+            observe("api_call", time.monotonic() - started, tool=self._tool_name, model=model_name, outcome="error")
+            raise
+        elapsed = time.monotonic() - started
+        tracker.record(elapsed)
+        observe("api_call", elapsed, tool=self._tool_name, model=model_name)
+        return response
+
+    def _acquire(self, tokens):
+        observe("rate_limit_wait", acquire(self._tool_name, tokens), tool=self._tool_name)
+
+    def _backup(self, contents, kwargs, tokens, tracker, session_id):
+        with session_scope(session_id):
+            self._acquire(tokens)
+        return self._timed(contents, kwargs, tracker)
+
+    def _attempt(self, contents, kwargs, tokens, policy, tracker):
+        self._acquire(tokens)
+        threshold = None
+        if policy["hedge"]:
+            threshold = tracker.percentile(policy["hedge_percentile"], policy["hedge_min_samples"])
+        if threshold is None:
+            return self._timed(contents, kwargs, tracker)
+
+        primary = _hedge_pool.submit(self._timed, contents, kwargs, tracker)
+        done, _ = wait([primary], timeout=threshold)
+        # A hedge cannot beat a rate-limit queue - only fire when the key is idle
+        if done or get_limiter(self._tool_name).get_stats()["waiting"] or not get_budget(self._tool_name).withdraw():
+            return primary.result()
+
+        _count("hedges")
+        backup = _hedge_pool.submit(self._backup, contents, kwargs, tokens, tracker, current_session_id())
+        pending = {primary, backup}
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is backup:
+                        _count("hedge_wins")
+                    return future.result()
+                error = future.exception()
+        raise error
+
+    def generate_content(self, contents, **kwargs):
+        policy = get_retry_policy(self._tool_name)
+        budget = get_budget(self._tool_name)
+        tracker = get_tracker(self._tool_name, getattr(self._model, 'model_name', None))
+        tokens = estimate_tokens(contents, kwargs.get("generation_config"))
+        budget.deposit()
+        _count("calls")
+
+        started = time.monotonic()
+        for attempt in range(1, policy["max_attempts"] + 1):
+            try:
+                return self._attempt(contents, kwargs, tokens, policy, tracker)
+            except Exception as e:
+                if not is_retryable(e) or attempt == policy["max_attempts"]:
+                    if attempt > 1:
+                        _count("gave_up")
+                    raise
+                delay = backoff_delay(attempt, policy, retry_after(e))
+                if delay is None or time.monotonic() - started + delay > policy["deadline"]:
+                    _count("gave_up")
+                    raise
+                if not budget.withdraw():
+                    _count("budget_exhausted")
+                    raise
+                _count("retries")
+                time.sleep(delay)
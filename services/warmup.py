@@ -0,0 +1,144 @@
+"""
+CineLab Suite - Background Warm-up
+Pre-import the SDK, load libraries and build API clients once per process
+
+start_warmup() is called right after st.set_page_config on app.py and every
+page, so whichever script runs first in the server process starts it; later
+calls are no-ops. Pages never wait for it: if a user gets to a step first,
+the page thread does that work itself (imports and stores are shared and
+locked) and the warm-up finds it already done.
+"""
+
+import threading
+import time
+
+from config.libraries import TOOL_LIBRARY_MAP
+from config.models import API_KEYS
+from config.prompt_versions import ACTIVE_PROMPTS, ACTIVE_LOGIC
+from config.startup import WARMUP
+from cinelab import engines
+from services import image_prep
+from services.gemini_pool import get_registry
+from services.generation_history import get_generation_history
+from services.library_index import get_cinelab_index
+from services.library_search import get_library_search
+from services.library_store import get_library
+from services.metrics import observe
+from services.response_cache import get_response_cache
+
+_lock = threading.Lock()
+_thread = None
+_status = {}                # step -> seconds taken, or the error text
+
+
+def _secret_keys():
+    """API key values by secret name from st.secrets ({} without a secrets file)"""
+    try:
+        import streamlit as st
+        return {name: st.secrets[name] for name in set(API_KEYS.values()) if name in st.secrets}
+    except Exception:
+        return {}
+
+
+# --- STEPS ---
+def _warm_sdk():
+    get_registry().genai
+
+
+def _warm_libraries():
+    for tool_name in TOOL_LIBRARY_MAP:
+        get_library(tool_name)
+    get_cinelab_index("cinelab")
+    for tool_name in TOOL_LIBRARY_MAP:
+        get_library_search(tool_name)
+
+
+def _warm_modules():
+    for tool_name in ACTIVE_PROMPTS:
+        engines.load_prompt_module(tool_name)
+    for logic_name in ACTIVE_LOGIC:
+        engines.load_logic_module(logic_name)
+
+
+def _warm_clients():
+    registry = get_registry()
+    if registry.is_fake:
+        keys = {name: "fake" for name in set(API_KEYS.values())}
+    else:
+        keys = _secret_keys()
+    for key_name, api_key in keys.items():
+        registry.configure(key_name, api_key)
+    registry.warm()
+
+
+STEPS = {
+    "sdk": _warm_sdk,
+    "pillow": image_prep.warm,
+    "libraries": _warm_libraries,
+    "modules": _warm_modules,
+    "clients": _warm_clients,
+    "response_cache": lambda: get_response_cache().warm(),
+    "generation_history": lambda: get_generation_history().warm()
+}
+
+
+def run_warmup(steps=None):
+    """
+    Run warm-up steps on the calling thread
+
+    Args:
+        steps: step names (default: WARMUP["steps"])
+
+    Returns:
+        dict of step -> seconds, or the error text for a failed step
+    """
+    for name in steps or WARMUP["steps"]:
+        started = time.perf_counter()
+        try:
+            STEPS[name]()
+            result, outcome = round(time.perf_counter() - started, 3), "ok"
+        except Exception as e:
+            # A missing library or key surfaces on the page as before
+            result, outcome = f"{type(e).__name__}: {e}", "error"
+        observe("warmup", time.perf_counter() - started, step=name, outcome=outcome)
+        with _lock:
+            _status[name] = result
+    return get_status()
+
+
+def start_warmup():
+    """Start the background warm-up once per process (no-op when disabled or already started)"""
+    global _thread
+    if not WARMUP["enabled"]:
+        return
+    with _lock:
+        if _thread is not None:
+            return
+        _thread = threading.Thread(target=run_warmup, name="cinelab-warmup", daemon=True)
+    _thread.start()
+
+
+def wait_warmup(timeout=None):
+    """Block until the warm-up finished (True) or the timeout passed (False)"""
+    thread = _thread
+    if thread is None:
+        return False
+    thread.join(timeout)
+    return not thread.is_alive()
+
+
+def get_status():
+    """Finished steps so far"""
+    with _lock:
+        return dict(_status)
+
+
+def describe_warmup():
+    """One-line summary for the UI"""
+    status = get_status()
+    if not status:
+        return "Warm-up: not started" if _thread is None else "Warm-up: running"
+    failed = [name for name, value in status.items() if isinstance(value, str)]
+    total = sum(value for value in status.values() if not isinstance(value, str))
+    note = f" · failed: {', '.join(failed)}" if failed else ""
+    return f"Warm-up: {len(status)}/{len(WARMUP['steps'])} steps in {total:.2f}s{note}"